@@ -0,0 +1,206 @@
+# -*- coding: utf-8 -*-
+
+import os
+import mmap
+import ctypes
+import struct
+import logging
+import platform
+import datetime
+
+# File layout: a fixed header followed by one 1440-byte slot per day (one byte
+# per minute), starting at the day stored in the header. A day's slot sits at
+# a computable offset, so recording a minute is a single byte store into the
+# mapping and reading a day is a single slice.
+MAGIC = b"EPTL"
+VERSION = 1
+HEADER_FORMAT = "<4sHHI" # magic, version, reserved, first day (date ordinal)
+HEADER_SIZE = 16
+MINUTES_PER_DAY = 1440
+GROW_DAYS = 64 # The file is extended this many days at a time to keep remaps rare
+
+# Per-minute states
+STATE_NONE = 0 # App not running / nothing recorded
+STATE_ACTIVE = 1 # Working period, user active
+STATE_RESTING = 2 # Rest period, no user input (break taken)
+STATE_REST_SKIPPED = 3 # Rest period, but the user kept working
+STATE_IDLE = 4 # Working period, but no user input for the whole minute
+
+class _LASTINPUTINFO(ctypes.Structure):
+    _fields_ = [('cbSize', ctypes.c_uint), ('dwTime', ctypes.c_uint)]
+
+def get_idle_seconds():
+    """Returns seconds since the last keyboard/mouse input, or None if unknown on this platform."""
+    if platform.system() != "Windows":
+        return None
+    try:
+        info = _LASTINPUTINFO()
+        info.cbSize = ctypes.sizeof(info)
+        if not ctypes.windll.user32.GetLastInputInfo(ctypes.byref(info)):
+            return None
+        # Both values are 32-bit millisecond tick counts; mask handles wrap-around
+        elapsed_ms = (ctypes.windll.kernel32.GetTickCount() - info.dwTime) & 0xFFFFFFFF
+        return elapsed_ms / 1000.0
+    except (AttributeError, OSError) as e:
+        logging.debug("GetLastInputInfo unavailable: %s", e)
+        return None
+
+class ActivityTimeline:
+    """Per-minute activity states for each day, stored in a memory-mapped file."""
+
+    def __init__(self, path, first_day=None):
+        self.path = path
+        self._file = None
+        self._mm = None
+        if not os.path.exists(path) or os.path.getsize(path) < HEADER_SIZE:
+            first_day = first_day or datetime.date.today()
+            with open(path, 'wb') as f:
+                f.write(struct.pack(HEADER_FORMAT, MAGIC, VERSION, 0, first_day.toordinal()))
+                f.truncate(HEADER_SIZE + GROW_DAYS * MINUTES_PER_DAY)
+        self._file = open(path, 'r+b')
+        magic, version, _, first_ordinal = struct.unpack(HEADER_FORMAT, self._file.read(struct.calcsize(HEADER_FORMAT)))
+        if magic != MAGIC or version != VERSION:
+            self._file.close()
+            raise ValueError(f"Not an activity timeline file (or unsupported version): {path}")
+        self.first_ordinal = first_ordinal
+        self._map()
+
+    def _map(self):
+        """(Re)maps the whole file."""
+        if self._mm is not None:
+            self._mm.close()
+        self._mm = mmap.mmap(self._file.fileno(), 0)
+        self.days_capacity = (len(self._mm) - HEADER_SIZE) // MINUTES_PER_DAY
+
+    def _ensure_capacity(self, day_index):
+        """Grows the file so day_index has a slot."""
+        if day_index < self.days_capacity:
+            return
+        new_days = (day_index // GROW_DAYS + 1) * GROW_DAYS
+        self._mm.close()
+        self._mm = None
+        self._file.truncate(HEADER_SIZE + new_days * MINUTES_PER_DAY)
+        self._map()
+
+    def _day_offset(self, date):
+        """Returns the file offset of a day's slot, or None for days before the first day."""
+        day_index = date.toordinal() - self.first_ordinal
+        if day_index < 0:
+            return None
+        return HEADER_SIZE + day_index * MINUTES_PER_DAY
+
+    def close(self):
+        """Flushes and closes the mapping."""
+        if self._mm is not None:
+            self._mm.flush()
+            self._mm.close()
+            self._mm = None
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def flush(self):
+        """Writes dirty pages back to disk."""
+        if self._mm is not None:
+            self._mm.flush()
+
+    def record_minute(self, when, state):
+        """Stores the state of the minute containing `when` (datetime)."""
+        day_index = when.toordinal() - self.first_ordinal
+        if day_index < 0:
+            logging.warning("Ignoring activity for %s, before timeline start.", when.date())
+            return False
+        self._ensure_capacity(day_index)
+        self._mm[HEADER_SIZE + day_index * MINUTES_PER_DAY + when.hour * 60 + when.minute] = state
+        return True
+
+    def read_day(self, date):
+        """Returns the 1440 per-minute states of a day as bytes (all STATE_NONE if unrecorded)."""
+        offset = self._day_offset(date)
+        if offset is None or date.toordinal() - self.first_ordinal >= self.days_capacity:
+            return bytes(MINUTES_PER_DAY)
+        return self._mm[offset:offset + MINUTES_PER_DAY]
+
+    def _read_range(self, start_date, end_date):
+        """
+        Returns (bytes, days) for start..end inclusive: one contiguous slice of
+        the mapping, padded with STATE_NONE for days outside the file.
+        """
+        days = end_date.toordinal() - start_date.toordinal() + 1
+        if days <= 0:
+            return b"", 0
+        first = start_date.toordinal() - self.first_ordinal
+        last = first + days # Exclusive
+        lead = min(max(0, -first), days)
+        first, last = max(first, 0), min(last, self.days_capacity)
+        body = self._mm[HEADER_SIZE + first * MINUTES_PER_DAY:HEADER_SIZE + last * MINUTES_PER_DAY] if last > first else b""
+        trail = days * MINUTES_PER_DAY - lead * MINUTES_PER_DAY - len(body)
+        if lead or trail:
+            body = bytes(lead * MINUTES_PER_DAY) + body + bytes(trail)
+        return body, days
+
+    # --- Aggregation helpers ---
+    # These work on whole byte ranges with bytes.count and strided slices,
+    # which run in C, so a year of data is scanned without creating a Python
+    # object per minute.
+
+    def daily_counts(self, start_date, end_date, state):
+        """Returns [(date, minutes_in_state)] for each day in start..end inclusive."""
+        data, days = self._read_range(start_date, end_date)
+        marker = bytes([state])
+        return [
+            (start_date + datetime.timedelta(days=i),
+             data.count(marker, i * MINUTES_PER_DAY, (i + 1) * MINUTES_PER_DAY))
+            for i in range(days)
+        ]
+
+    def minute_of_day_profile(self, start_date, end_date, state):
+        """Returns a 1440-entry list: for each minute of the day, on how many days it was in `state`."""
+        data, days = self._read_range(start_date, end_date)
+        marker = bytes([state])
+        # data[m::1440] gathers minute m of every day in one C-level slice
+        return [data[minute::MINUTES_PER_DAY].count(marker) for minute in range(MINUTES_PER_DAY)]
+
+    def hourly_profile(self, start_date, end_date, state):
+        """Returns a 24-entry list of minutes in `state` per hour of day over start..end."""
+        minutes = self.minute_of_day_profile(start_date, end_date, state)
+        return [sum(minutes[hour * 60:(hour + 1) * 60]) for hour in range(24)]
+
+    def state_totals(self, start_date, end_date):
+        """Returns {state: minutes} over start..end for every state."""
+        data, _ = self._read_range(start_date, end_date)
+        states = (STATE_ACTIVE, STATE_RESTING, STATE_REST_SKIPPED, STATE_IDLE)
+        return {state: data.count(bytes([state])) for state in states}
+
+# Example Usage (for testing)
+if __name__ == "__main__":
+    import tempfile
+    import random
+
+    print("Testing activity timeline...")
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        today = datetime.date.today()
+        start = today - datetime.timedelta(days=364)
+        timeline = ActivityTimeline(os.path.join(tmp_dir, "timeline.bin"), first_day=start)
+
+        rng = random.Random(1)
+        for offset in range(365):
+            day = datetime.datetime.combine(start + datetime.timedelta(days=offset), datetime.time(9))
+            for minute in range(8 * 60):
+                when = day + datetime.timedelta(minutes=minute)
+                state = STATE_ACTIVE
+                if minute % 60 >= 55: # Last five minutes of each hour are a rest period
+                    state = STATE_REST_SKIPPED if rng.random() < 0.3 else STATE_RESTING
+                timeline.record_minute(when, state)
+
+        import time
+        t0 = time.perf_counter()
+        hourly = timeline.hourly_profile(start, today, STATE_REST_SKIPPED)
+        elapsed_ms = (time.perf_counter() - t0) * 1000
+        print(f"Skipped-rest minutes per hour of day over a year ({elapsed_ms:.1f} ms):")
+        for hour, minutes in enumerate(hourly):
+            if minutes:
+                print(f"  {hour:02d}:00  {minutes}")
+        print(f"State totals: {timeline.state_totals(start, today)}")
+        timeline.close()
+    print("\nTest complete.")
@@ -0,0 +1,174 @@
+# -*- coding: utf-8 -*-
+"""
+Ambient-light adaptive brightness.
+
+An AdaptiveBrightness samples a light source, smooths the readings with a
+time-based exponential filter, maps the filtered lux to a brightness through
+a BrightnessCurve and writes it only when the target moves outside a
+hysteresis band around the last written value. The sampling interval adapts:
+it drops to the minimum while the light is changing and doubles, up to the
+maximum, while it is steady.
+
+Light sources are anything with read_lux(now) returning lux or None:
+WindowsLightSensorSource reads the built-in ambient light sensor through
+WinRT; TraceLightSource replays a recorded trace, so the whole pipeline can
+be driven without hardware.
+
+Qt-free: AppCore drives step() from a single-shot QTimer.
+"""
+
+import csv
+import math
+import bisect
+import logging
+import platform
+import metrics
+from lazy_import import lazy_import, is_available
+
+# WinRT projection of Windows.Devices.Sensors (package winrt-Windows.Devices.Sensors)
+sensors = lazy_import("winrt.windows.devices.sensors")
+
+# (lux, brightness percent) points; interpolated linearly in log(lux) between them
+DEFAULT_CURVE = [(0, 20), (10, 30), (100, 50), (1000, 80), (10000, 100)]
+DEFAULT_HYSTERESIS_PERCENT = 5 # Minimum brightness change worth a WMI write
+DEFAULT_TIME_CONSTANT = 4.0 # Seconds for the filter to cover ~63% of a step change
+MIN_INTERVAL = 1.0 # Sampling interval while the light is changing (seconds)
+MAX_INTERVAL = 30.0 # Sampling interval once it has been steady for a while
+CHANGE_THRESHOLD = 0.1 # Relative lux change that counts as "changing"
+
+class WindowsLightSensorSource:
+    """The default ambient light sensor (Windows.Devices.Sensors.LightSensor)."""
+
+    def __init__(self, sensor):
+        self.sensor = sensor
+
+    @classmethod
+    def open(cls):
+        """Returns a source for the default light sensor, or None if there is none."""
+        if platform.system() != "Windows" or not is_available("winrt"):
+            return None
+        try:
+            sensor = sensors.LightSensor.get_default()
+        except Exception as e:
+            logging.error("Failed to open the ambient light sensor: %s", e)
+            return None
+        return cls(sensor) if sensor is not None else None
+
+    def read_lux(self, now):
+        try:
+            reading = self.sensor.get_current_reading()
+        except Exception as e:
+            logging.error("Failed to read the ambient light sensor: %s", e)
+            return None
+        return reading.illuminance_in_lux if reading is not None else None
+
+class TraceLightSource:
+    """Replays (seconds, lux) samples; read_lux(now) returns the latest sample at or before `now`."""
+
+    def __init__(self, samples, start=None):
+        samples = sorted(samples)
+        self.times = [t for t, _ in samples]
+        self.values = [lux for _, lux in samples]
+        self.start = start # Scheduler time of trace second 0; set by the first read if None
+
+    @classmethod
+    def from_file(cls, path):
+        """Loads a CSV trace of `seconds,lux` rows (a header row is skipped)."""
+        samples = []
+        with open(path, newline='', encoding='utf-8') as f:
+            for row in csv.reader(f):
+                try:
+                    samples.append((float(row[0]), float(row[1])))
+                except (ValueError, IndexError):
+                    continue # Header or blank line
+        return cls(samples)
+
+    def read_lux(self, now):
+        if not self.times:
+            return None
+        if self.start is None:
+            self.start = now
+        index = bisect.bisect_right(self.times, now - self.start) - 1
+        return self.values[max(index, 0)]
+
+class ExponentialFilter:
+    """Exponential moving average whose weight depends on the time between samples."""
+
+    def __init__(self, time_constant=DEFAULT_TIME_CONSTANT):
+        self.time_constant = time_constant
+        self.value = None
+        self._last_time = None
+
+    def update(self, sample, now):
+        if self.value is None:
+            self.value = sample
+        else:
+            alpha = 1.0 - math.exp(-max(now - self._last_time, 0.0) / self.time_constant)
+            self.value += alpha * (sample - self.value)
+        self._last_time = now
+        return self.value
+
+class BrightnessCurve:
+    """Maps lux to a brightness percent by interpolating between (lux, percent) points in log(lux)."""
+
+    def __init__(self, points=None):
+        points = sorted((float(lux), float(percent)) for lux, percent in (points or DEFAULT_CURVE))
+        if not points:
+            raise ValueError("A brightness curve needs at least one point.")
+        self.xs = [math.log10(lux + 1) for lux, _ in points]
+        self.ys = [percent for _, percent in points]
+
+    def brightness_for(self, lux):
+        x = math.log10(max(lux, 0.0) + 1)
+        index = bisect.bisect_right(self.xs, x)
+        if index == 0:
+            percent = self.ys[0]
+        elif index == len(self.xs):
+            percent = self.ys[-1]
+        else:
+            x0, x1, y0, y1 = self.xs[index - 1], self.xs[index], self.ys[index - 1], self.ys[index]
+            percent = y0 + (y1 - y0) * (x - x0) / (x1 - x0)
+        return int(round(max(0.0, min(percent, 100.0))))
+
+class AdaptiveBrightness:
+    """
+    Sample -> filter -> curve -> hysteresis -> apply_brightness(level).
+    Call step(now) whenever the interval it returned has elapsed.
+    """
+
+    def __init__(self, source, apply_brightness, curve=None, hysteresis=DEFAULT_HYSTERESIS_PERCENT,
+                 time_constant=DEFAULT_TIME_CONSTANT, min_interval=MIN_INTERVAL, max_interval=MAX_INTERVAL):
+        self.source = source
+        self.apply_brightness = apply_brightness
+        self.curve = curve or BrightnessCurve()
+        self.hysteresis = hysteresis
+        self.filter = ExponentialFilter(time_constant)
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.interval = min_interval
+        self.last_written = None # Brightness most recently passed to apply_brightness
+        self.samples = 0
+        self.writes = 0
+
+    def step(self, now):
+        """Takes one sample, writes the brightness if needed and returns the seconds until the next step."""
+        lux = self.source.read_lux(now)
+        if lux is None:
+            self.interval = self.max_interval # Sensor unavailable for now; check back rarely
+            return self.interval
+        self.samples += 1
+        previous = self.filter.value
+        filtered = self.filter.update(lux, now)
+
+        # Fast sampling while the raw reading is away from the filtered level (the filter is still settling)
+        changing = previous is None or abs(lux - filtered) > CHANGE_THRESHOLD * max(filtered, 1.0)
+        self.interval = self.min_interval if changing else min(self.interval * 2, self.max_interval)
+
+        target = self.curve.brightness_for(filtered)
+        if self.last_written is None or abs(target - self.last_written) >= self.hysteresis:
+            logging.debug("Ambient light %.0f lux (filtered %.0f): brightness %s%%", lux, filtered, target)
+            metrics.count("ambient_light.writes")
+            self.apply_brightness(target)
+            self.last_written = target
+            self.writes += 1
+        return self.interval
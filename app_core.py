@@ -0,0 +1,661 @@
+# -*- coding: utf-8 -*-
+"""
+Resident application core.
+
+Owns everything that must keep running while no window is open: settings,
+the gamma/brightness controllers, the reminder scheduler, the hotkey
+listener, usage statistics and the tray icon. The main window is only a view
+onto this core; in tray mode it is destroyed when closed and rebuilt from the
+core's state the next time it is opened, so the widgets cost no memory while
+the app sits in the tray.
+
+With staged=True (autostart at login) the constructor only does what puts
+the color on screen; the WMI connection, hotkey hook, statistics timers and
+the sensor/foreground watchers wait for complete_startup(), which
+begin_staged_startup() runs once the system has settled (see system_idle).
+"""
+
+import sys
+import os
+import time
+import logging
+import datetime
+from PySide6.QtCore import QObject, QTimer, Signal
+from PySide6.QtGui import QPixmapCache
+from PySide6.QtWidgets import QApplication, QSystemTrayIcon
+
+from gamma_controller import GammaController, MIN_KELVIN, MAX_KELVIN
+from brightness_controller import BrightnessController
+from reminder_manager import ReminderManager
+from hotkey_manager import HotkeyManager
+import reminder_manager
+import hotkey_manager
+import power_state
+import settings_manager as sm
+from rest_overlay import RestOverlay
+import stats_manager
+import startup_profiler
+import single_instance
+import memory_usage
+import metrics
+import ambient_light
+import system_idle
+from foreground_watcher import ForegroundWatcher
+
+METRICS_FILE = "metrics.json"
+# GammaController.set_adjustments() argument -> setting
+COLOR_ADJUSTMENT_SETTINGS = {"gamma": "color_gamma", "contrast": "color_contrast", "dimming": "color_dimming"}
+# Countdown repaints of a visible rest overlay per power mode (None: only its deadline)
+REST_OVERLAY_CADENCES_MS = {
+    power_state.MODE_AC: 1000,
+    power_state.MODE_BATTERY: 1000,
+    power_state.MODE_DISPLAY_OFF: None,
+}
+# Shortest interval between ambient light samples per power mode (None: paused)
+ADAPTIVE_BRIGHTNESS_CADENCES_MS = {
+    power_state.MODE_AC: 1000,
+    power_state.MODE_BATTERY: 5000,
+    power_state.MODE_DISPLAY_OFF: None,
+}
+
+def resource_path(relative_path):
+    """ Get absolute path to resource, works for dev and for PyInstaller """
+    try:
+        # PyInstaller creates a temp folder and stores path in _MEIPASS
+        # Note: Adjust if your main script isn't at the root where PyInstaller runs
+        base_path = sys._MEIPASS
+    except Exception:
+        # Not running as a bundle, use the directory of this script file
+        base_path = os.path.dirname(os.path.abspath(__file__))
+
+    return os.path.join(base_path, relative_path)
+
+def get_metrics_path():
+    """Where the metrics snapshot is written on exit, next to the settings file."""
+    return os.path.join(os.path.dirname(sm.get_settings_path()), METRICS_FILE)
+
+def clamp(value, min_val, max_val):
+    """Clamps a value between a minimum and maximum."""
+    return max(min_val, min(value, max_val))
+
+class AppCore(QObject):
+    """Controllers, scheduler and listeners that stay resident for the life of the app."""
+
+    # Emitted after apply_color_settings with the saved temperature and brightness
+    color_changed = Signal(int, int)
+    # Emitted once the deferred part of a staged startup has run
+    startup_completed = Signal()
+
+    def __init__(self, parent=None, staged=False):
+        super().__init__(parent)
+        self.start_time = datetime.datetime.now() # Record start time for usage stats
+        self.usage_checkpointer = stats_manager.UsageCheckpointer(self.start_time)
+        self.last_profile_switch_ms = None # Latency of the most recent profile switch
+        self.window = None # MainWindow while it is open, None otherwise
+        self.tray_icon = None
+        self.resident = False # True when closing the window leaves the app running in the tray
+        self._tray_hint_shown = False
+        self._snapshot_key = None # (temperature, adjustments) of the gamma ramp snapshot written this session
+        self._shut_down = False
+        self.startup_complete = False
+        self._startup_gate = None
+        self._startup_gate_timer = None
+
+        # Load settings first
+        with startup_profiler.span("load_settings"):
+            self.settings = sm.load_settings()
+        logging.info(f"Loaded settings: {self.settings}")
+        if self.settings.get("metrics_enabled", False):
+            metrics.enable()
+
+        # Initialize controllers
+        with startup_profiler.span("gamma_controller"):
+            self.gamma_controller = GammaController()
+        with startup_profiler.span("brightness_controller"):
+            # WMI takes a while to connect at login; a staged startup connects later
+            self.brightness_controller = BrightnessController(connect=not staged)
+
+        # --- Power State ---
+        # Background work slows down on battery and pauses what it can while the display is off
+        self.power_state = power_state.PowerStateService(parent=self)
+        if self.settings.get("power_throttling_enabled", True):
+            self.power_state.start()
+
+        self.reminder_manager = ReminderManager(self)
+        self.power_state.register("reminder", reminder_manager.STATUS_CADENCES_MS,
+                                  self.reminder_manager.set_status_interval, timer=self.reminder_manager.timer)
+        self.reminder_manager.set_durations(
+            self.settings.get("reminder_work_hours", 1),
+            self.settings.get("reminder_rest_minutes", 5)
+        )
+        if self.settings.get("reminder_enabled", False):
+            self.reminder_manager.start_timer()
+
+        # --- Rest Overlay ---
+        # Its windows are built in complete_startup(), ahead of the first rest
+        self.rest_overlay = RestOverlay(self)
+        self.power_state.register("rest_overlay", REST_OVERLAY_CADENCES_MS,
+                                  self.rest_overlay.set_repaint_interval, timer=self.rest_overlay.timer)
+        self.reminder_manager.rest_period_started.connect(self._on_rest_period_started)
+        self.reminder_manager.rest_period_ended.connect(self.rest_overlay.hide_overlay)
+
+        with startup_profiler.span("apply_initial_settings"):
+            self.apply_initial_settings()
+
+        # --- Hotkey Manager ---
+        # The keyboard hook is installed in complete_startup()
+        self.hotkey_manager = HotkeyManager(self.settings.get("hotkeys", {}), self)
+        self.hotkey_manager.hotkey_pressed.connect(self.handle_hotkey_press)
+        hotkey_client = self.power_state.register("hotkey", hotkey_manager.POLL_CADENCES_MS,
+                                                  self.hotkey_manager.set_poll_interval)
+        self.hotkey_manager.on_wakeup = hotkey_client.record_wakeup
+
+        # --- Usage Checkpoints ---
+        # Record usage periodically so a crash, power loss or logoff loses at most one interval
+        checkpoint_minutes = max(1, self.settings.get("stats_checkpoint_minutes", 5))
+        self.checkpoint_timer = QTimer(self)
+        self.checkpoint_timer.setInterval(checkpoint_minutes * 60 * 1000)
+        self.checkpoint_timer.timeout.connect(self.checkpoint_usage_stats)
+        self.power_state.count_timer("stats_checkpoint", self.checkpoint_timer)
+        app = QApplication.instance()
+        if app is not None:
+            # Emitted when the session ends (logoff/shutdown), where closeEvent may never run
+            app.commitDataRequest.connect(self.checkpoint_usage_stats)
+            app.aboutToQuit.connect(self.shutdown)
+
+        # --- Adaptive Brightness ---
+        # Rescheduled after every step with the interval the step asks for
+        self.adaptive_brightness = None
+        self.adaptive_timer = QTimer(self)
+        self.adaptive_timer.setSingleShot(True)
+        self.adaptive_timer.timeout.connect(self._adaptive_brightness_step)
+        self._adaptive_min_interval_ms = ADAPTIVE_BRIGHTNESS_CADENCES_MS[power_state.MODE_AC]
+        self.power_state.register("adaptive_brightness", ADAPTIVE_BRIGHTNESS_CADENCES_MS,
+                                  self._set_adaptive_min_interval, timer=self.adaptive_timer)
+
+        # --- Application Profiles ---
+        self.foreground_watcher = None
+        self.app_profile = None # Profile applied for the foreground application, None when none is
+
+        # --- Activity Timeline ---
+        # Sample the work/rest state once a minute into the per-minute timeline
+        self.activity_timer = QTimer(self)
+        self.activity_timer.setInterval(60 * 1000)
+        self.activity_timer.timeout.connect(self.record_activity_minute)
+        self.power_state.count_timer("activity_timeline", self.activity_timer)
+
+        if not staged:
+            self.complete_startup()
+        logging.info("AppCore initialized%s.", " (staged; deferred work pending)" if staged else "")
+
+
+    # --- Staged Startup ---
+    def complete_startup(self):
+        """Runs the startup work a staged start deferred. Does nothing the second time."""
+        if self.startup_complete or self._shut_down:
+            return
+        self.startup_complete = True
+        if self._startup_gate_timer is not None:
+            self._startup_gate_timer.stop()
+            self._startup_gate_timer = None
+            self._startup_gate.sampler.close()
+            self._startup_gate = None
+
+        if not self.brightness_controller.is_supported():
+            with startup_profiler.span("brightness_controller_connect"):
+                if self.brightness_controller.connect():
+                    self.brightness_controller.set_brightness(self.settings.get("brightness_percent", 80), smooth_transition=False)
+
+        with startup_profiler.span("hotkey_listener"):
+            logging.info("Attempting to start hotkey listener...")
+            self.hotkey_manager.start_listening()
+            logging.info("Hotkey listener started (or attempted).")
+
+        self.checkpoint_timer.start()
+        self.activity_timer.start()
+        if self.settings.get("adaptive_brightness_enabled", False):
+            self._update_adaptive_brightness()
+        if self.settings.get("app_profiles_enabled", False):
+            self._update_app_profiles()
+        with startup_profiler.span("rest_overlay"):
+            self._update_rest_overlay()
+        self.startup_completed.emit()
+
+    def begin_staged_startup(self):
+        """Polls system load once a second and calls complete_startup() when the startup gate opens."""
+        if self.startup_complete or self._startup_gate_timer is not None:
+            return
+        self._startup_gate = system_idle.StartupGate(
+            cpu_threshold=self.settings.get("autostart_idle_cpu_percent", 30) / 100.0,
+            disk_threshold=self.settings.get("autostart_idle_disk_percent", 30) / 100.0,
+            max_delay=self.settings.get("autostart_max_delay_seconds", 60)
+        )
+        self._startup_gate_timer = QTimer(self)
+        self._startup_gate_timer.setInterval(1000)
+        self._startup_gate_timer.timeout.connect(self._check_startup_gate)
+        self._startup_gate_timer.start()
+        logging.info("Staged startup: waiting for the system to settle (at most %ss).", self._startup_gate.max_delay)
+
+    def _check_startup_gate(self):
+        if self._startup_gate is not None and self._startup_gate.ready():
+            self.complete_startup()
+
+
+    # --- Settings ---
+    def apply_initial_settings(self):
+        """Apply the loaded temperature and brightness settings."""
+        logging.info("Applying initial settings from loaded configuration.")
+        self.gamma_controller.set_adjustments(**self.color_adjustments())
+        self.gamma_controller.set_temperature(self.settings.get("temperature_kelvin", 6500))
+        if self.brightness_controller.is_supported():
+            self.brightness_controller.set_brightness(self.settings.get("brightness_percent", 80), smooth_transition=False)
+
+    def set_metrics_enabled(self, enabled):
+        """Turns hot-path metrics collection on or off and remembers the choice."""
+        if enabled:
+            metrics.enable()
+        else:
+            metrics.disable()
+        self.settings["metrics_enabled"] = enabled
+        self.save_settings()
+
+    def save_settings(self):
+        sm.apply_policy(self.settings) # Undo any direct edit to a value the machine policy controls
+        logging.debug("Saving settings: %s", self.settings)
+        sm.save_settings(self.settings)
+        # Keep the login snapshot (see ramp_snapshot) in step with the saved temperature and adjustments
+        kelvin = self.settings.get("temperature_kelvin", 6500)
+        snapshot_key = (kelvin, self.gamma_controller.adjustments())
+        if snapshot_key != self._snapshot_key and self.gamma_controller.save_snapshot(kelvin):
+            self._snapshot_key = snapshot_key
+
+
+    # --- Color ---
+    @metrics.timed("core.apply_color_settings")
+    def apply_color_settings(self, temperature=None, brightness=None, adjustments=None):
+        """
+        Apply a temperature, brightness and/or color adjustments (a dict of any
+        of gamma, contrast and dimming, see GammaController.set_adjustments) in
+        one update: the ramp is built and written once, the brightness set once
+        and the settings saved once. Adjustments without a temperature keep the
+        current one. An open window follows through color_changed.
+        """
+        if adjustments:
+            adjustments = {name: sm.constrain(COLOR_ADJUSTMENT_SETTINGS[name], value) for name, value in adjustments.items()}
+            self.gamma_controller.set_adjustments(**adjustments, write=False)
+            for name, value in zip(("gamma", "contrast", "dimming"), self.gamma_controller.adjustments()):
+                if name in adjustments:
+                    self.settings[COLOR_ADJUSTMENT_SETTINGS[name]] = value # Clamped to the supported range
+            if temperature is None and self.gamma_controller.kelvin is not None:
+                self.gamma_controller.set_temperature(self.gamma_controller.kelvin) # Only the changed stages are recomputed
+
+        if temperature is not None:
+            temperature = sm.constrain("temperature_kelvin", clamp(temperature, MIN_KELVIN, MAX_KELVIN))
+            self.gamma_controller.set_temperature(temperature)
+            self.settings["temperature_kelvin"] = temperature
+
+        if brightness is not None and self.brightness_controller.is_supported():
+            brightness = sm.constrain("brightness_percent", clamp(brightness, 0, 100))
+            self.brightness_controller.set_brightness(brightness, smooth_transition=False)
+            self.settings["brightness_percent"] = brightness
+
+        self.save_settings()
+        self.color_changed.emit(self.settings.get("temperature_kelvin", 6500), self.settings.get("brightness_percent", 80))
+
+    def color_adjustments(self):
+        """The saved gamma/contrast/dimming adjustments, as GammaController.set_adjustments() arguments."""
+        return {name: self.settings.get(key, 1.0) for name, key in COLOR_ADJUSTMENT_SETTINGS.items()}
+
+    def set_color_adjustments(self, **adjustments):
+        """
+        Applies and saves any of gamma, contrast and dimming (see
+        GammaController.set_adjustments). The current temperature is kept;
+        only the pipeline stages that changed are recomputed.
+        """
+        self.apply_color_settings(adjustments=adjustments)
+
+    def apply_profile(self, profile_name):
+        """
+        Apply a saved profile as a single batched update.
+        Returns True if the profile exists; logs how long the switch took.
+        """
+        start = time.perf_counter()
+        profile_settings = self.settings.get("profiles", {}).get(profile_name)
+        if not profile_settings:
+            logging.warning("Profile '%s' not found in settings.", profile_name)
+            return False
+
+        self.apply_color_settings(profile_settings.get("temperature"), profile_settings.get("brightness"))
+        self.last_profile_switch_ms = (time.perf_counter() - start) * 1000
+        metrics.observe("core.apply_profile", self.last_profile_switch_ms)
+        logging.info("Applied profile '%s' in %.1f ms", profile_name, self.last_profile_switch_ms)
+        return True
+
+
+    # --- Adaptive Brightness ---
+    def set_adaptive_brightness_enabled(self, enabled):
+        """Turns ambient-light brightness on or off. Returns False if it was requested but cannot run."""
+        self.settings["adaptive_brightness_enabled"] = enabled
+        running = self._update_adaptive_brightness()
+        if enabled and not running:
+            self.settings["adaptive_brightness_enabled"] = False
+        self.save_settings()
+        return running == enabled
+
+    def _update_adaptive_brightness(self, source=None):
+        """
+        Starts or stops the adaptive loop to match the setting. `source` overrides
+        the hardware sensor (e.g. a TraceLightSource). Returns True if it is running.
+        """
+        wanted = self.settings.get("adaptive_brightness_enabled", False) and self.brightness_controller.is_supported()
+        if wanted and self.adaptive_brightness is None:
+            source = source or ambient_light.WindowsLightSensorSource.open()
+            if source is None:
+                logging.warning("No ambient light sensor found; adaptive brightness unavailable.")
+                return False
+            self.adaptive_brightness = ambient_light.AdaptiveBrightness(
+                source, self._apply_adaptive_brightness,
+                curve=ambient_light.BrightnessCurve(self.settings.get("adaptive_brightness_curve")),
+                hysteresis=self.settings.get("adaptive_brightness_hysteresis", ambient_light.DEFAULT_HYSTERESIS_PERCENT)
+            )
+            logging.info("Adaptive brightness started.")
+            if self._adaptive_min_interval_ms is not None:
+                self.adaptive_timer.start(0)
+        elif not wanted and self.adaptive_brightness is not None:
+            self.adaptive_timer.stop()
+            self.adaptive_brightness = None
+            logging.info("Adaptive brightness stopped.")
+            self.apply_initial_settings() # Back to the user's saved brightness
+            self.color_changed.emit(self.settings.get("temperature_kelvin", 6500), self.settings.get("brightness_percent", 80))
+        return self.adaptive_brightness is not None
+
+    def _adaptive_brightness_step(self):
+        if self.adaptive_brightness is None or self._adaptive_min_interval_ms is None:
+            return
+        interval = self.adaptive_brightness.step(time.monotonic())
+        self.adaptive_timer.start(max(int(interval * 1000), self._adaptive_min_interval_ms))
+
+    def _set_adaptive_min_interval(self, interval_ms):
+        """Power state cadence for the light sensor: a floor on the sampling interval, or None to pause."""
+        self._adaptive_min_interval_ms = interval_ms
+        if interval_ms is None:
+            self.adaptive_timer.stop()
+        elif self.adaptive_brightness is not None and not self.adaptive_timer.isActive():
+            self.adaptive_timer.start(0) # Resume with a fresh sample
+
+    def _apply_adaptive_brightness(self, level):
+        """
+        Writes a sensor-driven brightness. Not saved: the saved brightness stays
+        the user's own choice, used again when adaptive brightness is turned off.
+        """
+        self.brightness_controller.set_brightness(level, smooth_transition=False)
+        self.color_changed.emit(self.settings.get("temperature_kelvin", 6500), level)
+
+
+    # --- Application Profiles ---
+    def set_app_profiles_enabled(self, enabled):
+        """Turns per-application profiles on or off. Returns False if they were requested but cannot run."""
+        self.settings["app_profiles_enabled"] = enabled
+        running = self._update_app_profiles()
+        if enabled and not running:
+            self.settings["app_profiles_enabled"] = False
+        self.save_settings()
+        return running == enabled
+
+    def _update_app_profiles(self, source=None):
+        """
+        Starts or stops the foreground watcher to match the setting. `source`
+        overrides the WinEvent hook (e.g. a ManualForegroundSource). Returns True
+        if it is running.
+        """
+        wanted = self.settings.get("app_profiles_enabled", False)
+        if wanted and self.foreground_watcher is None:
+            watcher = ForegroundWatcher(self.settings.get("app_profile_rules", []), source,
+                                        self.settings.get("app_profile_debounce_ms", 500), self)
+            if not watcher.start():
+                logging.warning("Foreground window events are unavailable; application profiles disabled.")
+                watcher.deleteLater()
+                return False
+            watcher.profile_changed.connect(self._on_app_profile_changed)
+            self.foreground_watcher = watcher
+            logging.info("Application profiles started.")
+        elif not wanted and self.foreground_watcher is not None:
+            self.foreground_watcher.stop()
+            self.foreground_watcher.deleteLater()
+            self.foreground_watcher = None
+            self._on_app_profile_changed("")
+            logging.info("Application profiles stopped.")
+        return self.foreground_watcher is not None
+
+    def _on_app_profile_changed(self, profile_name):
+        """
+        Applies the foreground application's profile, or restores the saved
+        color when it has none. Neither is saved, so the user's own settings
+        come back as soon as the application loses the foreground.
+        """
+        if profile_name:
+            profile = self.settings.get("profiles", {}).get(profile_name)
+            if not profile:
+                logging.warning("Application profile '%s' not found in settings.", profile_name)
+                return
+            self.app_profile = profile_name
+            self._apply_transient_color(profile.get("temperature"), profile.get("brightness"))
+        elif self.app_profile is not None:
+            self.app_profile = None
+            self._apply_transient_color(self.settings.get("temperature_kelvin", 6500), self.settings.get("brightness_percent", 80))
+
+    def _apply_transient_color(self, temperature, brightness):
+        """
+        Applies a color without touching the settings, within the same policy
+        limits as apply_color_settings(). Brightness is left alone while it
+        follows the light sensor.
+        """
+        if temperature is not None:
+            temperature = sm.constrain("temperature_kelvin", clamp(temperature, MIN_KELVIN, MAX_KELVIN))
+            self.gamma_controller.set_temperature(temperature)
+        else:
+            temperature = self.settings.get("temperature_kelvin", 6500)
+
+        if self.adaptive_brightness is not None:
+            brightness = self.adaptive_brightness.last_written
+        elif brightness is not None and self.brightness_controller.is_supported():
+            brightness = sm.constrain("brightness_percent", clamp(brightness, 0, 100))
+            self.brightness_controller.set_brightness(brightness, smooth_transition=False)
+        if brightness is None:
+            brightness = self.settings.get("brightness_percent", 80)
+        self.color_changed.emit(temperature, brightness)
+
+
+    # --- Reminders ---
+    def set_reminder_enabled(self, enabled):
+        enabled = sm.constrain("reminder_enabled", enabled)
+        self.settings["reminder_enabled"] = enabled
+        if enabled:
+            logging.info("Reminder enabled by user.")
+            self.reminder_manager.start_timer()
+        else:
+            logging.info("Reminder disabled by user.")
+            self.reminder_manager.stop_timer()
+        self._update_rest_overlay()
+        self.save_settings()
+
+    def set_reminder_durations(self, work_hours, rest_minutes):
+        """Update reminder durations and restart the timer if reminders are enabled."""
+        work_hours = sm.constrain("reminder_work_hours", work_hours)
+        rest_minutes = sm.constrain("reminder_rest_minutes", rest_minutes)
+        logging.info(f"Reminder times updated: Work={work_hours}h, Rest={rest_minutes}m")
+        self.settings["reminder_work_hours"] = work_hours
+        self.settings["reminder_rest_minutes"] = rest_minutes
+        self.reminder_manager.set_durations(work_hours, rest_minutes)
+        if self.settings.get("reminder_enabled", False):
+            self.reminder_manager.start_timer()
+        self.save_settings()
+
+    def set_rest_overlay_enabled(self, enabled):
+        """Turns the full-screen overlay shown during rest periods on or off."""
+        self.settings["rest_overlay_enabled"] = sm.constrain("rest_overlay_enabled", enabled)
+        self._update_rest_overlay()
+        self.save_settings()
+
+    def _rest_overlay_wanted(self):
+        return self.settings.get("reminder_enabled", False) and self.settings.get("rest_overlay_enabled", True)
+
+    def _update_rest_overlay(self):
+        """Builds the overlay windows ahead of the next rest, or frees them when no rest will use them."""
+        if self._rest_overlay_wanted():
+            if self.startup_complete:
+                self.rest_overlay.prepare()
+        else:
+            self.rest_overlay.release()
+
+    def _on_rest_period_started(self, seconds):
+        if self._rest_overlay_wanted():
+            self.rest_overlay.show_rest(seconds)
+
+
+    # --- Hotkey Handling ---
+    @metrics.timed("hotkey.handle")
+    def handle_hotkey_press(self, hotkey_str):
+        """Applies the profile associated with the pressed hotkey."""
+        logging.info("Hotkey pressed: %s", hotkey_str)
+        profile_name = self.settings.get("hotkeys", {}).get(hotkey_str)
+
+        if not profile_name:
+            logging.warning("No profile associated with hotkey: %s", hotkey_str)
+            return
+
+        logging.info("Applying profile '%s' triggered by hotkey %s", profile_name, hotkey_str)
+        self.apply_profile(profile_name)
+
+
+    # --- Commands From Other Launches ---
+    def handle_remote_command(self, command):
+        """Carry out an action forwarded by a later launch (see single_instance)."""
+        self.complete_startup() # The user is interacting; stop deferring
+        action = command.get("action")
+        if action == single_instance.ACTION_SHOW:
+            self.show_window()
+        elif action == single_instance.ACTION_APPLY_PROFILE:
+            self.apply_profile(command.get("profile"))
+        elif action == single_instance.ACTION_PAUSE_REMINDERS:
+            self.reminder_manager.pause()
+        elif action == single_instance.ACTION_RESUME_REMINDERS:
+            self.reminder_manager.resume()
+        elif action == single_instance.ACTION_SET_COLOR:
+            self.apply_color_settings(command.get("temperature"), command.get("brightness"))
+        else:
+            logging.warning(f"Ignoring unknown forwarded command: {command}")
+
+
+    # --- Usage Statistics ---
+    @metrics.timed("stats.checkpoint")
+    def checkpoint_usage_stats(self):
+        """Record usage and rest periods accumulated since the last checkpoint."""
+        try:
+            rests_total = self.reminder_manager.get_rest_periods_today()
+            if not self.usage_checkpointer.checkpoint(rests_total):
+                logging.warning("Usage checkpoint incomplete; the remainder will be retried at the next checkpoint.")
+        except Exception as e:
+            logging.error("Failed to record usage statistics: %s", e)
+
+    @metrics.timed("stats.record_activity_minute")
+    def record_activity_minute(self):
+        """Record this minute's work/rest state in the activity timeline."""
+        resting = self.reminder_manager.state == ReminderManager.STATE_RESTING
+        stats_manager.record_activity_minute(resting)
+
+
+    # --- Window Lifecycle ---
+    def show_window(self):
+        """Shows the main window, building it first if it was destroyed."""
+        if self.window is None:
+            from main_window import MainWindow # Widgets module is only needed while a window exists
+            self.window = MainWindow(self)
+            self.window.destroyed.connect(self._on_window_destroyed)
+            logging.info("MainWindow created.")
+        self.window.showNormal()
+        self.window.raise_()
+        self.window.activateWindow()
+        return self.window
+
+    def _on_window_destroyed(self):
+        self.window = None
+        if self.resident:
+            logging.info("Main window destroyed; running in the tray.")
+            if self.tray_icon is not None and not self._tray_hint_shown:
+                self._tray_hint_shown = True
+                self.tray_icon.showMessage("护目君", "护目君仍在托盘中运行。", QSystemTrayIcon.MessageIcon.Information, 3000)
+            # Let the deferred widget deletions run before trimming
+            QTimer.singleShot(0, self._trim_memory)
+
+    def _trim_memory(self):
+        QPixmapCache.clear() # Icons and styled pixmaps cached for the destroyed widgets
+        memory_usage.trim_working_set()
+        logging.info(f"Working set in tray mode: {memory_usage.format_bytes(memory_usage.get_working_set_bytes())}")
+
+
+    # --- Tray ---
+    def set_tray_enabled(self, enabled):
+        """Shows or removes the tray icon; with it, closing the window keeps the app running."""
+        self.settings["tray_enabled"] = enabled
+        self.save_settings()
+        self._update_tray()
+
+    def _update_tray(self):
+        wanted = self.settings.get("tray_enabled", True) and QSystemTrayIcon.isSystemTrayAvailable()
+        if wanted and self.tray_icon is None:
+            from tray_icon import TrayIcon
+            self.tray_icon = TrayIcon(self)
+            self.tray_icon.show()
+        elif not wanted and self.tray_icon is not None:
+            self.tray_icon.hide()
+            self.tray_icon.deleteLater()
+            self.tray_icon = None
+        self.resident = self.tray_icon is not None
+        app = QApplication.instance()
+        if app is not None:
+            app.setQuitOnLastWindowClosed(not self.resident)
+        return self.resident
+
+    def enable_tray(self):
+        """Creates the tray icon if enabled in settings and supported. Returns True if the app is tray-resident."""
+        if not self._update_tray() and self.settings.get("tray_enabled", True):
+            logging.warning("System tray is not available; closing the window will exit the application.")
+        return self.resident
+
+
+    # --- Shutdown ---
+    def shutdown(self):
+        """Stops listeners and timers and records final statistics. Safe to call more than once."""
+        if self._shut_down:
+            return
+        self._shut_down = True
+        if self.window is not None:
+            self.window.close() # Commits pending slider previews
+        if self._startup_gate_timer is not None:
+            self._startup_gate_timer.stop()
+        logging.info("Stopping hotkey listener...")
+        self.hotkey_manager.stop_listening()
+
+        # Only the time since the last periodic checkpoint is recorded here
+        self.checkpoint_timer.stop()
+        self.activity_timer.stop()
+        self.adaptive_timer.stop()
+        if self.foreground_watcher is not None:
+            self.foreground_watcher.stop()
+        self.reminder_manager.timer.stop()
+        self.rest_overlay.release()
+        self.power_state.stop()
+        logging.info("Background wakeups per hour by power mode: %s", self.power_state.wakeup_report())
+        logging.info("Recording final usage checkpoint.")
+        self.checkpoint_usage_stats()
+        timeline = stats_manager.get_activity_timeline()
+        if timeline is not None:
+            timeline.flush()
+
+        logging.info("Saving final settings.")
+        self.save_settings()
+        if metrics.is_enabled():
+            metrics.write_json(get_metrics_path())
+        if self.tray_icon is not None:
+            self.tray_icon.hide()
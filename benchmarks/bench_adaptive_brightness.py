@@ -0,0 +1,77 @@
+# -*- coding: utf-8 -*-
+"""
+Replays an ambient-light trace through AdaptiveBrightness on simulated time
+and counts sensor reads and brightness (WMI) writes, compared with a naive
+loop that reads once a second and writes whenever the mapped brightness
+changes.
+
+The default trace is synthetic: three hours of afternoon light with passing
+clouds and sensor noise, a sunset, then a desk lamp switched on and off.
+Pass a recorded CSV trace (`seconds,lux` rows) with --trace.
+
+Run from the project root: python benchmarks/bench_adaptive_brightness.py [--trace FILE]
+"""
+
+import os
+import sys
+import math
+import random
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import ambient_light
+
+def synthetic_trace(seed=7):
+    """Returns [(seconds, lux)] at 1 Hz."""
+    rng = random.Random(seed)
+    samples = []
+    for second in range(3 * 3600):
+        if second < 7200:
+            lux = 800 - second * 0.05 # Slowly fading afternoon light
+            if (second // 300) % 3 == 1:
+                lux *= 0.6 + 0.1 * math.sin(second / 7) # A cloud passing
+        else:
+            lux = max(5.0, 440 * (1 - (second - 7200) / 1800)) # Sunset
+            if 9000 <= second < 10200:
+                lux += 300 # Desk lamp
+        samples.append((second, max(0.0, lux * rng.uniform(0.95, 1.05)))) # Sensor noise
+    return samples
+
+def run_adaptive(samples):
+    source = ambient_light.TraceLightSource(samples, start=0.0)
+    writes = []
+    adaptive = ambient_light.AdaptiveBrightness(source, writes.append)
+    end = samples[-1][0]
+    now = 0.0
+    while now <= end:
+        now += adaptive.step(now)
+    return adaptive.samples, writes
+
+def run_naive(samples):
+    curve = ambient_light.BrightnessCurve()
+    writes = []
+    for _, lux in samples:
+        level = curve.brightness_for(lux)
+        if not writes or writes[-1] != level:
+            writes.append(level)
+    return len(samples), writes
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay a lux trace through adaptive brightness.")
+    parser.add_argument("--trace", help="CSV file of seconds,lux rows")
+    args = parser.parse_args()
+
+    samples = ambient_light.TraceLightSource.from_file(args.trace) if args.trace else None
+    samples = list(zip(samples.times, samples.values)) if samples else synthetic_trace()
+    minutes = samples[-1][0] / 60
+
+    naive_reads, naive_writes = run_naive(samples)
+    reads, writes = run_adaptive(samples)
+    print(f"trace: {len(samples)} samples over {minutes:.0f} minutes")
+    print(f"naive (1 Hz, write on any change): {naive_reads:6d} reads {len(naive_writes):6d} writes")
+    print(f"adaptive (filter + hysteresis):    {reads:6d} reads {len(writes):6d} writes")
+    print(f"adaptive brightness levels written: {writes}")
+
+if __name__ == "__main__":
+    main()
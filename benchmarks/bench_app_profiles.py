@@ -0,0 +1,75 @@
+# -*- coding: utf-8 -*-
+"""
+Per-application profile resolution and switch debouncing.
+
+    rule lookup: naive fnmatch loop over every rule vs the compiled
+        ProfileRuleMatcher, cold (first sight of a name) and cached
+    an Alt-Tab storm of foreground events through ForegroundWatcher, counting
+        the profile switches (gamma writes) that reach the core
+
+Run from the project root: python benchmarks/bench_app_profiles.py
+"""
+
+import os
+import sys
+import time
+import fnmatch
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from PySide6.QtCore import QCoreApplication, QTimer, QEventLoop
+
+import settings_manager as sm
+from foreground_watcher import ForegroundWatcher, ManualForegroundSource, ProfileRuleMatcher
+
+LOOKUPS = 100000
+STORM_EVENTS = 200
+
+PROCESS_NAMES = ["explorer.exe", "chrome.exe", "Photoshop.exe", "code.exe", "SumatraPDF.exe",
+                 "Lightroom.exe", "slack.exe", "teams.exe", "AcroRd32.exe", "notepad.exe"]
+
+def rules():
+    # The default rules plus a realistic number of user rules
+    extra = [{"process": f"tool{i}*.exe", "profile": "Reading"} for i in range(30)]
+    return sm.get_default_settings()["app_profile_rules"] + extra
+
+def naive_match(rule_list, process_name):
+    name = process_name.lower()
+    for rule in rule_list:
+        if fnmatch.fnmatchcase(name, rule["process"].lower()):
+            return rule["profile"]
+    return None
+
+def per_lookup_us(func):
+    start = time.perf_counter()
+    for i in range(LOOKUPS):
+        func(PROCESS_NAMES[i % len(PROCESS_NAMES)])
+    return (time.perf_counter() - start) / LOOKUPS * 1e6
+
+def main():
+    rule_list = rules()
+    print(f"{len(rule_list)} rules, {len(PROCESS_NAMES)} distinct process names")
+    print(f"naive fnmatch loop:      {per_lookup_us(lambda name: naive_match(rule_list, name)):7.3f} us/lookup")
+    matcher = ProfileRuleMatcher(rule_list)
+    regex = matcher._regex
+    print(f"compiled, uncached:      {per_lookup_us(lambda name: regex.match(name.lower())):7.3f} us/lookup")
+    print(f"compiled, cached:        {per_lookup_us(matcher.match):7.3f} us/lookup")
+
+    if QCoreApplication.instance() is None:
+        QCoreApplication([]) # For the debounce timer; PySide keeps it alive
+    source = ManualForegroundSource()
+    watcher = ForegroundWatcher(rule_list, source, debounce_ms=100)
+    switches = []
+    watcher.profile_changed.connect(switches.append)
+    watcher.start()
+    for i in range(STORM_EVENTS):
+        source.activate(PROCESS_NAMES[i % len(PROCESS_NAMES)])
+    source.activate("Photoshop.exe")
+    loop = QEventLoop()
+    QTimer.singleShot(300, loop.quit)
+    loop.exec()
+    watcher.stop()
+    print(f"Alt-Tab storm: {STORM_EVENTS + 1} foreground events -> {len(switches)} profile switch(es) {switches}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+# -*- coding: utf-8 -*-
+"""
+Load test for the JSON-RPC control server.
+
+Runs a ControlServer in a QCoreApplication against a stand-in AppCore (no
+display, gamma or WMI access), hammers it from several client threads and
+reports throughput, latency and how many color updates/saves the batches
+collapsed into. The batches mix every color method, so the stand-in has to
+keep up with the real AppCore's signatures or the errors show in the report.
+
+Run from the project root: python benchmarks/bench_control_api.py [clients] [requests_per_client]
+"""
+
+import os
+import sys
+import time
+import threading
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from PySide6.QtCore import QCoreApplication, QTimer
+
+from control_server import ControlServer
+from control_client import ControlClient
+
+class FakeBrightness:
+    def is_supported(self):
+        return True
+
+class FakeReminders:
+    state = "idle"
+    paused = False
+
+    def pause(self):
+        self.paused = True
+
+    def resume(self):
+        self.paused = False
+
+class FakeCore:
+    """Implements the parts of AppCore that ControlApi touches."""
+
+    def __init__(self):
+        self.settings = {
+            "temperature_kelvin": 6500, "brightness_percent": 80,
+            "profiles": {"Night Mode": {"temperature": 3400, "brightness": 60}},
+            "color_gamma": 1.0, "color_contrast": 1.0, "color_dimming": 1.0,
+        }
+        self.brightness_controller = FakeBrightness()
+        self.reminder_manager = FakeReminders()
+        self.color_updates = 0
+
+    def apply_color_settings(self, temperature=None, brightness=None, adjustments=None):
+        self.color_updates += 1 # One ramp write, one brightness write and one save in the real core
+        if temperature is not None:
+            self.settings["temperature_kelvin"] = temperature
+        if brightness is not None:
+            self.settings["brightness_percent"] = brightness
+        for name, value in (adjustments or {}).items():
+            self.settings[f"color_{name}"] = value
+
+    def color_adjustments(self):
+        return {name: self.settings[f"color_{name}"] for name in ("gamma", "contrast", "dimming")}
+
+def client_worker(requests, latencies, errors):
+    try:
+        with ControlClient() as client:
+            for i in range(requests):
+                start = time.perf_counter()
+                if i % 4 == 3:
+                    responses = client.batch([
+                        ("set_temperature", {"kelvin": 3000 + i % 3000}),
+                        ("set_brightness", {"percent": i % 101}),
+                        ("set_color_adjustments", {"contrast": 1.0 + (i % 5) / 10}),
+                        ("get_state", None),
+                    ])
+                    failed = [response for response in responses if response is None or "error" in response]
+                    if failed:
+                        raise RuntimeError(f"Batch failed: {failed[0]!r}") # batch() returns errors instead of raising
+                else:
+                    client.call("set_temperature", {"kelvin": 2500 + i % 4000})
+                latencies.append(time.perf_counter() - start)
+    except Exception as e:
+        errors.append(e)
+
+def main():
+    clients = int(sys.argv[1]) if len(sys.argv) > 1 else 8
+    per_client = int(sys.argv[2]) if len(sys.argv) > 2 else 500
+
+    app = QCoreApplication(sys.argv)
+    core = FakeCore()
+    server = ControlServer(core)
+    if not server.start():
+        sys.exit(1)
+
+    latencies, errors = [], []
+    threads = [threading.Thread(target=client_worker, args=(per_client, latencies, errors)) for _ in range(clients)]
+    result = {}
+
+    def run_clients():
+        start = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        result["elapsed"] = time.perf_counter() - start
+        app.quit()
+
+    # Clients run on a plain thread so the Qt event loop stays free to serve them
+    QTimer.singleShot(0, lambda: threading.Thread(target=run_clients, daemon=True).start())
+    app.exec()
+    server.stop()
+
+    total = len(latencies)
+    latencies.sort()
+    print(f"clients: {clients}, requests: {total}, errors: {len(errors)}")
+    if errors:
+        print(f"first error: {errors[0]!r}")
+    if total:
+        print(f"throughput: {total / result['elapsed']:.0f} req/s")
+        print(f"latency p50: {latencies[total // 2] * 1000:.2f} ms, p99: {latencies[int(total * 0.99)] * 1000:.2f} ms")
+    print(f"color updates applied: {core.color_updates} (batches fold to one update each)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+# -*- coding: utf-8 -*-
+"""
+Scaling of the fleet statistics aggregator (stats_cli.py fleet).
+
+Builds a synthetic collection tree (one directory per user, a year of daily
+summary rows each plus a few uncompacted events), then aggregates it with
+0 (in-process), 1, 2, ... up to every core's worth of workers, reporting the
+throughput and the speed-up over one worker. Each run is a fresh
+interpreter so its peak memory can be reported on its own.
+
+Run from the project root: python benchmarks/bench_fleet_stats.py [users] [days]
+"""
+
+import os
+import sys
+import csv
+import random
+import datetime
+import tempfile
+import subprocess
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import stats_manager
+
+CHILD = """
+import sys, time
+start = time.perf_counter()
+import fleet_stats
+daily, users = fleet_stats.aggregate(sys.argv[1], workers=int(sys.argv[2]))
+elapsed = time.perf_counter() - start
+peak_kb = 0
+try:
+    import resource
+    peak_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss # Parent process only; kilobytes on Linux
+except ImportError:
+    pass
+print(elapsed, users, len(daily), peak_kb)
+"""
+
+def build_tree(root, users, days, seed=7):
+    rng = random.Random(seed)
+    first_day = datetime.date(2025, 1, 1)
+    for user in range(users):
+        user_dir = os.path.join(root, f"host{user // 10:04d}", f"user{user % 10}")
+        os.makedirs(user_dir)
+        with open(os.path.join(user_dir, stats_manager.STATS_FILE), 'w', newline='', encoding='utf-8') as f:
+            writer = csv.writer(f)
+            writer.writerow(stats_manager.CSV_HEADER)
+            for offset in range(days):
+                usage = rng.randint(0, 9 * 3600)
+                writer.writerow([(first_day + datetime.timedelta(days=offset)).isoformat(), usage, rng.randint(0, usage // 3600 + 1)])
+        with open(os.path.join(user_dir, stats_manager.EVENTS_FILE), 'w', newline='', encoding='utf-8') as f:
+            writer = csv.writer(f)
+            writer.writerow(stats_manager.EVENT_HEADER)
+            for _ in range(5):
+                writer.writerow([(first_day + datetime.timedelta(days=days)).isoformat(), rng.randint(60, 3600), rng.randint(0, 1)])
+
+def main():
+    users = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    days = int(sys.argv[2]) if len(sys.argv) > 2 else 365
+    cores = os.cpu_count() or 1
+    with tempfile.TemporaryDirectory(prefix="bench_fleet_stats_") as root: # Removed even if a run fails
+        build_tree(root, users, days)
+        print(f"{users} users x {days} days ({users * days} rows), {cores} core(s)")
+
+        worker_counts = [0] + sorted({1, 2, 4, cores} & set(range(1, cores + 1)))
+        single = None
+        for workers in worker_counts:
+            result = subprocess.run([sys.executable, "-c", CHILD, root, str(workers)], cwd=ROOT,
+                                    capture_output=True, text=True, check=True)
+            elapsed, user_count, day_count, peak_kb = result.stdout.split()
+            elapsed = float(elapsed)
+            if workers == 1:
+                single = elapsed
+            speedup = f"{single / elapsed:4.2f}x vs 1 worker" if single else ""
+            print(f"workers={workers}: {elapsed:6.2f} s  {int(user_count) * days / elapsed / 1e6:5.2f} M rows/s  "
+                  f"peak {int(peak_kb) / 1024:5.1f} MB  {day_count} days  {speedup}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+# -*- coding: utf-8 -*-
+"""
+Wall-clock comparison of the headless CLI against the GUI path.
+
+Each run is a fresh interpreter that applies the currently saved color
+temperature (so the screen does not visibly change):
+
+    headless: python main.py set --kelvin <current>
+    gui:      QApplication + AppCore + MainWindow + apply_color_settings, then exit
+              (what a login script paid before the headless mode existed)
+
+Run from the project root with the application closed (a running instance
+would receive the forwarded command instead):
+    python benchmarks/bench_headless_cli.py [runs]
+"""
+
+import os
+import sys
+import time
+import subprocess
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+GUI_CHILD_FLAG = "--gui-child"
+
+def gui_child(kelvin):
+    """The GUI path, run in a child process."""
+    from PySide6.QtWidgets import QApplication
+    from app_core import AppCore
+    app = QApplication(sys.argv[:1])
+    core = AppCore()
+    core.show_window()
+    core.apply_color_settings(kelvin)
+    core.shutdown()
+    app.processEvents()
+    assert "PySide6" in sys.modules
+
+_reported_failures = set()
+
+def time_run(cmd):
+    start = time.perf_counter()
+    result = subprocess.run(cmd, cwd=ROOT, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    elapsed = time.perf_counter() - start
+    if result.returncode != 0 and cmd[1] not in _reported_failures:
+        # Expected without gamma support (non-Windows); the timing is still meaningful
+        _reported_failures.add(cmd[1])
+        print(f"note: {' '.join(cmd[1:])} exited with {result.returncode}")
+    return elapsed
+
+def main():
+    if len(sys.argv) > 2 and sys.argv[1] == GUI_CHILD_FLAG:
+        gui_child(int(sys.argv[2]))
+        return
+
+    import settings_manager as sm
+    runs = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+    kelvin = str(sm.load_settings().get("temperature_kelvin", 6500))
+
+    commands = {
+        "headless": [sys.executable, "main.py", "set", "--kelvin", kelvin],
+        "gui": [sys.executable, os.path.abspath(__file__), GUI_CHILD_FLAG, kelvin],
+    }
+    results = {}
+    for name, cmd in commands.items():
+        time_run(cmd) # Warm the OS file cache
+        times = sorted(time_run(cmd) for _ in range(runs))
+        results[name] = times[len(times) // 2]
+        print(f"{name:9s} median {results[name] * 1000:7.1f} ms  (min {times[0] * 1000:.1f}, max {times[-1] * 1000:.1f}, {runs} runs)")
+    print(f"headless is {results['gui'] / results['headless']:.1f}x faster")
+
+    # The headless path must not pull in Qt
+    check = subprocess.run(
+        [sys.executable, "-c",
+         f"import sys, headless_cli; headless_cli.run(['set', '--kelvin', '{kelvin}']); "
+         "sys.exit('PySide6' in sys.modules)"],
+        cwd=ROOT)
+    print("headless imports PySide6: " + ("yes (FAIL)" if check.returncode else "no"))
+    sys.exit(check.returncode)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+# -*- coding: utf-8 -*-
+"""
+Import-time regression check for the GUI entry module.
+
+Runs `python -X importtime -c "import <module>"` in fresh interpreters and
+compares the result with benchmarks/import_budget.json:
+  * the best cumulative import time must stay under max_cumulative_ms;
+  * none of deferred_modules may be imported at import time (they are meant
+    to be loaded lazily through lazy_import).
+
+Run from the project root: python benchmarks/bench_import_time.py [--runs N] [--top N]
+Exits with status 1 when the budget is exceeded.
+"""
+
+import os
+import sys
+import json
+import argparse
+import subprocess
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BUDGET_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "import_budget.json")
+
+def run_importtime(module):
+    """Returns [(name, self_us, cumulative_us)] from one -X importtime run."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=PROJECT_ROOT, capture_output=True, text=True
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"Importing {module} failed:\n{result.stderr}")
+    entries = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        entries.append((name.strip(), int(self_us), int(cumulative_us)))
+    return entries
+
+def main():
+    parser = argparse.ArgumentParser(description="Import-time budget check")
+    parser.add_argument("--runs", type=int, default=5, help="Fresh interpreter runs (best is kept)")
+    parser.add_argument("--top", type=int, default=15, help="Slowest imports to list")
+    args = parser.parse_args()
+
+    with open(BUDGET_PATH, 'r', encoding='utf-8') as f:
+        budget = json.load(f)
+    module = budget["module"]
+
+    best_ms, best_entries = None, None
+    for _ in range(args.runs):
+        entries = run_importtime(module)
+        cumulative = next(cum for name, _, cum in reversed(entries) if name == module) / 1000
+        if best_ms is None or cumulative < best_ms:
+            best_ms, best_entries = cumulative, entries
+
+    print(f"import {module}: {best_ms:.1f} ms (best of {args.runs}, budget {budget['max_cumulative_ms']} ms)")
+    print("\nSlowest imports (cumulative):")
+    for name, _, cumulative in sorted(best_entries, key=lambda e: e[2], reverse=True)[:args.top]:
+        print(f"  {cumulative / 1000:8.1f} ms  {name}")
+
+    failures = []
+    if best_ms > budget["max_cumulative_ms"]:
+        failures.append(f"import {module} took {best_ms:.1f} ms, over the {budget['max_cumulative_ms']} ms budget")
+    imported = {name for name, _, _ in best_entries}
+    for deferred in budget.get("deferred_modules", []):
+        eager = sorted(name for name in imported if name == deferred or name.startswith(deferred + "."))
+        if eager:
+            failures.append(f"'{deferred}' is imported eagerly: {', '.join(eager)}")
+
+    if failures:
+        print("\nBudget exceeded:")
+        for failure in failures:
+            print(f"  - {failure}")
+        return 1
+    print("\nWithin budget.")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,89 @@
+# -*- coding: utf-8 -*-
+"""
+Caller-side cost of logging on a hot path (what a slider drag or the hotkey
+thread pays per call):
+
+    disabled debug, f-string vs lazy %s arguments
+    enabled info, synchronous file handler vs the queued pipeline
+    enabled info with a stalling sink (slow disk, antivirus scan, blocked
+        console), synchronous vs queued
+    a call site hammered past the rate limit
+
+On a single core the queued pipeline costs about as much per call as a fast
+local file, since the writer thread competes for the GIL; what it buys is
+that a stalled sink no longer stalls the caller.
+
+Run from the project root: python benchmarks/bench_logging.py
+"""
+
+import os
+import sys
+import time
+import logging
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import log_setup
+
+CALLS = 20000
+STALL_CALLS = 200
+STALL_SECONDS = 0.002
+
+class StallingHandler(logging.Handler):
+    """A sink that blocks for STALL_SECONDS per record."""
+
+    def emit(self, record):
+        self.format(record)
+        time.sleep(STALL_SECONDS)
+SETTINGS = {"temperature_kelvin": 4500, "brightness_percent": 60, "profiles": {str(i): {"temperature": 6500} for i in range(20)}}
+
+def per_call_us(func, calls=CALLS):
+    start = time.perf_counter()
+    for i in range(calls):
+        func(i)
+    return (time.perf_counter() - start) / calls * 1e6
+
+def main():
+    root = logging.getLogger()
+    tmp_dir = tempfile.mkdtemp()
+
+    root.setLevel(logging.INFO)
+    root.addHandler(logging.NullHandler()) # Keeps logging.debug() from calling basicConfig(); replaced by setup_logging
+    print(f"disabled debug, f-string:   {per_call_us(lambda i: logging.debug(f'Saving settings: {SETTINGS}')):8.2f} us/call")
+    print(f"disabled debug, lazy %s:    {per_call_us(lambda i: logging.debug('Saving settings: %s', SETTINGS)):8.2f} us/call")
+
+    # Synchronous file handler on the calling thread (the old basicConfig behavior, but to disk)
+    file_handler = logging.FileHandler(os.path.join(tmp_dir, "sync.log"), encoding='utf-8')
+    root.addHandler(file_handler)
+    sync_us = per_call_us(lambda i: logging.info("Setting brightness directly to %s%%", i % 101))
+    root.removeHandler(file_handler)
+    file_handler.close()
+    print(f"enabled info, synchronous:  {sync_us:8.2f} us/call")
+
+    stalling_handler = StallingHandler()
+    root.addHandler(stalling_handler)
+    stall_sync_us = per_call_us(lambda i: logging.info("Setting brightness directly to %s%%", i % 101), STALL_CALLS)
+    root.removeHandler(stalling_handler)
+    print(f"stalling sink, synchronous: {stall_sync_us:8.2f} us/call")
+
+    # Queued pipeline; vary the line so the rate limit does not drop these records
+    log_setup.setup_logging(log_file=os.path.join(tmp_dir, "queued.log"), console=False)
+    log_setup._rate_limit_filter.burst = CALLS
+    queued_us = per_call_us(lambda i: logging.info("Setting brightness directly to %s%%", i % 101))
+    print(f"enabled info, queued:       {queued_us:8.2f} us/call")
+    log_setup.shutdown_logging()
+
+    log_setup.setup_logging(log_file=False, console=False)
+    log_setup._listener.handlers = (stalling_handler,)
+    log_setup._rate_limit_filter.burst = CALLS
+    stall_queued_us = per_call_us(lambda i: logging.info("Setting brightness directly to %s%%", i % 101), STALL_CALLS)
+    print(f"stalling sink, queued:      {stall_queued_us:8.2f} us/call")
+
+    log_setup._rate_limit_filter.burst = log_setup.RATE_LIMIT_BURST
+    limited_us = per_call_us(lambda i: logging.info("Hotkey detected: %s", "<ctrl>+<alt>+1"))
+    print(f"enabled info, rate-limited: {limited_us:8.2f} us/call")
+    log_setup.shutdown_logging()
+
+if __name__ == "__main__":
+    main()
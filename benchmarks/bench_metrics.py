@@ -0,0 +1,58 @@
+# -*- coding: utf-8 -*-
+"""
+Per-call overhead of the metrics instrumentation on an instrumented hot path:
+
+    bare call (no instrumentation)
+    @metrics.timed and metrics.measure() while metrics are disabled
+    the same while enabled
+
+Disabled instrumentation should cost a fraction of a microsecond, i.e.
+nothing next to a gamma ramp write or a WMI call.
+
+Run from the project root: python benchmarks/bench_metrics.py
+"""
+
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import metrics
+
+CALLS = 200000
+
+def work():
+    return None
+
+@metrics.timed("bench.timed")
+def timed_work():
+    return None
+
+def measured_work():
+    with metrics.measure("bench.measure"):
+        return None
+
+def per_call_us(func):
+    start = time.perf_counter()
+    for _ in range(CALLS):
+        func()
+    return (time.perf_counter() - start) / CALLS * 1e6
+
+def main():
+    bare_us = per_call_us(work)
+    print(f"bare call:                 {bare_us:6.3f} us/call")
+
+    metrics.disable()
+    print(f"@timed, disabled:          {per_call_us(timed_work) - bare_us:+6.3f} us/call")
+    print(f"measure(), disabled:       {per_call_us(measured_work) - bare_us:+6.3f} us/call")
+
+    metrics.enable()
+    print(f"@timed, enabled:           {per_call_us(timed_work) - bare_us:+6.3f} us/call")
+    print(f"measure(), enabled:        {per_call_us(measured_work) - bare_us:+6.3f} us/call")
+
+    histogram = metrics.snapshot()["histograms"]["bench.timed"]
+    print(f"recorded {histogram['count']} samples, p50 <= {histogram['p50_ms']} ms, max {histogram['max_ms']} ms")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+# -*- coding: utf-8 -*-
+"""
+Background wakeups per hour in each power mode.
+
+Runs the reminder countdown and the hotkey listener thread under a
+PowerStateService driven by a ManualPowerSource, spending the same real time
+in each mode (AC, battery, display off), and prints the service's measured
+wakeups per hour next to the fixed rates before power-aware scheduling
+(a 1 Hz reminder tick and a 10 Hz listener loop in every mode).
+
+pynput is replaced by a listener stand-in, so this runs without a keyboard
+hook or a display. Minute-scale cadences (reminder status on battery) need
+runs of a few minutes to register.
+
+Run from the project root: python benchmarks/bench_power_state.py [seconds per mode]
+"""
+
+import os
+import sys
+import types
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from PySide6.QtCore import QCoreApplication, QTimer, QEventLoop
+
+import hotkey_manager
+import reminder_manager
+from power_state import PowerStateService, ManualPowerSource, MODES, MODE_AC, MODE_BATTERY, MODE_DISPLAY_OFF
+
+BEFORE_PER_HOUR = {"reminder": 3600, "hotkey": 36000} # QTimer at 1 s, time.sleep(0.1) loop
+
+class StandInListener:
+    """Enough of pynput's keyboard.Listener for HotkeyManager's thread: runs until stopped."""
+
+    def __init__(self, on_press=None, on_release=None):
+        self.running = True
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.running = False
+
+    def stop(self):
+        self.running = False
+
+def run_for(seconds):
+    loop = QEventLoop()
+    QTimer.singleShot(int(seconds * 1000), loop.quit)
+    loop.exec()
+
+def main():
+    seconds = float(sys.argv[1]) if len(sys.argv) > 1 else 5
+    if QCoreApplication.instance() is None:
+        QCoreApplication([]) # For the timers and the event loop; PySide keeps it alive
+    hotkey_manager.keyboard = types.SimpleNamespace(Listener=StandInListener)
+
+    source = ManualPowerSource()
+    service = PowerStateService(source)
+    service.start()
+
+    reminders = reminder_manager.ReminderManager()
+    null_signal = types.SimpleNamespace(emit=lambda *args: None) # Measure the scheduler, not signal dispatch
+    reminders.status_updated = reminders.rest_period_started = reminders.rest_period_ended = null_signal
+    service.register("reminder", reminder_manager.STATUS_CADENCES_MS, reminders.set_status_interval, timer=reminders.timer)
+    reminders.start_timer()
+
+    hotkeys = hotkey_manager.HotkeyManager({"<ctrl>+<alt>+1": "Night Mode"})
+    hotkeys._parse_hotkey = lambda hotkey_string: set()
+    client = service.register("hotkey", hotkey_manager.POLL_CADENCES_MS, hotkeys.set_poll_interval)
+    hotkeys.on_wakeup = client.record_wakeup
+    hotkeys.start_listening()
+
+    for mode, (on_battery, display_on) in ((MODE_AC, (False, True)), (MODE_BATTERY, (True, True)),
+                                           (MODE_DISPLAY_OFF, (True, False))):
+        source.set_state(on_battery, display_on)
+        hotkeys.stop_listening() # Restart the listener loop so the new cadence applies at once
+        hotkeys.start_listening()
+        run_for(seconds)
+
+    hotkeys.stop_listening()
+    reminders.stop_timer()
+    report = service.wakeup_report()
+    print(f"{seconds:g} s per mode; wakeups per hour (before: same rate in every mode)")
+    print(f"{'client':10s}" + "".join(f"{mode:>14s}" for mode in MODES) + f"{'before':>10s}")
+    for name, modes in report.items():
+        rates = "".join(f"{modes.get(mode, {}).get('per_hour', 0):14.1f}" for mode in MODES)
+        print(f"{name:10s}{rates}{BEFORE_PER_HOUR.get(name, 0):10d}")
+
+if __name__ == "__main__":
+    main()
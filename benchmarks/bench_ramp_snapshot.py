@@ -0,0 +1,73 @@
+# -*- coding: utf-8 -*-
+"""
+Time from process start until the saved color temperature can reach the
+display, with and without the gamma ramp snapshot.
+
+Each run is a fresh interpreter:
+
+    snapshot: the modules main.py imports before the restore, then
+              ramp_snapshot's map-and-validate (everything except the
+              SetDeviceGammaRamp call itself, which only exists on Windows)
+    full:     QApplication + AppCore up to the point where the saved
+              temperature has been computed and written (the old path)
+
+The settings and snapshot live in a temporary home directory.
+
+Run from the project root: python benchmarks/bench_ramp_snapshot.py [runs]
+"""
+
+import os
+import sys
+import tempfile
+import subprocess
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+SNAPSHOT_CHILD = """
+import time
+start = time.perf_counter()
+import startup_profiler, single_instance, headless_cli, log_setup, ramp_snapshot, mmap
+with open(ramp_snapshot.get_snapshot_path(), 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_COPY) as view:
+    assert ramp_snapshot._validate(view) is not None
+print((time.perf_counter() - start) * 1000)
+"""
+
+FULL_CHILD = """
+import time
+start = time.perf_counter()
+from PySide6.QtWidgets import QApplication
+app = QApplication([])
+from app_core import AppCore
+core = AppCore() # Applies the saved settings in its constructor
+print((time.perf_counter() - start) * 1000)
+core.shutdown()
+"""
+
+def run_child(code, env):
+    result = subprocess.run([sys.executable, "-c", code], cwd=ROOT, env=env, capture_output=True, text=True)
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr.strip().splitlines()[-1])
+    return float(result.stdout.strip().splitlines()[-1])
+
+def main():
+    runs = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+    home = tempfile.mkdtemp(prefix="bench_ramp_snapshot_")
+    env = dict(os.environ, HOME=home, XDG_DATA_HOME=os.path.join(home, "data"), QT_QPA_PLATFORM="offscreen")
+
+    # Write a snapshot for the benchmark's settings directory
+    subprocess.run([sys.executable, "-c",
+                    "import ramp_snapshot, gamma_controller; "
+                    "ramp_snapshot.save(bytes(gamma_controller.GammaController()._build_ramp(3500)), 3500)"],
+                   cwd=ROOT, env=env, check=True, capture_output=True)
+
+    results = {}
+    for name, code in (("snapshot", SNAPSHOT_CHILD), ("full", FULL_CHILD)):
+        run_child(code, env) # Warm the OS file cache
+        times = sorted(run_child(code, env) for _ in range(runs))
+        results[name] = times[len(times) // 2]
+        print(f"{name:9s} median {results[name]:7.1f} ms to color  (min {times[0]:.1f}, max {times[-1]:.1f}, {runs} runs)")
+    print(f"the snapshot restores the color {results['full'] / results['snapshot']:.0f}x sooner")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+# -*- coding: utf-8 -*-
+"""
+Latency of showing the rest overlay, and the cost of one countdown repaint.
+
+Compares show_rest() on windows prepared ahead of time with building them
+when the rest starts (what a construct-on-signal overlay would pay), each
+measured up to the first rendered frame. Then compares one countdown tick
+(only the countdown cells, from pre-laid-out glyphs) with repainting the
+whole window. Runs on the offscreen platform unless QT_QPA_PLATFORM is set,
+so the numbers exclude the compositor.
+
+Run from the project root: python benchmarks/bench_rest_overlay.py [rounds]
+"""
+
+import os
+import sys
+import time
+import statistics
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from PySide6.QtWidgets import QApplication
+
+from rest_overlay import RestOverlay
+
+FRAME_MS = 1000 / 60
+
+def time_ms(func):
+    start = time.perf_counter()
+    func()
+    return (time.perf_counter() - start) * 1000
+
+def report(name, samples):
+    print(f"{name:28s} median {statistics.median(samples):7.3f} ms  max {max(samples):7.3f} ms"
+          f"  ({statistics.median(samples) / FRAME_MS:5.1%} of a 60 Hz frame)")
+
+def main():
+    rounds = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    app = QApplication.instance() or QApplication([])
+    overlay = RestOverlay()
+
+    def show_and_paint():
+        overlay.show_rest(300)
+        for window in overlay.windows:
+            window.grab() # Render the first frame now (offscreen windows are never exposed)
+
+    prebuilt, on_demand = [], []
+    for _ in range(rounds):
+        overlay.prepare()
+        prebuilt.append(time_ms(show_and_paint))
+        overlay.hide_overlay()
+        overlay.release()
+        app.processEvents() # Run the deferred deletions
+        on_demand.append(time_ms(show_and_paint))
+        overlay.hide_overlay()
+    print(f"{len(overlay.windows)} screen(s), {rounds} rounds")
+    report("show, prepared ahead", prebuilt)
+    report("show, built on the signal", on_demand)
+
+    overlay.show_rest(300)
+    window = overlay.windows[0]
+    report("countdown tick repaint", [time_ms(lambda: window.grab(window.countdown_rect)) for _ in range(rounds)])
+    report("full window repaint", [time_ms(window.grab) for _ in range(rounds)])
+    overlay.release()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+# -*- coding: utf-8 -*-
+"""
+Benchmark for the SQLite statistics store over ten years of synthetic history.
+
+Run from the project root: python benchmarks/bench_stats_db.py
+"""
+
+import os
+import sys
+import time
+import random
+import datetime
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from stats_db import StatsDatabase
+
+YEARS = 10
+QUERY_REPEATS = 50
+
+def synthetic_history(days, seed=42):
+    """Yields (date, usage_seconds, rest_periods) for `days` consecutive days ending today."""
+    rng = random.Random(seed)
+    start = datetime.date.today() - datetime.timedelta(days=days - 1)
+    for offset in range(days):
+        usage = rng.randint(0, 10 * 3600)
+        yield start + datetime.timedelta(days=offset), usage, usage // 3600
+
+def time_call(func, *args, repeats=QUERY_REPEATS):
+    """Returns (best_ms, result) over `repeats` calls."""
+    best = float("inf")
+    result = None
+    for _ in range(repeats):
+        start = time.perf_counter()
+        result = func(*args)
+        best = min(best, time.perf_counter() - start)
+    return best * 1000, result
+
+def main():
+    days = YEARS * 365
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        db = StatsDatabase(os.path.join(tmp_dir, "bench_stats.db"))
+
+        start = time.perf_counter()
+        db.upsert_many(synthetic_history(days))
+        print(f"Bulk load of {days} days: {(time.perf_counter() - start) * 1000:.1f} ms")
+
+        today = datetime.date.today()
+        start = time.perf_counter()
+        for _ in range(1000):
+            db.upsert_daily(today, 60, 0)
+        print(f"Single-day upsert (committed): {(time.perf_counter() - start):.3f} ms/op")
+
+        first_day = today - datetime.timedelta(days=days - 1)
+        last_month = today - datetime.timedelta(days=30)
+        cases = [
+            ("Range query, last 30 days", db.query_range, last_month, today),
+            ("Range query, full history", db.query_range, first_day, today),
+            ("Weekly rollup, full history", db.weekly_rollup, first_day, today),
+            ("Monthly rollup, full history", db.monthly_rollup, first_day, today),
+        ]
+        for label, func, range_start, range_end in cases:
+            best_ms, rows = time_call(func, range_start, range_end)
+            print(f"{label}: {best_ms:.2f} ms ({len(rows)} rows)")
+
+        db.close()
+
+if __name__ == "__main__":
+    main()
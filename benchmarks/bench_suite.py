@@ -0,0 +1,291 @@
+# -*- coding: utf-8 -*-
+"""
+Headless benchmark suite for the controller and manager hot paths.
+
+Runs on any platform with fake backends in place of the Windows-only ones:
+the gamma device call is replaced by a no-op, notifications go nowhere, the
+reminder's signals are no-op emitters, and settings and statistics live in a
+temporary directory. Hotkey matching runs on plain key stand-ins, so pynput
+is not needed.
+
+Cases:
+    gamma.calculate_color_gain     GammaController._calculate_color_gain
+    gamma.build_ramp               GammaController._build_ramp
+    gamma.set_temperature          ramp build plus the (fake) device write
+    gamma.build_ramp.cached        ramp for one of 8 recent temperatures (composition cache hit)
+    gamma.set_adjustments          new contrast at a fixed temperature with a gamma adjustment set
+                                   (recomputes the contrast stage and the ones after it)
+    settings.save / settings.load  settings_manager round trip
+    settings.get_effective         cached merged view (policy and user file unchanged)
+    stats.record_daily_summary.N   one recorded event with N days of history
+    hotkey.match                   matching_hotkeys against 10 hotkeys
+    reminder.tick / reminder.cycle one status tick, and a full work+rest cycle
+                                   (every wakeup of one cycle on AC power, on a fake clock)
+
+Every run is written to benchmarks/results/suite-<timestamp>.json and
+compared with the previous run (or --baseline). A case whose best round is
+more than --threshold times slower is reported as a regression and the script
+exits with status 1.
+
+Run from the project root: python benchmarks/bench_suite.py [--case PREFIX] [--baseline PATH]
+"""
+
+import os
+import sys
+import json
+import time
+import glob
+import types
+import shutil
+import logging
+import argparse
+import datetime
+import platform
+import statistics
+import tempfile
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "results")
+sys.path.insert(0, PROJECT_ROOT)
+
+import log_setup
+import gamma_controller
+import settings_manager as sm
+import stats_manager
+import hotkey_manager
+import reminder_manager
+
+RESULTS_VERSION = 1
+DEFAULT_ROUNDS = 7
+DEFAULT_THRESHOLD = 1.25
+HISTORY_SIZES = (10, 1000, 100000)
+
+def measure(func, number, rounds):
+    """Returns per-call timings in microseconds: min, median and mean over `rounds` rounds of `number` calls."""
+    per_call = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        for _ in range(number):
+            func()
+        per_call.append((time.perf_counter() - start) / number * 1e6)
+    return {
+        "number": number,
+        "rounds": rounds,
+        "min_us": round(min(per_call), 3),
+        "median_us": round(statistics.median(per_call), 3),
+        "mean_us": round(statistics.fmean(per_call), 3),
+    }
+
+# --- Fake backends ---
+
+def install_fakes(data_dir):
+    """Points every backend the cases touch at a fake or at `data_dir`."""
+    gamma_controller.SetDeviceGammaRamp = lambda hdc, ramp: True
+    reminder_manager.plyer = types.SimpleNamespace(
+        notification=types.SimpleNamespace(notify=lambda **kwargs: None))
+    sm.get_settings_path = lambda: os.path.join(data_dir, sm.SETTINGS_FILE)
+    os.environ[sm.POLICY_PATH_ENV] = os.path.join(data_dir, sm.POLICY_FILE) # No machine policy
+    stats_manager.get_data_dir = lambda: data_dir
+
+def make_gamma_controller():
+    controller = gamma_controller.GammaController()
+    controller.hdc = 1
+    controller.supported = True
+    return controller
+
+def write_history(data_dir, days):
+    """Writes a compacted summary of `days` consecutive days ending yesterday and resets the event log and database."""
+    for name in (stats_manager.STATS_FILE, stats_manager.EVENTS_FILE, stats_manager.STATS_DB_FILE,
+                 stats_manager.STATS_FILE + stats_manager.INDEX_SUFFIX):
+        path = os.path.join(data_dir, name)
+        if os.path.exists(path):
+            os.remove(path)
+    if stats_manager._stats_db is not None:
+        stats_manager._stats_db.close()
+        stats_manager._stats_db = None
+
+    today = datetime.date.today()
+    with open(stats_manager.get_stats_path(), 'w', encoding='utf-8', newline='') as f:
+        f.write(",".join(stats_manager.CSV_HEADER) + "\r\n")
+        for offset in range(days, 0, -1):
+            f.write(f"{(today - datetime.timedelta(days=offset)).isoformat()},{3600 + offset % 7200},{offset % 8}\r\n")
+    stats_manager.get_stats_db() # Opening migrates the history; not part of the timed call
+
+# --- Cases ---
+
+def bench_gamma(results, rounds):
+    controller = make_gamma_controller()
+    kelvins = iter(range(10**9))
+    next_kelvin = lambda: gamma_controller.MIN_KELVIN + next(kelvins) % (gamma_controller.MAX_KELVIN - gamma_controller.MIN_KELVIN)
+    results["gamma.calculate_color_gain"] = measure(lambda: controller._calculate_color_gain(next_kelvin()), 20000, rounds)
+    results["gamma.build_ramp"] = measure(lambda: controller._build_ramp(next_kelvin()), 500, rounds)
+    results["gamma.set_temperature"] = measure(lambda: controller.set_temperature(next_kelvin()), 500, rounds)
+    recent = [gamma_controller.MIN_KELVIN + i * 500 for i in range(8)]
+    results["gamma.build_ramp.cached"] = measure(lambda: controller._build_ramp(recent[next(kelvins) % 8]), 20000, rounds)
+    controller.set_adjustments(gamma=1.4)
+    controller.set_temperature(4000)
+    contrasts = [0.5 + i / 1000 for i in range(1000)] # More values than the stage caches hold
+    results["gamma.set_adjustments"] = measure(lambda: controller.set_adjustments(contrast=contrasts[next(kelvins) % 1000]), 300, rounds)
+
+def bench_settings(results, rounds):
+    settings = sm.get_default_settings()
+    settings["profiles"] = {f"Profile {i}": {"temperature": 3000 + i * 100, "brightness": 50} for i in range(20)}
+    results["settings.save"] = measure(lambda: sm.save_settings(settings), 200, rounds)
+    results["settings.load"] = measure(sm.load_settings, 200, rounds)
+    results["settings.get_effective"] = measure(sm.get_effective_settings, 20000, rounds)
+
+def bench_stats(results, rounds, data_dir):
+    for days in HISTORY_SIZES:
+        write_history(data_dir, days)
+        # Few enough calls per size that the event log stays below the compaction threshold
+        results[f"stats.record_daily_summary.{days}"] = measure(
+            lambda: stats_manager.record_daily_summary(60, 0), 20, rounds)
+    stats_manager._stats_db.close()
+    stats_manager._stats_db = None
+
+def bench_hotkeys(results, rounds):
+    # Frozen sets of plain strings stand in for pynput keys; matching is pure set logic
+    parsed = {f"<ctrl>+<alt>+{i}": frozenset({"ctrl", "alt", str(i)}) for i in range(10)}
+    pressed_cases = [{"ctrl", "alt", "3"}, {"ctrl"}, {"a"}, {"ctrl", "alt", "9"}]
+    presses = iter(range(10**9))
+    results["hotkey.match"] = measure(
+        lambda: list(hotkey_manager.matching_hotkeys(pressed_cases[next(presses) % len(pressed_cases)], parsed)),
+        20000, rounds)
+
+class HandTimer:
+    """Records what the manager schedules instead of arming a QTimer; the cases drive tick() by hand."""
+
+    def __init__(self):
+        self._interval = 0
+        self._active = False
+
+    def start(self, msec=None):
+        if msec is not None:
+            self._interval = msec
+        self._active = True
+
+    def stop(self):
+        self._active = False
+
+    def interval(self):
+        return self._interval
+
+    def isActive(self):
+        return self._active
+
+def bench_reminder(results, rounds):
+    from PySide6.QtCore import QCoreApplication
+    if QCoreApplication.instance() is None:
+        QCoreApplication([]) # QTimer needs an application object; PySide keeps it alive
+    now = [0.0]
+    manager = reminder_manager.ReminderManager(clock=lambda: now[0])
+    # No-op emitters in place of the signals: the cases measure the scheduler, not Qt's signal dispatch
+    null_signal = types.SimpleNamespace(emit=lambda *args: None)
+    manager.status_updated = manager.rest_period_started = manager.rest_period_ended = null_signal
+    manager.timer = HandTimer() # Ticks are driven by hand below
+    manager.set_durations(1, 5)
+    manager.start_timer()
+    results["reminder.tick"] = measure(manager.tick, 2000, rounds)
+
+    def cycle():
+        manager.start_timer()
+        while manager.state == manager.STATE_WORKING:
+            now[0] += manager.timer.interval() / 1000 # Jump to the wakeup the manager scheduled
+            manager.tick()
+        while manager.state == manager.STATE_RESTING:
+            now[0] += manager.timer.interval() / 1000
+            manager.tick()
+        manager.timer.stop()
+    results["reminder.cycle"] = measure(cycle, 1, rounds)
+    manager.stop_timer()
+
+CASE_GROUPS = [
+    ("gamma.", bench_gamma),
+    ("settings.", bench_settings),
+    ("stats.", bench_stats),
+    ("hotkey.", bench_hotkeys),
+    ("reminder.", bench_reminder),
+]
+
+# --- Results ---
+
+def latest_results_path(exclude=None):
+    paths = sorted(glob.glob(os.path.join(RESULTS_DIR, "suite-*.json")))
+    paths = [path for path in paths if path != exclude]
+    return paths[-1] if paths else None
+
+def write_results(results):
+    os.makedirs(RESULTS_DIR, exist_ok=True)
+    path = os.path.join(RESULTS_DIR, f"suite-{datetime.datetime.now():%Y%m%d-%H%M%S}.json")
+    data = {
+        "version": RESULTS_VERSION,
+        "created": datetime.datetime.now().isoformat(timespec="seconds"),
+        "cases": results,
+        "environment": {
+            "platform": platform.platform(),
+            "python": platform.python_version(),
+            "cpu_count": os.cpu_count(),
+        },
+    }
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, indent=2)
+        f.write("\n")
+    return path
+
+def compare(results, baseline_path, threshold):
+    """Prints each case against the baseline. Returns the names of regressed cases."""
+    with open(baseline_path, encoding='utf-8') as f:
+        baseline = json.load(f)["cases"]
+    regressions = []
+    print(f"\nCompared with {os.path.relpath(baseline_path, PROJECT_ROOT)} (regression above {threshold:.2f}x):")
+    for name, result in results.items():
+        previous = baseline.get(name)
+        if previous is None:
+            print(f"  {name:36} new")
+            continue
+        # The best round is the least affected by other load on the machine
+        ratio = result["min_us"] / previous["min_us"] if previous["min_us"] else float("inf")
+        flag = "  REGRESSION" if ratio > threshold else ""
+        print(f"  {name:36} {previous['min_us']:12.2f} -> {result['min_us']:12.2f} us  {ratio:5.2f}x{flag}")
+        if flag:
+            regressions.append(name)
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description="Headless benchmark suite for controller and manager hot paths.")
+    parser.add_argument("--case", default="", help="Only run cases whose name starts with this prefix")
+    parser.add_argument("--rounds", type=int, default=DEFAULT_ROUNDS, help="Timed rounds per case")
+    parser.add_argument("--baseline", help="Results file to compare with (default: the previous run)")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD, help="Slowdown ratio reported as a regression")
+    parser.add_argument("--no-save", action="store_true", help="Do not store this run's results")
+    args = parser.parse_args()
+
+    log_setup.setup_logging(level=logging.WARNING, log_file=False)
+    data_dir = tempfile.mkdtemp(prefix="bench_suite_")
+    install_fakes(data_dir)
+    results = {}
+    try:
+        for prefix, bench in CASE_GROUPS:
+            if not (prefix.startswith(args.case) or args.case.startswith(prefix)):
+                continue
+            if bench is bench_stats:
+                bench(results, args.rounds, data_dir)
+            else:
+                bench(results, args.rounds)
+    finally:
+        shutil.rmtree(data_dir, ignore_errors=True)
+    results = {name: result for name, result in results.items() if name.startswith(args.case)}
+
+    print(f"{'case':38} {'min':>12} {'median':>12} {'mean':>12}  (us/call)")
+    for name, result in results.items():
+        print(f"{name:38} {result['min_us']:12.2f} {result['median_us']:12.2f} {result['mean_us']:12.2f}")
+
+    saved_path = None if args.no_save else write_results(results)
+    if saved_path:
+        print(f"\nResults written to {os.path.relpath(saved_path, PROJECT_ROOT)}")
+    baseline_path = args.baseline or latest_results_path(exclude=saved_path)
+    if baseline_path and compare(results, baseline_path, args.threshold):
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
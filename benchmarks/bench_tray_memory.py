@@ -0,0 +1,107 @@
+# -*- coding: utf-8 -*-
+"""
+Working-set comparison of windowed mode and tray mode.
+
+Each scenario runs in a fresh interpreter:
+
+    windowed:       AppCore + MainWindow shown
+    tray_after_use: window opened, then closed (destroyed) and memory trimmed
+    tray_only:      AppCore started in the tray, the window never built
+
+On Windows the trim after closing the window empties the working set, so
+tray_after_use drops close to tray_only. Elsewhere only the window's own heap
+(about 1 MB) is freed: the widget libraries and modules loaded for it stay
+mapped and their pages resident, so tray_after_use stays near windowed and
+tray mode is judged by tray_only, the footprint of an autostart that never
+opens the window.
+
+The tray figure is compared with windowed; the script exits with status 1 if
+it is above MAX_TRAY_RATIO of it. Settings and statistics go to a temporary
+directory, never the user's.
+
+Run from the project root: python benchmarks/bench_tray_memory.py
+"""
+
+import os
+import sys
+import json
+import platform
+import tempfile
+import subprocess
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+SCENARIOS = ("windowed", "tray_after_use", "tray_only")
+SETTLE_MS = 500 # Let widgets paint and deferred deletions run before measuring
+TRAY_SCENARIO = "tray_after_use" if platform.system() == "Windows" else "tray_only" # See the module docstring
+MAX_TRAY_RATIO = 0.9 # Tray mode must stay at least 10% below the windowed working set
+
+def use_data_dir(data_dir):
+    """Points settings, statistics and everything stored next to them at `data_dir`."""
+    import settings_manager as sm
+    import stats_manager
+    sm.get_settings_path = lambda: os.path.join(data_dir, sm.SETTINGS_FILE)
+    os.environ[sm.POLICY_PATH_ENV] = os.path.join(data_dir, sm.POLICY_FILE) # No machine policy
+    stats_manager.get_data_dir = lambda: data_dir
+
+def run_scenario(name, data_dir):
+    """Runs one scenario in this process and prints its working set as JSON."""
+    use_data_dir(data_dir)
+    from PySide6.QtWidgets import QApplication
+    from PySide6.QtCore import QTimer
+    from app_core import AppCore
+    import memory_usage
+
+    app = QApplication(sys.argv[:1])
+    core = AppCore()
+    core.resident = True # Measure tray behavior even where no tray is available (e.g. offscreen)
+    app.setQuitOnLastWindowClosed(False)
+    result = {}
+
+    def measure():
+        result["working_set"] = memory_usage.get_working_set_bytes()
+        app.quit()
+
+    if name == "windowed":
+        core.show_window()
+        QTimer.singleShot(SETTLE_MS, measure)
+    elif name == "tray_after_use":
+        core.show_window()
+        # Closing destroys the window; the core trims memory once the deletions have run
+        QTimer.singleShot(SETTLE_MS, core.window.close)
+        QTimer.singleShot(2 * SETTLE_MS, measure)
+    else:
+        QTimer.singleShot(0, memory_usage.trim_working_set)
+        QTimer.singleShot(SETTLE_MS, measure)
+
+    app.exec()
+    core.shutdown()
+    print(json.dumps(result))
+
+def main():
+    if len(sys.argv) > 3 and sys.argv[1] == "--scenario":
+        run_scenario(sys.argv[2], sys.argv[3])
+        return
+
+    import memory_usage
+    results = {}
+    for name in SCENARIOS:
+        with tempfile.TemporaryDirectory(prefix="bench_tray_memory_") as data_dir: # A fresh profile per scenario
+            output = subprocess.run(
+                [sys.executable, os.path.abspath(__file__), "--scenario", name, data_dir],
+                cwd=ROOT, capture_output=True, text=True, check=True
+            ).stdout
+        results[name] = json.loads(output.strip().splitlines()[-1])["working_set"]
+        print(f"{name:15s} {memory_usage.format_bytes(results[name])}")
+
+    if not (results["windowed"] and results[TRAY_SCENARIO]):
+        print("working set unavailable on this platform")
+        return
+    ratio = results[TRAY_SCENARIO] / results["windowed"]
+    print(f"tray mode ({TRAY_SCENARIO}) uses {ratio:.0%} of the windowed working set (limit {MAX_TRAY_RATIO:.0%})")
+    if ratio > MAX_TRAY_RATIO:
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
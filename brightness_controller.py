@@ -3,26 +3,30 @@
 import logging
 import platform
 import time
+import metrics
+from lazy_import import lazy_import, is_available
 
-try:
-    import wmi
-    import pywintypes # Often needed with wmi/pywin32
-except ImportError:
-    logging.error("Required library not found: 'wmi' or 'pywin32'. Brightness control unavailable.")
-    logging.error("Please install using: pip install wmi pywin32")
-    wmi = None
-
-# Configure logging
-logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+# WMI/COM modules are slow to import; they are loaded when the controller first connects
+wmi = lazy_import("wmi")
+pywintypes = lazy_import("pywintypes") # Often needed with wmi/pywin32
 
 class BrightnessController:
     """Handles screen brightness adjustments via WMI."""
 
-    def __init__(self):
+    def __init__(self, connect=True):
+        """
+        :param connect: Connect to WMI now. With False the controller reports
+                        itself unsupported until connect() is called (staged startup).
+        """
         self.supported = False
         self.wmi_instance = None
         self.brightness_methods = None
-        if platform.system() == "Windows" and wmi:
+        if connect:
+            self.connect()
+
+    def connect(self):
+        """Connects to WMI. Returns True if brightness control is available."""
+        if platform.system() == "Windows" and is_available("wmi"):
             try:
                 # Connect to WMI namespace for display management
                 self.wmi_instance = wmi.WMI(namespace='wmi')
@@ -33,6 +37,9 @@ class BrightnessController:
                     logging.info("BrightnessController initialized successfully via WMI.")
                 else:
                     logging.warning("WMI brightness control methods not found. Brightness control might be unavailable.")
+            except ImportError as e:
+                # Checked first: evaluating wmi.x_wmi below would retry the failed import
+                logging.error(f"Failed to import 'wmi'/'pywin32': {e}. Brightness control unavailable.")
             except wmi.x_wmi as e:
                 logging.error(f"WMI Initialization Error: {e}. Brightness control unavailable.")
                 # Handle specific errors like access denied if needed
@@ -41,7 +48,11 @@ class BrightnessController:
             except Exception as e:
                  logging.error(f"Unexpected error during WMI initialization: {e}. Brightness control unavailable.")
         else:
+            if platform.system() == "Windows":
+                logging.error("Required library not found: 'wmi' or 'pywin32'. Brightness control unavailable.")
+                logging.error("Please install using: pip install wmi pywin32")
             logging.warning("Brightness control requires Windows and the 'wmi'/'pywin32' libraries.")
+        return self.supported
 
     def is_supported(self):
         """Check if brightness control is supported."""
@@ -54,20 +65,22 @@ class BrightnessController:
             return -1
 
         try:
-            brightness_info = self.wmi_instance.WmiMonitorBrightness()
+            with metrics.measure("brightness.wmi_get"):
+                brightness_info = self.wmi_instance.WmiMonitorBrightness()
             if brightness_info:
                 # WmiMonitorBrightness usually returns a list, get the first monitor's info
                 current_brightness = brightness_info[0].CurrentBrightness
-                logging.debug(f"Current brightness level reported by WMI: {current_brightness}")
+                logging.debug("Current brightness level reported by WMI: %s", current_brightness)
                 # The value is typically 0-100 already, but double-check documentation if needed
                 return int(current_brightness)
             else:
                 logging.error("Failed to retrieve brightness info via WMI.")
                 return -1
         except Exception as e:
-            logging.error(f"Error getting brightness via WMI: {e}")
+            logging.error("Error getting brightness via WMI: %s", e)
             return -1
 
+    @metrics.timed("brightness.set_brightness")
     def set_brightness(self, level, smooth_transition=True, duration_ms=200):
         """Sets the screen brightness percentage (0-100)."""
         if not self.supported:
@@ -83,7 +96,7 @@ class BrightnessController:
                 smooth_transition = False
 
             if smooth_transition and current_level != level:
-                logging.info(f"Smoothly setting brightness from {current_level}% to {level}% over {duration_ms}ms")
+                logging.info("Smoothly setting brightness from %s%% to %s%% over %sms", current_level, level, duration_ms)
                 steps = 10 # Number of steps for transition
                 delay = duration_ms / 1000 / steps
                 level_step = (level - current_level) / steps
@@ -97,17 +110,20 @@ class BrightnessController:
                 self.brightness_methods[0].WmiSetBrightness(level, 0)
 
             else:
-                logging.info(f"Setting brightness directly to {level}%")
+                logging.debug("Setting brightness directly to %s%%", level) # Once per preview frame while dragging
                 # WmiSetBrightness takes level (0-100) and timeout (0)
-                self.brightness_methods[0].WmiSetBrightness(level, 0)
+                with metrics.measure("brightness.wmi_set"):
+                    self.brightness_methods[0].WmiSetBrightness(level, 0)
 
-            logging.debug(f"Successfully set brightness to {level}% via WMI.")
+            logging.debug("Successfully set brightness to %s%% via WMI.", level)
             return True
         except pywintypes.com_error as com_err:
-             logging.error(f"COM Error setting brightness via WMI: {com_err}")
+             metrics.count("brightness.set_brightness.failed")
+             logging.error("COM Error setting brightness via WMI: %s", com_err)
              return False
         except Exception as e:
-            logging.error(f"Error setting brightness via WMI: {e}")
+            metrics.count("brightness.set_brightness.failed")
+            logging.error("Error setting brightness via WMI: %s", e)
             return False
 
 # Helper clamp function (duplicate from gamma_controller, consider moving to a utils module later)
@@ -117,7 +133,7 @@ def clamp(value, min_val, max_val):
 
 # Example Usage (for testing)
 if __name__ == "__main__":
-    if platform.system() != "Windows" or not wmi:
+    if platform.system() != "Windows" or not is_available("wmi"):
         print("This script requires Windows and the 'wmi'/'pywin32' libraries.")
         sys.exit(1)
 
@@ -0,0 +1,121 @@
+# -*- coding: utf-8 -*-
+"""
+Composable color lookup tables for the gamma ramp.
+
+The ramp is the composition of four stages, each a 256-entry table per
+channel over encoded intensities in [0, 1]:
+
+    gamma        x ** (1 / gamma); above 1 lifts the mid-tones
+    contrast     stretches (or flattens) around mid-grey, clipped to [0, 1]
+    dimming      scales linear light, for displays without a brightness control
+    temperature  per-channel gains in linear light (see GammaController)
+
+The stages run in that order: the per-user adjustments rarely change, while
+the temperature follows a slider, so a temperature change starts from the
+cached output of the first three stages. Each stage keeps a small LRU cache
+keyed by its own parameters and those of every stage before it. Changing
+one stage therefore recomputes that stage and the ones after it, and going
+back to recent values recomputes nothing. A stage at its identity parameters
+passes its input through. With every adjustment at identity the ramp is the
+same as the plain temperature ramp.
+
+Every stage transforms whole tables (array('d') in, array('d') out) with one
+comprehension per channel and its constants hoisted out of the loop. The
+final 16-bit words are cached as bytes in the RAMP layout (red, green, blue).
+"""
+
+import math
+from array import array
+from collections import OrderedDict
+
+import metrics
+
+ENCODING_GAMMA = 2.2 # Standard display gamma assumed when working in linear light
+GAMMA_RANGE = (0.5, 2.0)
+CONTRAST_RANGE = (0.5, 1.5)
+DIMMING_RANGE = (0.3, 1.0) # Never dim to black
+STAGES = ("gamma", "contrast", "dimming", "temperature")
+IDENTITY = {"gamma": (1.0,), "contrast": (1.0,), "dimming": (1.0,), "temperature": (1.0, 1.0, 1.0)}
+STAGE_CACHE_SIZE = 16 # Composed tables kept per stage (about 6 KB each)
+
+_INPUT = array('d', [i / 255.0 for i in range(256)])
+
+def _gamma(channels, gamma):
+    exponent = 1.0 / gamma
+    return tuple(array('d', [x ** exponent for x in table]) for table in channels)
+
+def _contrast(channels, contrast):
+    offset = 0.5 - 0.5 * contrast
+    return tuple(array('d', [min(1.0, max(0.0, x * contrast + offset)) for x in table]) for table in channels)
+
+def _dimming(channels, level):
+    scale = level ** (1.0 / ENCODING_GAMMA) # Scaling linear light by `level`, expressed in encoded values
+    return tuple(array('d', [x * scale for x in table]) for table in channels)
+
+def _temperature(channels, *gains):
+    # Linearize, apply the gain, re-encode: same arithmetic as the original per-entry loop
+    gamma, inverse = ENCODING_GAMMA, 1.0 / ENCODING_GAMMA
+    pow_ = math.pow
+    return tuple(array('d', [pow_(pow_(x, gamma) * gain, inverse) for x in table])
+                 for table, gain in zip(channels, gains))
+
+_STAGE_FUNCS = {"gamma": _gamma, "contrast": _contrast, "dimming": _dimming, "temperature": _temperature}
+
+def _to_words(table):
+    return array('H', [int(min(1.0, max(0.0, x)) * 65535 + 0.5) for x in table])
+
+class ColorPipeline:
+    """The four LUT stages with their current parameters and per-stage caches."""
+
+    def __init__(self, cache_size=STAGE_CACHE_SIZE):
+        self.params = dict(IDENTITY)
+        self.cache_size = cache_size
+        self._caches = [OrderedDict() for _ in STAGES]
+        self._ramp_cache = OrderedDict()
+
+    def set_stage(self, name, *params):
+        """Sets a stage's parameters, e.g. set_stage("gamma", 1.4) or set_stage("temperature", r, g, b)."""
+        if name not in self.params:
+            raise ValueError(f"Unknown color stage: {name}")
+        self.params[name] = tuple(float(value) for value in params)
+
+    def key(self):
+        """The parameters of every stage, in order; identifies the composed ramp."""
+        return tuple(self.params[name] for name in STAGES)
+
+    def _lookup(self, cache, key):
+        value = cache.get(key)
+        if value is not None:
+            cache.move_to_end(key)
+        return value
+
+    def _store(self, cache, key, value):
+        cache[key] = value
+        if len(cache) > self.cache_size:
+            cache.popitem(last=False)
+
+    def tables(self):
+        """The composed (red, green, blue) tables of floats in [0, 1], reusing every cached stage."""
+        channels = (_INPUT, _INPUT, _INPUT)
+        key = ()
+        for name, cache in zip(STAGES, self._caches):
+            params = self.params[name]
+            key += (params,)
+            if params == IDENTITY[name]:
+                continue
+            cached = self._lookup(cache, key)
+            if cached is None:
+                metrics.count("color_pipeline.stage_computed")
+                cached = _STAGE_FUNCS[name](channels, *params)
+                self._store(cache, key, cached)
+            channels = cached
+        return channels
+
+    def ramp_bytes(self):
+        """The composed ramp as 16-bit words in the RAMP structure's layout (1536 bytes)."""
+        key = self.key()
+        ramp = self._lookup(self._ramp_cache, key)
+        if ramp is None:
+            ramp = b"".join(_to_words(table).tobytes() for table in self.tables())
+            self._store(self._ramp_cache, key, ramp)
+        return ramp
@@ -0,0 +1,117 @@
+# -*- coding: utf-8 -*-
+"""
+Client for the local JSON-RPC control channel (see control_server.py).
+
+The channel is a named pipe on Windows and a Unix socket elsewhere, carrying
+one JSON-RPC 2.0 request (or batch array) per line. This module does not
+import Qt, so automation scripts can use it directly:
+
+    from control_client import ControlClient
+    with ControlClient() as client:
+        client.call("apply_profile", {"name": "Night Mode"})
+        client.batch([("set_temperature", {"kelvin": 4000}), ("set_brightness", {"percent": 50})])
+"""
+
+import os
+import json
+import socket
+import platform
+import tempfile
+
+import single_instance
+
+MAX_MESSAGE_BYTES = 1024 * 1024
+
+class ControlError(Exception):
+    """A JSON-RPC error returned by the control server."""
+
+    def __init__(self, code, message, data=None):
+        super().__init__(f"{message} (code {code})")
+        self.code = code
+        self.data = data
+
+def get_control_channel_name():
+    """Server name shared by ControlServer (QLocalServer) and ControlClient."""
+    return f"{single_instance.APP_ID}-control-{single_instance.get_user_tag()}"
+
+def get_control_channel_path():
+    """Filesystem path of the channel, matching where QLocalServer creates it."""
+    if platform.system() == "Windows":
+        return rf"\\.\pipe\{get_control_channel_name()}"
+    return os.path.join(tempfile.gettempdir(), get_control_channel_name())
+
+class ControlClient:
+    """Blocking client for the control channel."""
+
+    def __init__(self, timeout=5.0):
+        path = get_control_channel_path()
+        self._buffer = b""
+        self._next_id = 1
+        if platform.system() == "Windows":
+            # Byte-mode named pipes can be opened like a file
+            self._pipe = open(path, 'r+b', buffering=0)
+            self._sock = None
+        else:
+            self._pipe = None
+            self._sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            self._sock.settimeout(timeout)
+            self._sock.connect(path)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        if self._sock is not None:
+            self._sock.close()
+            self._sock = None
+        if self._pipe is not None:
+            self._pipe.close()
+            self._pipe = None
+
+    def _send_line(self, payload):
+        data = json.dumps(payload, ensure_ascii=False).encode('utf-8') + b"\n"
+        if self._sock is not None:
+            self._sock.sendall(data)
+        else:
+            self._pipe.write(data)
+
+    def _read_line(self):
+        while b"\n" not in self._buffer:
+            chunk = self._sock.recv(65536) if self._sock is not None else self._pipe.read(65536)
+            if not chunk:
+                raise ConnectionError("Control channel closed by the server")
+            self._buffer += chunk
+            if len(self._buffer) > MAX_MESSAGE_BYTES:
+                raise ConnectionError("Response too large")
+        line, self._buffer = self._buffer.split(b"\n", 1)
+        return json.loads(line)
+
+    def _request(self, method, params):
+        request = {"jsonrpc": "2.0", "method": method, "id": self._next_id}
+        if params is not None:
+            request["params"] = params
+        self._next_id += 1
+        return request
+
+    def call(self, method, params=None):
+        """Calls one method and returns its result, raising ControlError on error."""
+        self._send_line(self._request(method, params))
+        response = self._read_line()
+        if "error" in response:
+            error = response["error"]
+            raise ControlError(error.get("code"), error.get("message"), error.get("data"))
+        return response.get("result")
+
+    def batch(self, calls):
+        """
+        Sends [(method, params), ...] as one batch, which the server applies
+        atomically. Returns the raw responses in request order.
+        """
+        requests = [self._request(method, params) for method, params in calls]
+        self._send_line(requests)
+        responses = self._read_line()
+        by_id = {response.get("id"): response for response in responses}
+        return [by_id.get(request["id"]) for request in requests]
@@ -0,0 +1,268 @@
+# -*- coding: utf-8 -*-
+"""
+Local JSON-RPC 2.0 control server for automation.
+
+Listens on a per-user local channel (QLocalServer: a named pipe on Windows,
+a Unix socket elsewhere), so it is not reachable from the network or by other
+users. Each line received is one request object or one batch array; each
+response (or batch of responses) is written back as one line. Everything runs
+on the Qt event loop through readyRead signals, so a slow client never blocks
+the UI.
+
+Methods:
+    set_temperature {"kelvin": int}
+    set_brightness {"percent": int}
+    set_color_adjustments {"gamma": float, "contrast": float, "dimming": float} (any of them)
+    apply_profile {"name": str}
+    pause_reminders / resume_reminders
+    get_state
+    get_stats {"start": "YYYY-MM-DD", "end": "YYYY-MM-DD"} (default: last 7 days)
+
+A batch is validated as a whole before anything is applied. If any request
+in it is invalid, nothing is applied; otherwise all color changes are folded
+into one update with a single settings save.
+"""
+
+import json
+import logging
+import datetime
+from PySide6.QtCore import QObject
+from PySide6.QtNetwork import QLocalServer
+
+import stats_manager
+from gamma_controller import MIN_KELVIN, MAX_KELVIN
+from color_pipeline import GAMMA_RANGE, CONTRAST_RANGE, DIMMING_RANGE
+from control_client import get_control_channel_name, MAX_MESSAGE_BYTES
+
+# JSON-RPC 2.0 error codes
+PARSE_ERROR = -32700
+INVALID_REQUEST = -32600
+METHOD_NOT_FOUND = -32601
+INVALID_PARAMS = -32602
+BATCH_ABORTED = -32000
+NOT_SUPPORTED = -32001
+
+class RpcError(Exception):
+    def __init__(self, code, message):
+        super().__init__(message)
+        self.code = code
+        self.message = message
+
+def _param(params, name, position, expected_type):
+    """Reads a parameter given by name (object params) or position (array params)."""
+    if isinstance(params, dict):
+        value = params.get(name)
+    elif isinstance(params, list) and len(params) > position:
+        value = params[position]
+    else:
+        value = None
+    if value is None or isinstance(value, bool) or not isinstance(value, expected_type):
+        raise RpcError(INVALID_PARAMS, f"Parameter '{name}' must be {expected_type.__name__}")
+    return value
+
+class ControlApi:
+    """Validates and applies JSON-RPC requests against the running AppCore."""
+
+    def __init__(self, core):
+        self.core = core
+        self.methods = {
+            "set_temperature": self._prepare_set_temperature,
+            "set_brightness": self._prepare_set_brightness,
+            "set_color_adjustments": self._prepare_set_color_adjustments,
+            "apply_profile": self._prepare_apply_profile,
+            "pause_reminders": lambda params: {"reminders": "pause"},
+            "resume_reminders": lambda params: {"reminders": "resume"},
+            "get_state": lambda params: {"query": self._get_state},
+            "get_stats": self._prepare_get_stats,
+        }
+
+    # --- Request preparation (validation only, no side effects) ---
+    def _prepare_set_temperature(self, params):
+        kelvin = _param(params, "kelvin", 0, int)
+        if not MIN_KELVIN <= kelvin <= MAX_KELVIN:
+            raise RpcError(INVALID_PARAMS, f"kelvin must be between {MIN_KELVIN} and {MAX_KELVIN}")
+        return {"temperature": kelvin}
+
+    def _prepare_set_brightness(self, params):
+        percent = _param(params, "percent", 0, int)
+        if not 0 <= percent <= 100:
+            raise RpcError(INVALID_PARAMS, "percent must be between 0 and 100")
+        if not self.core.brightness_controller.is_supported():
+            raise RpcError(NOT_SUPPORTED, "Brightness control is not supported on this display")
+        return {"brightness": percent}
+
+    def _prepare_set_color_adjustments(self, params):
+        if not isinstance(params, dict) or not params:
+            raise RpcError(INVALID_PARAMS, "Parameters must name gamma, contrast and/or dimming")
+        adjustments = {}
+        for name, (low, high) in (("gamma", GAMMA_RANGE), ("contrast", CONTRAST_RANGE), ("dimming", DIMMING_RANGE)):
+            if name not in params:
+                continue
+            value = params[name]
+            if isinstance(value, bool) or not isinstance(value, (int, float)) or not low <= value <= high:
+                raise RpcError(INVALID_PARAMS, f"{name} must be a number between {low} and {high}")
+            adjustments[name] = float(value)
+        if not adjustments or len(adjustments) != len(params):
+            raise RpcError(INVALID_PARAMS, "Parameters must name gamma, contrast and/or dimming")
+        return {"adjustments": adjustments}
+
+    def _prepare_apply_profile(self, params):
+        name = _param(params, "name", 0, str)
+        profile = self.core.settings.get("profiles", {}).get(name)
+        if not profile:
+            raise RpcError(INVALID_PARAMS, f"Unknown profile '{name}'")
+        return {"temperature": profile.get("temperature"), "brightness": profile.get("brightness")}
+
+    def _prepare_get_stats(self, params):
+        end = datetime.date.today()
+        start = end - datetime.timedelta(days=6)
+        try:
+            if isinstance(params, dict):
+                start = datetime.date.fromisoformat(params.get("start", start.isoformat()))
+                end = datetime.date.fromisoformat(params.get("end", end.isoformat()))
+        except (TypeError, ValueError):
+            raise RpcError(INVALID_PARAMS, "start/end must be YYYY-MM-DD dates")
+        return {"query": lambda: [
+            {"date": date_str, "total_usage_seconds": usage, "rest_periods_taken": rests}
+            for date_str, usage, rests in stats_manager.query_daily_range(start, end)
+        ]}
+
+    def _get_state(self):
+        reminder_manager = self.core.reminder_manager
+        settings = self.core.settings
+        return {
+            "temperature_kelvin": settings.get("temperature_kelvin", 6500),
+            "brightness_percent": settings.get("brightness_percent", 80) if self.core.brightness_controller.is_supported() else None,
+            "color_adjustments": self.core.color_adjustments(),
+            "reminder_state": reminder_manager.state,
+            "reminders_paused": reminder_manager.paused,
+        }
+
+    def _prepare(self, request):
+        if not isinstance(request, dict) or request.get("jsonrpc") != "2.0" or not isinstance(request.get("method"), str):
+            raise RpcError(INVALID_REQUEST, "Invalid JSON-RPC 2.0 request")
+        prepare = self.methods.get(request["method"])
+        if prepare is None:
+            raise RpcError(METHOD_NOT_FOUND, f"Method '{request['method']}' not found")
+        return prepare(request.get("params"))
+
+    # --- Execution ---
+    def handle_payload(self, payload):
+        """Handles a decoded request or batch; returns the response object/list, or None if nothing to send."""
+        if isinstance(payload, list):
+            if not payload:
+                return _error_response(None, RpcError(INVALID_REQUEST, "Empty batch"))
+            responses = self._handle_batch(payload)
+            return responses or None
+        responses = self._handle_batch([payload])
+        return responses[0] if responses else None
+
+    def _handle_batch(self, requests):
+        steps, errors = [], {}
+        for index, request in enumerate(requests):
+            try:
+                steps.append(self._prepare(request))
+            except RpcError as e:
+                steps.append(None)
+                errors[index] = e
+
+        if errors:
+            aborted = RpcError(BATCH_ABORTED, "Batch not applied: another request in it is invalid")
+            return [
+                _error_response(_request_id(request), errors.get(index, aborted))
+                for index, request in enumerate(requests)
+                if index in errors or _request_id(request) is not None
+            ]
+
+        # Fold every color change into one update; later requests win
+        temperature = brightness = reminders = None
+        adjustments = {}
+        for step in steps:
+            adjustments.update(step.get("adjustments", {}))
+            if step.get("temperature") is not None:
+                temperature = step["temperature"]
+            if step.get("brightness") is not None:
+                brightness = step["brightness"]
+            reminders = step.get("reminders", reminders)
+
+        if adjustments or temperature is not None or brightness is not None:
+            self.core.apply_color_settings(temperature, brightness, adjustments)
+        if reminders == "pause":
+            self.core.reminder_manager.pause()
+        elif reminders == "resume":
+            self.core.reminder_manager.resume()
+
+        responses = []
+        for request, step in zip(requests, steps):
+            if "id" not in request:
+                continue # Notification: no response
+            result = step["query"]() if "query" in step else True
+            responses.append({"jsonrpc": "2.0", "result": result, "id": request["id"]})
+        return responses
+
+def _request_id(request):
+    return request.get("id") if isinstance(request, dict) else None
+
+def _error_response(request_id, error):
+    return {"jsonrpc": "2.0", "error": {"code": error.code, "message": error.message}, "id": request_id}
+
+class ControlServer(QObject):
+    """QLocalServer front end for ControlApi."""
+
+    def __init__(self, core, parent=None):
+        super().__init__(parent)
+        self.api = ControlApi(core)
+        self.server = QLocalServer(self)
+        # Only the current user may connect
+        self.server.setSocketOptions(QLocalServer.SocketOption.UserAccessOption)
+        self.server.newConnection.connect(self._on_new_connection)
+        self._buffers = {}
+
+    def start(self):
+        """Starts listening. Returns False if the channel could not be opened."""
+        name = get_control_channel_name()
+        QLocalServer.removeServer(name) # Clears a stale socket file left by a crash (no-op on Windows)
+        if not self.server.listen(name):
+            logging.error(f"Failed to start control server on {name}: {self.server.errorString()}")
+            return False
+        logging.info(f"Control server listening on {self.server.fullServerName()}")
+        return True
+
+    def stop(self):
+        self.server.close()
+
+    def _on_new_connection(self):
+        while self.server.hasPendingConnections():
+            socket = self.server.nextPendingConnection()
+            self._buffers[socket] = b""
+            socket.readyRead.connect(lambda s=socket: self._on_ready_read(s))
+            socket.disconnected.connect(lambda s=socket: self._on_disconnected(s))
+
+    def _on_disconnected(self, socket):
+        self._buffers.pop(socket, None)
+        socket.deleteLater()
+
+    def _on_ready_read(self, socket):
+        buffer = self._buffers.get(socket, b"") + bytes(socket.readAll())
+        lines = buffer.split(b"\n")
+        buffer = lines.pop() # Incomplete trailing line stays buffered
+        if len(buffer) > MAX_MESSAGE_BYTES:
+            logging.warning("Control client sent an oversized message; disconnecting.")
+            socket.abort()
+            return
+        self._buffers[socket] = buffer
+
+        out = []
+        for line in lines:
+            if not line.strip():
+                continue
+            try:
+                payload = json.loads(line)
+            except ValueError:
+                response = _error_response(None, RpcError(PARSE_ERROR, "Parse error"))
+            else:
+                response = self.api.handle_payload(payload)
+            if response is not None:
+                out.append(json.dumps(response, ensure_ascii=False).encode('utf-8') + b"\n")
+        if out:
+            socket.write(b"".join(out)) # Buffered by Qt; flushed by the event loop
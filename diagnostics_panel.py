@@ -0,0 +1,115 @@
+# -*- coding: utf-8 -*-
+"""
+Diagnostics tab of the main window: live view of the metrics registry and
+of background wakeups per hour in each power mode.
+
+The table is refreshed once a second, and only while the tab is visible, so
+the panel itself adds nothing to the hot paths it is measuring.
+"""
+
+from PySide6.QtWidgets import (
+    QWidget, QVBoxLayout, QHBoxLayout, QLabel, QCheckBox, QPushButton,
+    QTableWidget, QTableWidgetItem, QHeaderView, QFileDialog, QAbstractItemView
+)
+from PySide6.QtCore import QTimer
+
+import metrics
+from app_core import get_metrics_path
+
+REFRESH_INTERVAL_MS = 1000
+COLUMNS = ("指标", "次数", "平均 (ms)", "P50 (ms)", "P95 (ms)", "最大 (ms)")
+MODE_NAMES = {"ac": "交流电源", "battery": "电池", "display_off": "屏幕关闭"}
+
+def _format_ms(value):
+    return "-" if value is None else f"{value:.3f}"
+
+class DiagnosticsPanel(QWidget):
+    """Enable switch, latency table and JSON export for the metrics registry."""
+
+    def __init__(self, core, parent=None):
+        super().__init__(parent)
+        self.core = core
+        layout = QVBoxLayout(self)
+
+        self.enabled_checkbox = QCheckBox("收集性能指标")
+        self.enabled_checkbox.setChecked(metrics.is_enabled())
+        self.enabled_checkbox.toggled.connect(self.toggle_metrics)
+        layout.addWidget(self.enabled_checkbox)
+
+        self.table = QTableWidget(0, len(COLUMNS))
+        self.table.setHorizontalHeaderLabels(COLUMNS)
+        self.table.setEditTriggers(QAbstractItemView.EditTrigger.NoEditTriggers)
+        self.table.verticalHeader().setVisible(False)
+        self.table.horizontalHeader().setSectionResizeMode(0, QHeaderView.ResizeMode.Stretch)
+        layout.addWidget(self.table)
+
+        self.counters_label = QLabel()
+        self.counters_label.setWordWrap(True)
+        layout.addWidget(self.counters_label)
+
+        self.wakeups_label = QLabel()
+        self.wakeups_label.setWordWrap(True)
+        layout.addWidget(self.wakeups_label)
+
+        button_layout = QHBoxLayout()
+        self.reset_button = QPushButton("清零")
+        self.reset_button.clicked.connect(self.reset_metrics)
+        self.export_button = QPushButton("导出 JSON...")
+        self.export_button.clicked.connect(self.export_json)
+        button_layout.addStretch()
+        button_layout.addWidget(self.reset_button)
+        button_layout.addWidget(self.export_button)
+        layout.addLayout(button_layout)
+
+        self.refresh_timer = QTimer(self)
+        self.refresh_timer.setInterval(REFRESH_INTERVAL_MS)
+        self.refresh_timer.timeout.connect(self.refresh)
+
+    def showEvent(self, event):
+        self.refresh()
+        self.refresh_timer.start()
+        super().showEvent(event)
+
+    def hideEvent(self, event):
+        self.refresh_timer.stop()
+        super().hideEvent(event)
+
+    def toggle_metrics(self, checked):
+        self.core.set_metrics_enabled(checked)
+        self.refresh()
+
+    def reset_metrics(self):
+        metrics.reset()
+        self.refresh()
+
+    def refresh(self):
+        """Redraws the table from a fresh snapshot."""
+        snapshot = metrics.snapshot()
+        histograms = snapshot["histograms"]
+        self.table.setRowCount(len(histograms))
+        for row, (name, histogram) in enumerate(histograms.items()):
+            values = (name, str(histogram["count"]), _format_ms(histogram["mean_ms"]),
+                      _format_ms(histogram["p50_ms"]), _format_ms(histogram["p95_ms"]),
+                      _format_ms(histogram["max_ms"]))
+            for column, value in enumerate(values):
+                self.table.setItem(row, column, QTableWidgetItem(value))
+
+        counters = snapshot["counters"]
+        if counters:
+            self.counters_label.setText("计数: " + ", ".join(f"{name} = {value}" for name, value in counters.items()))
+        elif not snapshot["enabled"]:
+            self.counters_label.setText("指标收集已关闭。")
+        else:
+            self.counters_label.setText("暂无计数。")
+
+        power_state = self.core.power_state
+        lines = [f"后台唤醒 (次/小时)，当前: {MODE_NAMES.get(power_state.mode, power_state.mode)}"]
+        for name, modes in power_state.wakeup_report().items():
+            rates = ", ".join(f"{MODE_NAMES.get(mode, mode)} {entry['per_hour']:g}" for mode, entry in modes.items())
+            lines.append(f"{name}: {rates}")
+        self.wakeups_label.setText("\n".join(lines))
+
+    def export_json(self):
+        path, _ = QFileDialog.getSaveFileName(self, "导出性能指标", get_metrics_path(), "JSON (*.json)")
+        if path:
+            metrics.write_json(path) # Logs the outcome
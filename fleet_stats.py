@@ -0,0 +1,169 @@
+# -*- coding: utf-8 -*-
+"""
+Organisation-wide aggregation of collected usage statistics.
+
+IT collects each workstation's statistics directory (usage_stats.csv plus any
+uncompacted usage_events.csv, see stats_manager) into one tree, e.g.
+collected/<host>/<user>/usage_stats.csv. Every directory holding such files
+counts as one user. aggregate() streams each user's rows with
+stats_manager.iter_daily_totals and folds them into per-day totals:
+
+    user_days      users with any usage that day
+    usage_seconds  summed usage
+    rest_periods   rests taken
+    rests_due      one per full reminder work interval of usage
+    due_days       user-days with at least one rest due
+    compliant_days of those, the ones where every due rest was taken
+
+Directories are handed to a process pool in batches; each batch returns one
+partial per-day table, so the work spreads over all cores and the parent only
+merges. A user's rows are added to the totals only once their whole history
+has been read, so a file that fails partway contributes nothing rather than
+part of its days. Memory stays fixed: a worker holds one user's rows at a
+time, at most MAX_PENDING_BATCHES_PER_WORKER batch results are in flight per
+worker, and the merged table has one entry per calendar day, however many
+users there are. Weekly figures are rolled up from the daily table.
+"""
+
+import os
+import csv
+import json
+import datetime
+import logging
+import concurrent.futures
+
+import stats_manager
+
+DEFAULT_BATCH_SIZE = 64 # User directories per pool task
+MAX_PENDING_BATCHES_PER_WORKER = 2 # Bounds the results waiting to be merged
+DEFAULT_WORK_HOURS = 1 # Matches the reminder default: one rest due per hour of use
+STAT_FIELDS = ["user_days", "usage_seconds", "rest_periods", "rests_due", "due_days", "compliant_days"]
+REPORT_HEADER = ["period", "user_days", "usage_hours", "avg_usage_hours", "rest_periods", "rests_due", "rest_compliance"]
+
+def find_user_dirs(root):
+    """Lazily yields every directory under `root` that holds a statistics summary or event log."""
+    stats_files = {stats_manager.STATS_FILE, stats_manager.EVENTS_FILE, stats_manager.PENDING_EVENTS_FILE}
+    for dir_path, _, file_names in os.walk(root):
+        if not stats_files.isdisjoint(file_names):
+            yield dir_path
+
+def _merge_into(totals, partial):
+    for date_str, stats in partial.items():
+        entry = totals.get(date_str)
+        if entry is None:
+            totals[date_str] = stats
+        else:
+            for i, value in enumerate(stats):
+                entry[i] += value
+
+def aggregate_user_dirs(user_dirs, work_hours=DEFAULT_WORK_HOURS, start_date=None, end_date=None):
+    """Returns {date_str: [STAT_FIELDS values]} for the given user directories. Runs in the pool workers."""
+    interval_seconds = max(1, int(work_hours * 3600))
+    totals = {}
+    for user_dir in user_dirs:
+        try:
+            # Collected copies may be read-only; do not write sparse indexes into them
+            rows = [row for row in stats_manager.iter_daily_totals(start_date, end_date, data_dir=user_dir, use_index=False)
+                    if row[1] > 0]
+        except (OSError, csv.Error, ValueError, IndexError) as e:
+            logging.warning("Skipping unreadable statistics in %s: %s", user_dir, e)
+            continue
+        for date_str, usage_seconds, rest_periods in rows:
+            rests_due = usage_seconds // interval_seconds
+            entry = totals.get(date_str)
+            if entry is None:
+                entry = totals[date_str] = [0, 0, 0, 0, 0, 0]
+            entry[0] += 1
+            entry[1] += usage_seconds
+            entry[2] += rest_periods
+            entry[3] += rests_due
+            if rests_due:
+                entry[4] += 1
+                if rest_periods >= rests_due:
+                    entry[5] += 1
+    return totals
+
+def _batches(items, size):
+    batch = []
+    for item in items:
+        batch.append(item)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+def aggregate(root, workers=None, batch_size=DEFAULT_BATCH_SIZE, work_hours=DEFAULT_WORK_HOURS,
+              start_date=None, end_date=None):
+    """
+    Aggregates every user directory under `root`. Returns (daily, user_count)
+    where daily is {date_str: [STAT_FIELDS values]} sorted by date.
+
+    :param workers: Worker processes; None uses every core, 0 runs in this process.
+    """
+    start_str, end_str = stats_manager.to_date_str(start_date), stats_manager.to_date_str(end_date)
+    batches = _batches(find_user_dirs(root), batch_size)
+    totals = {}
+    user_count = 0
+
+    if workers == 0:
+        for batch in batches:
+            user_count += len(batch)
+            _merge_into(totals, aggregate_user_dirs(batch, work_hours, start_str, end_str))
+    else:
+        workers = workers or os.cpu_count() or 1
+        max_pending = workers * MAX_PENDING_BATCHES_PER_WORKER
+        with concurrent.futures.ProcessPoolExecutor(max_workers=workers) as pool:
+            pending = set()
+            for batch in batches:
+                user_count += len(batch)
+                pending.add(pool.submit(aggregate_user_dirs, batch, work_hours, start_str, end_str))
+                if len(pending) >= max_pending:
+                    # Merge finished batches before queueing more, so discovery never runs far ahead
+                    done, pending = concurrent.futures.wait(pending, return_when=concurrent.futures.FIRST_COMPLETED)
+                    for future in done:
+                        _merge_into(totals, future.result())
+            for future in concurrent.futures.as_completed(pending):
+                _merge_into(totals, future.result())
+    logging.info("Aggregated %d user directories under %s (%d days).", user_count, root, len(totals))
+    return {date_str: totals[date_str] for date_str in sorted(totals)}, user_count
+
+def weekly_rollup(daily):
+    """Folds a daily table into ISO weeks: {"YYYY-Www": [STAT_FIELDS values]} in week order."""
+    weeks = {}
+    for date_str, stats in daily.items():
+        year, week, _ = datetime.date.fromisoformat(date_str).isocalendar()
+        _merge_into(weeks, {f"{year}-W{week:02d}": list(stats)})
+    return {week: weeks[week] for week in sorted(weeks)}
+
+def report_rows(table):
+    """Yields REPORT_HEADER rows (hours rounded to 0.01, compliance as a 0-1 fraction or None)."""
+    for period, (user_days, usage_seconds, rest_periods, rests_due, due_days, compliant_days) in table.items():
+        usage_hours = usage_seconds / 3600
+        yield [
+            period, user_days, round(usage_hours, 2),
+            round(usage_hours / user_days, 2) if user_days else 0.0,
+            rest_periods, rests_due,
+            round(compliant_days / due_days, 4) if due_days else None
+        ]
+
+def write_csv(out_file, table):
+    """Writes a daily or weekly table as CSV. Returns the row count."""
+    writer = csv.writer(out_file)
+    writer.writerow(REPORT_HEADER)
+    count = 0
+    for row in report_rows(table):
+        writer.writerow(row)
+        count += 1
+    return count
+
+def write_json(out_file, table):
+    """Writes a daily or weekly table as a JSON array. Returns the row count."""
+    count = 0
+    out_file.write("[")
+    for row in report_rows(table):
+        out_file.write(",\n  " if count else "\n  ")
+        out_file.write(json.dumps(dict(zip(REPORT_HEADER, row))))
+        count += 1
+    out_file.write("\n]\n" if count else "]\n")
+    return count
@@ -0,0 +1,193 @@
+# -*- coding: utf-8 -*-
+"""
+Per-application profiles, driven by foreground-window changes.
+
+A foreground source reports the process name of each newly activated window:
+WinEventForegroundSource uses SetWinEventHook(EVENT_SYSTEM_FOREGROUND), so
+nothing is polled. The out-of-context hook is delivered through the message
+loop of the thread that installed it, i.e. Qt's event loop on the GUI thread.
+ManualForegroundSource is driven by hand, for tests and benchmarks.
+
+ForegroundWatcher resolves process names to profiles with a ProfileRuleMatcher
+(all rules compiled into one regular expression, results cached per process
+name) and debounces: every event restarts a short timer and only the window
+that is still in front when it fires counts, so an Alt-Tab storm produces at
+most one profile switch.
+"""
+
+import os
+import re
+import ctypes
+import fnmatch
+import logging
+import platform
+import metrics
+from PySide6.QtCore import QObject, QTimer, Signal
+
+EVENT_SYSTEM_FOREGROUND = 0x0003
+WINEVENT_OUTOFCONTEXT = 0x0000
+WINEVENT_SKIPOWNPROCESS = 0x0002
+PROCESS_QUERY_LIMITED_INFORMATION = 0x1000
+DEFAULT_DEBOUNCE_MS = 500
+MATCH_CACHE_SIZE = 256
+
+class ProfileRuleMatcher:
+    """
+    Maps process names to profile names. Rules are {"process": pattern,
+    "profile": name} with shell-style, case-insensitive patterns (e.g.
+    "photoshop.exe", "lightroom*.exe"); the first matching rule wins.
+    """
+
+    def __init__(self, rules):
+        self.profiles = []
+        alternatives = []
+        for rule in rules or []:
+            pattern, profile = rule.get("process"), rule.get("profile")
+            if not pattern or not profile:
+                logging.warning("Ignoring incomplete application profile rule: %s", rule)
+                continue
+            alternatives.append(f"(?P<r{len(self.profiles)}>{fnmatch.translate(pattern.lower())})")
+            self.profiles.append(profile)
+        # One pass over the name tests every rule; the named group tells which one matched first
+        self._regex = re.compile("|".join(alternatives)) if alternatives else None
+        self._cache = {}
+
+    def match(self, process_name):
+        """Returns the profile for `process_name`, or None if no rule matches."""
+        name = process_name.lower()
+        try:
+            return self._cache[name]
+        except KeyError:
+            pass
+        profile = None
+        if self._regex is not None:
+            match = self._regex.match(name)
+            if match:
+                profile = self.profiles[int(match.lastgroup[1:])]
+        if len(self._cache) >= MATCH_CACHE_SIZE:
+            self._cache.clear()
+        self._cache[name] = profile
+        return profile
+
+class ManualForegroundSource:
+    """A foreground source switched by calling activate(process_name)."""
+
+    def __init__(self):
+        self._callback = None
+
+    def start(self, callback):
+        self._callback = callback
+        return True
+
+    def stop(self):
+        self._callback = None
+
+    def activate(self, process_name):
+        if self._callback is not None:
+            self._callback(process_name)
+
+class WinEventForegroundSource:
+    """Foreground-window changes from a WinEvent hook (Windows only; install and use on the GUI thread)."""
+
+    def __init__(self):
+        self._hook = None
+        self._callback = None
+        self._proc = None # The ctypes callback must stay referenced while the hook exists
+
+    @staticmethod
+    def is_supported():
+        return platform.system() == "Windows"
+
+    def start(self, callback):
+        if not self.is_supported():
+            return False
+        user32 = ctypes.windll.user32
+        WINEVENTPROC = ctypes.WINFUNCTYPE(
+            None, ctypes.c_void_p, ctypes.c_ulong, ctypes.c_void_p, ctypes.c_long,
+            ctypes.c_long, ctypes.c_ulong, ctypes.c_ulong)
+        user32.SetWinEventHook.argtypes = [ctypes.c_ulong, ctypes.c_ulong, ctypes.c_void_p, WINEVENTPROC,
+                                           ctypes.c_ulong, ctypes.c_ulong, ctypes.c_ulong]
+        user32.SetWinEventHook.restype = ctypes.c_void_p
+        user32.UnhookWinEvent.argtypes = [ctypes.c_void_p]
+        self._callback = callback
+        self._proc = WINEVENTPROC(self._on_event)
+        self._hook = user32.SetWinEventHook(
+            EVENT_SYSTEM_FOREGROUND, EVENT_SYSTEM_FOREGROUND, None, self._proc,
+            0, 0, WINEVENT_OUTOFCONTEXT | WINEVENT_SKIPOWNPROCESS)
+        if not self._hook:
+            logging.error("SetWinEventHook failed; application profiles unavailable.")
+            self._proc = self._callback = None
+            return False
+        return True
+
+    def stop(self):
+        if self._hook:
+            ctypes.windll.user32.UnhookWinEvent(self._hook)
+        self._hook = self._proc = self._callback = None
+
+    def _on_event(self, hook, event, hwnd, id_object, id_child, thread_id, event_time):
+        process_name = self._process_name(hwnd)
+        if process_name and self._callback is not None:
+            self._callback(process_name)
+
+    @staticmethod
+    def _process_name(hwnd):
+        """Executable file name of the process owning `hwnd`, or None."""
+        user32, kernel32 = ctypes.windll.user32, ctypes.windll.kernel32
+        pid = ctypes.c_ulong()
+        user32.GetWindowThreadProcessId(ctypes.c_void_p(hwnd), ctypes.byref(pid))
+        if not pid.value:
+            return None
+        kernel32.OpenProcess.restype = ctypes.c_void_p
+        handle = kernel32.OpenProcess(PROCESS_QUERY_LIMITED_INFORMATION, False, pid.value)
+        if not handle:
+            return None
+        try:
+            size = ctypes.c_ulong(260)
+            buffer = ctypes.create_unicode_buffer(size.value)
+            if not kernel32.QueryFullProcessImageNameW(ctypes.c_void_p(handle), 0, buffer, ctypes.byref(size)):
+                return None
+            return os.path.basename(buffer.value)
+        finally:
+            kernel32.CloseHandle(ctypes.c_void_p(handle))
+
+class ForegroundWatcher(QObject):
+    """Emits profile_changed(profile) once the foreground application settles; "" when no rule matches."""
+
+    profile_changed = Signal(str)
+
+    def __init__(self, rules, source=None, debounce_ms=DEFAULT_DEBOUNCE_MS, parent=None):
+        super().__init__(parent)
+        self.matcher = ProfileRuleMatcher(rules)
+        self.source = source or WinEventForegroundSource()
+        self.current_process = None
+        self.current_profile = "" # Last emitted profile
+        self._debounce_timer = QTimer(self)
+        self._debounce_timer.setSingleShot(True)
+        self._debounce_timer.setInterval(debounce_ms)
+        self._debounce_timer.timeout.connect(self._settle)
+
+    def start(self):
+        """Starts watching. Returns False if the source is unavailable on this system."""
+        return self.source.start(self._on_foreground)
+
+    def stop(self):
+        self._debounce_timer.stop()
+        self.source.stop()
+
+    def set_rules(self, rules):
+        self.matcher = ProfileRuleMatcher(rules)
+        if self.current_process is not None:
+            self._debounce_timer.start()
+
+    def _on_foreground(self, process_name):
+        metrics.count("foreground.events")
+        self.current_process = process_name
+        self._debounce_timer.start() # Restarting postpones the switch until switching stops
+
+    def _settle(self):
+        profile = self.matcher.match(self.current_process) or ""
+        if profile != self.current_profile:
+            logging.info("Foreground application %s: profile '%s'", self.current_process, profile or "(none)")
+            self.current_profile = profile
+            self.profile_changed.emit(profile)
@@ -1,12 +1,15 @@
 # -*- coding: utf-8 -*-
 
 import ctypes
-import math
 import logging
 import platform
+import metrics
+import ramp_snapshot
+from color_pipeline import ColorPipeline, GAMMA_RANGE, CONTRAST_RANGE, DIMMING_RANGE
 
-# Configure logging
-logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+# Color temperature range offered by the UI, the CLI and the control API
+MIN_KELVIN = 2500
+MAX_KELVIN = 6500
 
 # Define necessary Windows structures and constants
 # Based on wingdi.h
@@ -47,6 +50,8 @@ class GammaController:
 
     def __init__(self):
         self.hdc = hdc # Use the globally obtained HDC
+        self.pipeline = ColorPipeline() # Per-user gamma/contrast/dimming, then the temperature
+        self.kelvin = None # Temperature last written, re-applied when an adjustment changes
         self.supported = self._check_support()
         if not self.supported:
             logging.warning("Gamma control via SetDeviceGammaRamp might not be supported or failed to initialize.")
@@ -83,44 +88,66 @@ class GammaController:
             g_gain = clamp(1.0 - 0.1 * ((kelvin - 6500) / (10000 - 6500)), 0.9, 1.0)
             b_gain = 1.0
 
-        logging.debug(f"Calculated gains for {kelvin}K: R={r_gain:.2f}, G={g_gain:.2f}, B={b_gain:.2f}")
+        logging.debug("Calculated gains for %sK: R=%.2f, G=%.2f, B=%.2f", kelvin, r_gain, g_gain, b_gain)
         return r_gain, g_gain, b_gain
 
+    @metrics.timed("gamma.set_temperature")
     def set_temperature(self, kelvin):
         """Sets the display color temperature."""
         if not self.supported:
             logging.error("Cannot set temperature: Gamma control not supported or initialized.")
             return False
 
-        logging.info(f"Setting color temperature to {kelvin}K")
-        r_gain, g_gain, b_gain = self._calculate_color_gain(kelvin)
-
-        ramp = RAMP()
-        gamma = 2.2 # Standard gamma assumption
-
-        for i in range(256):
-            # Normalize, linearize, apply gain, apply inverse gamma, scale to WORD
-            norm_intensity = i / 255.0
-            linear_intensity = math.pow(norm_intensity, gamma) # Linearize approx.
-
-            r_corrected = linear_intensity * r_gain
-            g_corrected = linear_intensity * g_gain
-            b_corrected = linear_intensity * b_gain
-
-            # Apply inverse gamma and scale
-            ramp.red[i] = int(clamp(math.pow(r_corrected, 1.0/gamma), 0.0, 1.0) * 65535 + 0.5)
-            ramp.green[i] = int(clamp(math.pow(g_corrected, 1.0/gamma), 0.0, 1.0) * 65535 + 0.5)
-            ramp.blue[i] = int(clamp(math.pow(b_corrected, 1.0/gamma), 0.0, 1.0) * 65535 + 0.5)
-
-        # Apply the new gamma ramp
-        success = SetDeviceGammaRamp(self.hdc, ctypes.byref(ramp))
+        logging.debug("Setting color temperature to %sK", kelvin) # Once per preview frame while dragging
+        self.kelvin = kelvin
+        return self._write_ramp(self._build_ramp(kelvin))
+
+    def adjustments(self):
+        """The current (gamma, contrast, dimming) adjustments."""
+        return tuple(self.pipeline.params[name][0] for name in ("gamma", "contrast", "dimming"))
+
+    def set_adjustments(self, gamma=None, contrast=None, dimming=None, write=True):
+        """
+        Sets any of the per-user adjustments (1.0 is neutral for each) and
+        rewrites the ramp at the current temperature, if one has been set.
+        With write=False the ramp is left for the next set_temperature().
+        Values are clamped to the ranges in color_pipeline.
+        """
+        for name, value, (low, high) in (("gamma", gamma, GAMMA_RANGE), ("contrast", contrast, CONTRAST_RANGE),
+                                         ("dimming", dimming, DIMMING_RANGE)):
+            if value is not None:
+                self.pipeline.set_stage(name, clamp(value, low, high))
+        if not write or self.kelvin is None or not self.supported:
+            return self.supported
+        return self._write_ramp(self._build_ramp(self.kelvin))
+
+    def _write_ramp(self, ramp):
+        """Pushes a RAMP to the display."""
+        with metrics.measure("gamma.set_ramp"):
+            success = SetDeviceGammaRamp(self.hdc, ctypes.byref(ramp))
         if not success:
             # Get error code if needed: error_code = ctypes.windll.kernel32.GetLastError()
+            metrics.count("gamma.set_ramp.failed")
             logging.error("SetDeviceGammaRamp failed.")
         else:
             logging.debug("Successfully applied new gamma ramp.")
         return success
 
+    def _build_ramp(self, kelvin):
+        """
+        Computes the gamma ramp for a color temperature with the current
+        adjustments (pure computation, no device access). Only the stages whose
+        parameters changed are recomputed; see color_pipeline.
+        """
+        self.pipeline.set_stage("temperature", *self._calculate_color_gain(kelvin))
+        return RAMP.from_buffer_copy(self.pipeline.ramp_bytes())
+
+    def save_snapshot(self, kelvin):
+        """Stores the ramp for `kelvin` as the snapshot restored early at the next launch."""
+        if not self.supported:
+            return False
+        return ramp_snapshot.save(bytes(self._build_ramp(kelvin)), kelvin)
+
     def reset_gamma(self):
         """Resets the gamma ramp to a linear default."""
         if not self.supported:
@@ -128,6 +155,7 @@ class GammaController:
             return False
 
         logging.info("Attempting to reset gamma ramp to linear default.")
+        self.kelvin = None # Adjustments no longer re-apply a temperature
         ramp = RAMP()
         for i in range(256):
             val = int((i / 255.0) * 65535 + 0.5)
@@ -136,8 +164,10 @@ class GammaController:
             ramp.blue[i] = val
 
         # Apply the linear ramp
-        success = SetDeviceGammaRamp(self.hdc, ctypes.byref(ramp))
+        with metrics.measure("gamma.set_ramp"):
+            success = SetDeviceGammaRamp(self.hdc, ctypes.byref(ramp))
         if not success:
+            metrics.count("gamma.set_ramp.failed")
             logging.error("Resetting gamma ramp failed.")
         else:
             logging.info("Gamma ramp reset to linear default.")
@@ -0,0 +1,116 @@
+# -*- coding: utf-8 -*-
+"""
+One-shot command-line mode for login scripts: apply a color setting and exit.
+
+    python main.py apply --profile "Night Mode"
+    python main.py set --kelvin 4000 [--brightness 60]
+
+Loads the settings, drives GammaController/BrightnessController directly and
+saves the new values, so the GUI starts with them next time. PySide6 is never
+imported. If the GUI is already running, the change is forwarded to it
+instead, so its sliders stay in sync and it does not overwrite the change.
+"""
+
+import sys
+import time
+import argparse
+import logging
+
+import single_instance
+from lazy_import import lazy_import
+
+# Sets up the screen DC and logs on import; only needed once a headless command runs
+gamma_controller = lazy_import("gamma_controller")
+
+COMMANDS = ("apply", "set")
+
+def is_headless_command(argv):
+    """True if argv (without the program name) selects the headless mode."""
+    return bool(argv) and argv[0] in COMMANDS
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(prog="main.py", description="护目君 (headless mode)")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    apply_parser = subparsers.add_parser("apply", help="Apply a saved profile and exit")
+    apply_parser.add_argument("--profile", required=True, metavar="NAME", help="Profile name, e.g. \"Night Mode\"")
+    set_parser = subparsers.add_parser("set", help="Set color temperature and/or brightness and exit")
+    min_kelvin, max_kelvin = gamma_controller.MIN_KELVIN, gamma_controller.MAX_KELVIN
+    set_parser.add_argument("--kelvin", type=int, metavar="K", help=f"Color temperature ({min_kelvin}-{max_kelvin})")
+    set_parser.add_argument("--brightness", type=int, metavar="PERCENT", help="Brightness (0-100)")
+    args = parser.parse_args(argv)
+    if args.command == "set":
+        if args.kelvin is None and args.brightness is None:
+            parser.error("set needs --kelvin and/or --brightness")
+        if args.kelvin is not None and not min_kelvin <= args.kelvin <= max_kelvin:
+            parser.error(f"--kelvin must be between {min_kelvin} and {max_kelvin}")
+        if args.brightness is not None and not 0 <= args.brightness <= 100:
+            parser.error("--brightness must be between 0 and 100")
+    return args
+
+def apply_color(temperature=None, brightness=None, settings=None):
+    """
+    Writes temperature/brightness to the display and saves them.
+    Brightness is skipped (like in the main window) where the display does
+    not support it. Returns False if a supported write failed.
+    """
+    import settings_manager as sm
+    if settings is None:
+        settings = sm.load_settings()
+    ok = True
+
+    # The machine policy (see settings_manager) may lock or limit either value
+    if temperature is not None:
+        temperature = sm.constrain("temperature_kelvin", temperature)
+        controller = gamma_controller.GammaController()
+        # Keep the user's gamma/contrast/dimming in the new ramp
+        controller.set_adjustments(**{name: settings.get(f"color_{name}", 1.0) for name in ("gamma", "contrast", "dimming")})
+        if controller.set_temperature(temperature):
+            settings["temperature_kelvin"] = temperature
+            controller.save_snapshot(temperature)
+        else:
+            ok = False
+
+    if brightness is not None:
+        brightness = sm.constrain("brightness_percent", brightness)
+        from brightness_controller import BrightnessController
+        brightness_controller = BrightnessController()
+        if not brightness_controller.is_supported():
+            logging.warning("Brightness control is not supported on this display; skipping brightness.")
+        elif brightness_controller.set_brightness(brightness, smooth_transition=False):
+            settings["brightness_percent"] = brightness
+        else:
+            ok = False
+
+    sm.save_settings(settings)
+    return ok
+
+def run(argv):
+    """Runs a headless command. Returns the process exit code."""
+    start = time.perf_counter()
+    args = parse_args(argv)
+
+    if args.command == "apply":
+        command = {"action": single_instance.ACTION_APPLY_PROFILE, "profile": args.profile}
+    else:
+        command = {"action": single_instance.ACTION_SET_COLOR, "temperature": args.kelvin, "brightness": args.brightness}
+
+    if not single_instance.acquire_instance_lock():
+        logging.info(f"The application is running; forwarding {command}.")
+        return 0 if single_instance.send_command(command) else 1
+
+    if args.command == "apply":
+        import settings_manager as sm
+        settings = sm.load_settings()
+        profile = settings.get("profiles", {}).get(args.profile)
+        if not profile:
+            logging.error(f"Profile '{args.profile}' not found in settings.")
+            return 2
+        ok = apply_color(profile.get("temperature"), profile.get("brightness"), settings)
+    else:
+        ok = apply_color(args.kelvin, args.brightness)
+
+    logging.info(f"Headless '{args.command}' finished in {(time.perf_counter() - start) * 1000:.1f} ms")
+    return 0 if ok else 1
+
+if __name__ == "__main__":
+    sys.exit(run(sys.argv[1:]))
@@ -2,12 +2,23 @@
 
 import logging
 import threading
-import time # Import the time module
-from pynput import keyboard
+import metrics
 from PySide6.QtCore import QObject, Signal
+from lazy_import import lazy_import
+from power_state import MODE_AC, MODE_BATTERY, MODE_DISPLAY_OFF
 
-# Configure logging
-logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+# pynput installs platform hooks on import; defer it until hotkeys are actually parsed
+keyboard = lazy_import("pynput.keyboard")
+
+# How often the listener thread checks that the keyboard hook is still alive, per power mode.
+# Stopping never waits for this: stop_listening() wakes the thread at once.
+POLL_CADENCES_MS = {MODE_AC: 1000, MODE_BATTERY: 10 * 1000, MODE_DISPLAY_OFF: None}
+
+def matching_hotkeys(pressed_keys, parsed_hotkeys):
+    """Yields each hotkey string in `parsed_hotkeys` ({hotkey_str: key_set}) whose keys are all in `pressed_keys`."""
+    for hotkey_str, required_keys in parsed_hotkeys.items():
+        if required_keys.issubset(pressed_keys):
+            yield hotkey_str
 
 class HotkeyManager(QObject):
     """Listens for global hotkeys in a separate thread and emits signals."""
@@ -28,8 +39,16 @@ class HotkeyManager(QObject):
         self._listener_thread = None
         self._listener = None
         self._stop_event = threading.Event()
+        self._wake_event = threading.Event() # Wakes the watchdog early: interval changed or stop requested
+        self.poll_interval = POLL_CADENCES_MS[MODE_AC] / 1000 # Seconds; None waits for stop_listening()
+        self.on_wakeup = None # Called on each watchdog wakeup (power state wakeup accounting)
         logging.info("HotkeyManager initialized.")
 
+    def set_poll_interval(self, interval_ms):
+        """Sets the listener watchdog interval (None: no periodic check). The watchdog picks it up at once."""
+        self.poll_interval = None if interval_ms is None else interval_ms / 1000
+        self._wake_event.set() # An untimed wait would otherwise never see the new interval
+
     def _parse_hotkey(self, hotkey_string):
         """Parses a pynput-style hotkey string into a set of keys."""
         # Basic parsing, might need refinement for complex keys
@@ -74,6 +93,7 @@ class HotkeyManager(QObject):
 
         logging.info(f"Starting hotkey listener for: {list(self.hotkey_map.keys())}")
         self._stop_event.clear()
+        self._wake_event.clear()
         self._listener_thread = threading.Thread(target=self._run_listener, daemon=True)
         self._listener_thread.start()
 
@@ -85,6 +105,7 @@ class HotkeyManager(QObject):
 
         logging.info("Stopping hotkey listener...")
         self._stop_event.set() # Signal the thread to stop
+        self._wake_event.set()
         if self._listener:
             # Stop the pynput listener itself
             # Note: This might need to be called from within the listener thread
@@ -93,7 +114,7 @@ class HotkeyManager(QObject):
                  # This might raise exceptions if called from wrong thread, hence try-except
                  keyboard.Listener.stop(self._listener)
              except Exception as e:
-                 logging.debug(f"Exception stopping listener (expected if called from main thread): {e}")
+                 logging.debug("Exception stopping listener (expected if called from main thread): %s", e)
 
         self._listener_thread.join(timeout=1.0) # Wait for thread to finish
         if self._listener_thread.is_alive():
@@ -109,14 +130,14 @@ class HotkeyManager(QObject):
         pressed_keys = set()
         hotkeys_to_check = {hk: self._parse_hotkey(hk) for hk in self.hotkey_map.keys()}
 
+        @metrics.timed("hotkey.on_press")
         def on_press(key):
             pressed_keys.add(key)
             # logging.debug(f"Pressed: {key}, Current set: {pressed_keys}")
-            for hotkey_str, required_keys in hotkeys_to_check.items():
-                if required_keys.issubset(pressed_keys):
-                    logging.info(f"Hotkey detected: {hotkey_str}")
-                    self.hotkey_pressed.emit(hotkey_str) # Emit signal
-                    # Optional: Consume the key press? Requires more complex listener setup.
+            for hotkey_str in matching_hotkeys(pressed_keys, hotkeys_to_check):
+                logging.info("Hotkey detected: %s", hotkey_str) # Repeats while held (key auto-repeat); rate-limited
+                self.hotkey_pressed.emit(hotkey_str) # Emit signal
+                # Optional: Consume the key press? Requires more complex listener setup.
 
             if self._stop_event.is_set():
                 logging.debug("Stop event detected in on_press, stopping listener.")
@@ -135,12 +156,20 @@ class HotkeyManager(QObject):
         try:
             with keyboard.Listener(on_press=on_press, on_release=on_release) as self._listener:
                 logging.info("pynput listener started.")
-                # Keep the thread alive while listener is running and stop event is not set
-                while self._listener.running and not self._stop_event.is_set():
-                    time.sleep(0.1) # Prevent busy-waiting
+                # Keep the thread alive while listener is running; the wait returns as soon as
+                # stop is requested or the interval changes, so a new interval applies at once
+                while self._listener.running:
+                    woken = self._wake_event.wait(self.poll_interval)
+                    if self._stop_event.is_set():
+                        break
+                    if woken:
+                        self._wake_event.clear() # Re-read poll_interval
+                        continue
+                    if self.on_wakeup is not None:
+                        self.on_wakeup()
             logging.info("pynput listener finished.")
         except Exception as e:
-             logging.error(f"Error running keyboard listener: {e}")
+             logging.error("Error running keyboard listener: %s", e)
         finally:
              self._listener = None # Clear listener reference
 
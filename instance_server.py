@@ -0,0 +1,83 @@
+# -*- coding: utf-8 -*-
+
+import os
+import json
+import logging
+import platform
+import threading
+from multiprocessing import AuthenticationError
+from multiprocessing.connection import Listener, Client
+from PySide6.QtCore import QObject, Signal
+
+from single_instance import get_channel_address, create_authkey, decode_command, MAX_COMMAND_BYTES
+
+class InstanceServer(QObject):
+    """Accepts commands from later launches on a background thread and re-emits them on the Qt thread."""
+
+    # Emitted with the command dict; queued to the receiver's (GUI) thread
+    command_received = Signal(dict)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.address = None
+        self._authkey = None
+        self._listener = None
+        self._thread = None
+        self._stopping = False
+
+    def start(self):
+        """Starts listening. Returns False if the channel could not be opened."""
+        try:
+            self.address = get_channel_address()
+            if platform.system() != "Windows" and os.path.exists(self.address):
+                # This process holds the instance lock, so a leftover socket file is stale
+                os.remove(self.address)
+            self._authkey = create_authkey() # New for this session; later launches read it from the runtime directory
+            self._listener = Listener(self.address, authkey=self._authkey)
+        except OSError as e:
+            logging.error(f"Failed to open instance channel {self.address}: {e}")
+            return False
+        self._thread = threading.Thread(target=self._serve, daemon=True)
+        self._thread.start()
+        logging.info(f"Listening for commands from later launches on {self.address}")
+        return True
+
+    def _serve(self):
+        """Accept loop, runs in the background thread."""
+        while not self._stopping:
+            try:
+                conn = self._listener.accept()
+            except (OSError, EOFError, AuthenticationError) as e:
+                if not self._stopping:
+                    logging.warning(f"Rejected instance connection: {e}")
+                continue
+            with conn:
+                if self._stopping:
+                    break
+                try:
+                    # JSON only: unpickling what arrives here would run code chosen by the sender
+                    command = decode_command(conn.recv_bytes(MAX_COMMAND_BYTES))
+                    if command is not None:
+                        logging.info("Received command from another launch: %s", command)
+                        self.command_received.emit(command)
+                    else:
+                        logging.warning("Ignored an invalid forwarded command.")
+                    conn.send_bytes(json.dumps(command is not None).encode('utf-8'))
+                except (OSError, EOFError) as e:
+                    logging.warning(f"Failed to read forwarded command: {e}")
+
+    def stop(self):
+        """Stops listening and removes the channel."""
+        if self._listener is None:
+            return
+        self._stopping = True
+        try:
+            # Wake the blocking accept() so the thread can exit
+            with Client(self.address, authkey=self._authkey):
+                pass
+        except (OSError, EOFError, AuthenticationError):
+            pass
+        if self._thread is not None:
+            self._thread.join(timeout=1.0)
+        self._listener.close()
+        self._listener = None
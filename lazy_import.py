@@ -0,0 +1,72 @@
+# -*- coding: utf-8 -*-
+"""
+Deferred imports for heavy or optional dependencies.
+
+    keyboard = lazy_import("pynput.keyboard")
+
+binds a placeholder module; the real import happens on first attribute
+access, so modules that only need a dependency in some code paths do not pay
+for it (or fail on platforms without it) at import time.
+"""
+
+import sys
+import types
+import importlib
+import importlib.util
+import threading
+
+_import_lock = threading.Lock()
+
+class LazyModule(types.ModuleType):
+    """Module placeholder that imports the real module on first attribute access."""
+
+    def __init__(self, name):
+        super().__init__(name)
+        self.__dict__["_lazy_module"] = None
+
+    def _load(self):
+        module = self.__dict__["_lazy_module"]
+        if module is None:
+            with _import_lock:
+                module = self.__dict__["_lazy_module"]
+                if module is None:
+                    module = importlib.import_module(self.__name__)
+                    self.__dict__["_lazy_module"] = module
+        return module
+
+    def __getattr__(self, attr):
+        # Only called for attributes not found on the placeholder itself
+        return getattr(self._load(), attr)
+
+    def __dir__(self):
+        return dir(self._load())
+
+    def __repr__(self):
+        state = "loaded" if self.__dict__["_lazy_module"] is not None else "not loaded"
+        return f"<lazy module '{self.__name__}' ({state})>"
+
+def lazy_import(name):
+    """Returns `name` from sys.modules if already imported, otherwise a LazyModule placeholder."""
+    module = sys.modules.get(name)
+    if module is not None:
+        return module
+    return LazyModule(name)
+
+def is_loaded(module):
+    """True if `module` is a real module or a LazyModule whose import already happened."""
+    if isinstance(module, LazyModule):
+        return module.__dict__["_lazy_module"] is not None
+    return module is not None
+
+def is_available(name):
+    """
+    Checks whether a top-level module can be imported, without importing it.
+    (find_spec on a dotted name would import the parent package.)
+    """
+    top_level = name.split(".", 1)[0]
+    if top_level in sys.modules:
+        return True
+    try:
+        return importlib.util.find_spec(top_level) is not None
+    except (ImportError, ValueError):
+        return False
@@ -0,0 +1,152 @@
+# -*- coding: utf-8 -*-
+"""
+Central logging configuration.
+
+setup_logging() is called once by each entry point (main.py, stats_cli.py);
+library modules just log through the root logger and never configure it.
+
+- Records are put on a queue on the calling thread and written by a
+  QueueListener thread, so slow console or disk I/O never blocks the UI
+  thread, the hotkey listener or a slider drag.
+- Output goes to stderr (when there is one) and to a size-rotated log file
+  next to the settings file.
+- A per-call-site rate limit (keyed on file and line) caps how often any one
+  DEBUG or INFO statement can emit; the number of records it dropped is
+  reported on the next one that gets through. Warnings and errors are never
+  rate-limited.
+- Call sites on hot paths use %-style arguments, e.g.
+  logging.debug("Setting brightness to %s%%", level), so a disabled level
+  costs only a level check and no string formatting.
+"""
+
+import os
+import sys
+import time
+import queue
+import atexit
+import logging
+import threading
+import logging.handlers
+
+LOG_FILE = "humujun.log"
+LOG_FORMAT = '%(asctime)s - %(levelname)s - %(message)s'
+MAX_LOG_BYTES = 1024 * 1024
+LOG_BACKUP_COUNT = 3
+RATE_LIMIT_BURST = 5 # Records allowed per call site...
+RATE_LIMIT_INTERVAL = 1.0 # ...per this many seconds
+RATE_LIMIT_MAX_LEVEL = logging.INFO # Records above this level always pass
+
+_listener = None
+_queue_handler = None
+_rate_limit_filter = None
+
+class RateLimitFilter(logging.Filter):
+    """
+    Drops records at or below `max_level` from a call site that has already
+    logged `burst` times in the current `interval`.
+    """
+
+    def __init__(self, burst=RATE_LIMIT_BURST, interval=RATE_LIMIT_INTERVAL, max_level=RATE_LIMIT_MAX_LEVEL):
+        super().__init__()
+        self.burst = burst
+        self.interval = interval
+        self.max_level = max_level
+        self._sites = {} # (pathname, lineno) -> [window_start, count_in_window, suppressed]
+        self._lock = threading.Lock()
+
+    def filter(self, record):
+        if record.levelno > self.max_level:
+            return True # Warnings and errors are never dropped
+        key = (record.pathname, record.lineno)
+        now = time.monotonic()
+        with self._lock:
+            site = self._sites.get(key)
+            if site is None:
+                self._sites[key] = [now, 1, 0]
+                return True
+            if now - site[0] >= self.interval:
+                site[0], site[1] = now, 0
+            if site[1] >= self.burst:
+                site[2] += 1
+                return False
+            site[1] += 1
+            suppressed, site[2] = site[2], 0
+        if suppressed:
+            # Formatted here, on a record that is going to be written anyway
+            record.msg = f"{record.getMessage()} ({suppressed} similar messages suppressed)"
+            record.args = None
+        return True
+
+    def pop_suppressed(self):
+        """Returns {(pathname, lineno): count} for drops not yet reported, and resets them."""
+        with self._lock:
+            pending = {key: site[2] for key, site in self._sites.items() if site[2]}
+            for key in pending:
+                self._sites[key][2] = 0
+        return pending
+
+def get_log_path():
+    import settings_manager as sm
+    return os.path.join(os.path.dirname(sm.get_settings_path()), LOG_FILE)
+
+def setup_logging(level=logging.INFO, log_file=True, console=True):
+    """
+    Routes the root logger through a queue to stderr and a rotating log file.
+    `log_file` may be True (default location), a path, or False. Safe to call
+    more than once; later calls only change the level.
+    """
+    global _listener, _queue_handler, _rate_limit_filter
+    root = logging.getLogger()
+    root.setLevel(level)
+    if _listener is not None:
+        return
+
+    # The queue goes in first: resolving the log path below may create the data
+    # directory and log that, which would otherwise trigger logging's implicit
+    # basicConfig. Records queued before the listener starts are written by it.
+    log_queue = queue.SimpleQueue()
+    queue_handler = logging.handlers.QueueHandler(log_queue)
+    _rate_limit_filter = RateLimitFilter()
+    queue_handler.addFilter(_rate_limit_filter)
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    root.addHandler(queue_handler)
+    _queue_handler = queue_handler
+
+    formatter = logging.Formatter(LOG_FORMAT)
+    handlers = []
+    if console and sys.stderr is not None: # Windowed builds have no console
+        stream_handler = logging.StreamHandler(sys.stderr)
+        stream_handler.setFormatter(formatter)
+        handlers.append(stream_handler)
+    if log_file:
+        path = get_log_path() if log_file is True else log_file
+        try:
+            file_handler = logging.handlers.RotatingFileHandler(
+                path, maxBytes=MAX_LOG_BYTES, backupCount=LOG_BACKUP_COUNT, encoding='utf-8', delay=True)
+            file_handler.setFormatter(formatter)
+            handlers.append(file_handler)
+        except OSError as e:
+            print(f"Could not open log file {path}: {e}", file=sys.stderr or sys.__stderr__)
+
+    _listener = logging.handlers.QueueListener(log_queue, *handlers, respect_handler_level=True)
+    _listener.start()
+    atexit.register(shutdown_logging)
+
+def shutdown_logging():
+    """Reports outstanding rate-limit drops, writes out queued records and stops the writer thread."""
+    global _listener
+    if _listener is not None:
+        # Anything logged after this point (e.g. during interpreter teardown) is written synchronously
+        root = logging.getLogger()
+        root.removeHandler(_queue_handler)
+        for handler in _listener.handlers:
+            root.addHandler(handler)
+        _listener.stop() # Drains the queue first, so the summary below comes last
+        for (pathname, lineno), count in _rate_limit_filter.pop_suppressed().items():
+            # Straight to the handlers: these lines would otherwise hit the rate limit themselves
+            record = logging.LogRecord("root", logging.INFO, pathname, lineno,
+                                       "%s messages from %s:%s were suppressed by the rate limit",
+                                       (count, os.path.basename(pathname), lineno), None)
+            _listener.handle(record)
+        _listener = None
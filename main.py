@@ -1,32 +1,145 @@
 # EyeProtector Main Application
 # -*- coding: utf-8 -*-
 
+import time
+_PROCESS_START = time.perf_counter() # Time zero for --profile-startup
+
+import os
 import sys
+import argparse
 import logging
-from PySide6.QtWidgets import QApplication
-from main_window import MainWindow # Import the main window class
+import startup_profiler
+import single_instance
+import headless_cli
+import log_setup
+import ramp_snapshot
+
+def parse_args(argv):
+    """Parses our command-line options; unknown arguments are left for Qt."""
+    parser = argparse.ArgumentParser(prog="main.py", description="护目君")
+    actions = parser.add_mutually_exclusive_group()
+    actions.add_argument("--show", action="store_true", help="Show the main window (default action)")
+    actions.add_argument("--profile", metavar="NAME", help="Apply a saved profile, e.g. \"Night Mode\"")
+    actions.add_argument("--pause-reminders", action="store_true", help="Pause the rest reminder countdown")
+    actions.add_argument("--resume-reminders", action="store_true", help="Resume a paused reminder countdown")
+    parser.add_argument("--tray", action="store_true",
+                        help="Start in the system tray without opening the main window")
+    parser.add_argument("--autostart", action="store_true",
+                        help="Launched at login: start in the tray, apply the color at once and defer "
+                             "the rest of startup until the system is idle")
+    parser.add_argument("--profile-startup", nargs="?", const="", default=None, metavar="REPORT.json",
+                        help="Write startup phase timings as JSON (to stdout, or to the given file)")
+    args, _ = parser.parse_known_args(argv)
+    return args
+
+def _write_startup_report(output_path):
+    import settings_manager as sm
+    path = output_path
+    if not path and sys.stdout is None:
+        # Windowed builds have no console; write next to the settings file
+        path = os.path.join(os.path.dirname(sm.get_settings_path()), "startup_profile.json")
+    startup_profiler.write_report(path)
+
+def _install_first_paint_report(window, output_path):
+    """Marks the window's first paint, then writes the startup profile."""
+    from PySide6.QtCore import QObject, QEvent, QTimer
 
-# Configure basic logging for the main application entry point
-logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    class FirstPaintWatcher(QObject):
+        def eventFilter(self, watched, event):
+            if event.type() == QEvent.Type.Paint:
+                startup_profiler.mark("first_paint")
+                watched.removeEventFilter(self)
+                # Report once the paint has been handled
+                QTimer.singleShot(0, lambda: _write_startup_report(output_path))
+            return False
+
+    watcher = FirstPaintWatcher(window)
+    window.installEventFilter(watcher)
 
 def main():
     """Main function to start the application."""
+    log_setup.setup_logging()
+
+    # `main.py apply ...` / `main.py set ...` run once without Qt and exit
+    if headless_cli.is_headless_command(sys.argv[1:]):
+        sys.exit(headless_cli.run(sys.argv[1:]))
+
+    args = parse_args(sys.argv[1:])
+    if args.profile_startup is not None:
+        startup_profiler.enable(origin=_PROCESS_START)
+    command = single_instance.command_from_args(args)
+
+    # A second launch hands its action to the running instance and exits before loading Qt
+    if not single_instance.acquire_instance_lock():
+        if (args.tray or args.autostart) and command["action"] == single_instance.ACTION_SHOW:
+            sys.exit(0) # Already running in the tray or a window; nothing to do
+        logging.info(f"Another instance is running; forwarding {command}.")
+        sys.exit(0 if single_instance.send_command(command) else 1)
+
     logging.info("EyeProtector Application Starting...")
+    # Put the saved color temperature back on screen before the slow imports below
+    with startup_profiler.span("ramp_snapshot"):
+        ramp_snapshot.restore()
+
+    with startup_profiler.span("imports"):
+        from PySide6.QtWidgets import QApplication
+        from app_core import AppCore
+        from instance_server import InstanceServer
 
     # Create the Qt Application instance
-    app = QApplication(sys.argv)
+    with startup_profiler.span("qapplication"):
+        app = QApplication(sys.argv)
+
+    # Controllers, reminders and hotkeys live in the core, which outlives the window.
+    # At login (--autostart) it only applies the color now and defers the rest.
+    with startup_profiler.span("app_core"):
+        core = AppCore(staged=args.autostart)
+
+    # Accept actions from later launches; a forwarded action also ends a staged startup early
+    instance_server = InstanceServer(app)
+    instance_server.command_received.connect(core.handle_remote_command)
+    instance_server.start()
+
+    control_server = None
+
+    def finish_startup():
+        nonlocal control_server
+        with startup_profiler.span("tray"):
+            resident = core.enable_tray()
+
+        if (args.tray or args.autostart) and resident:
+            logging.info("Started in the system tray.")
+            if args.profile_startup is not None:
+                _write_startup_report(args.profile_startup or None)
+        elif core.window is None:
+            # Create and show the main window
+            with startup_profiler.span("main_window"):
+                window = core.show_window()
+            logging.info("MainWindow shown.")
+            if args.profile_startup is not None:
+                _install_first_paint_report(window, args.profile_startup or None)
+
+        # Optional JSON-RPC automation channel (see control_server.py)
+        if core.settings.get("control_api_enabled", False):
+            from control_server import ControlServer
+            control_server = ControlServer(core, app)
+            control_server.start()
 
-    # Create and show the main window
-    window = MainWindow()
-    logging.info("MainWindow instance created.") # ADDED LOG
-    logging.info("Attempting to show MainWindow...") # ADDED LOG
-    window.show() # Restore the show call
-    logging.info("MainWindow shown.") # ADDED LOG
+    if core.startup_complete:
+        finish_startup()
+    else:
+        core.startup_completed.connect(finish_startup)
+        core.begin_staged_startup()
+    if command["action"] != single_instance.ACTION_SHOW:
+        core.handle_remote_command(command) # Our own command-line action
 
     logging.info("Entering Qt event loop.")
     # Start the Qt event loop
     exit_code = app.exec() # Capture exit code
-    logging.info(f"Exiting Qt event loop with code {exit_code}.") # ADDED LOG
+    instance_server.stop()
+    if control_server is not None:
+        control_server.stop()
+    logging.info(f"Exiting Qt event loop with code {exit_code}.")
     sys.exit(exit_code) # Exit with the code
 
 if __name__ == "__main__":
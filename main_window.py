@@ -2,45 +2,50 @@
 
 import sys
 import os # Import os for path manipulation
+import math
 import logging
-import datetime # Import datetime for usage tracking
 from PySide6.QtWidgets import (
     QApplication, QMainWindow, QWidget, QVBoxLayout, QHBoxLayout, QLabel,
-    QSlider, QPushButton, QSystemTrayIcon, QMenu, QSpinBox, QGroupBox, QCheckBox
+    QSlider, QPushButton, QSpinBox, QGroupBox, QCheckBox, QTabWidget
 )
-from PySide6.QtCore import Qt, QTimer
-from PySide6.QtGui import QIcon, QAction
-
-# Import our controllers and managers
-from gamma_controller import GammaController
-from brightness_controller import BrightnessController
-from reminder_manager import ReminderManager # Re-enabled import
-from hotkey_manager import HotkeyManager # Re-enabled import
-import settings_manager as sm # Import settings manager
-import stats_manager # Import stats manager
-import startup_manager # Re-enabled import
-
-# Configure logging
-logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
-
-def resource_path(relative_path):
-    """ Get absolute path to resource, works for dev and for PyInstaller """
-    try:
-        # PyInstaller creates a temp folder and stores path in _MEIPASS
-        # Note: Adjust if your main script isn't at the root where PyInstaller runs
-        base_path = sys._MEIPASS
-    except Exception:
-        # Not running as a bundle, use the directory of this script file
-        base_path = os.path.dirname(os.path.abspath(__file__))
+from PySide6.QtCore import Qt
+from PySide6.QtGui import QIcon
 
-    return os.path.join(base_path, relative_path)
+from app_core import AppCore, resource_path, COLOR_ADJUSTMENT_SETTINGS
+from gamma_controller import MIN_KELVIN, MAX_KELVIN
+from color_pipeline import GAMMA_RANGE, CONTRAST_RANGE, DIMMING_RANGE
+import startup_manager # Re-enabled import
+import settings_manager as sm
+from slider_preview import SliderPreview
+from diagnostics_panel import DiagnosticsPanel
+import startup_profiler
+
+POLICY_LOCKED_TOOLTIP = "此设置由管理员策略锁定"
+# Display adjustment sliders: name, label, range; sliders run in hundredths
+ADJUSTMENTS = (
+    ("gamma", "伽马", GAMMA_RANGE),
+    ("contrast", "对比度", CONTRAST_RANGE),
+    ("dimming", "软件调暗", DIMMING_RANGE),
+)
+ADJUSTMENT_SCALE = 100
 
 class MainWindow(QMainWindow):
-    """Main application window."""
+    """
+    Main application window: a view onto an AppCore.
+
+    The window owns no long-lived state. It is deleted when closed and can be
+    rebuilt at any time from the core, which keeps running in tray mode.
+    """
 
-    def __init__(self):
+    def __init__(self, core):
         super().__init__()
-        self.start_time = datetime.datetime.now() # Record start time for usage stats
+        self.core = core
+        # Shared with the core, which outlives the window
+        self.settings = core.settings
+        self.gamma_controller = core.gamma_controller
+        self.brightness_controller = core.brightness_controller
+        self.reminder_manager = core.reminder_manager
+        self.setAttribute(Qt.WidgetAttribute.WA_DeleteOnClose) # Free the widgets, not just hide them
         self.setWindowTitle("护目君") # Changed window title back
         icon_path = resource_path("Mind.ico") # Get correct path for icon
         if os.path.exists(icon_path):
@@ -49,36 +54,28 @@ class MainWindow(QMainWindow):
              logging.warning(f"Icon file not found at resolved path: {icon_path}")
 
 
-        # Load settings first
-        self.settings = sm.load_settings()
-        logging.info(f"Loaded settings: {self.settings}")
-
-        # Initialize controllers
-        self.gamma_controller = GammaController()
-        self.brightness_controller = BrightnessController()
-        self.reminder_manager = ReminderManager(self) # Re-enabled instantiation
-        # Apply loaded reminder durations (using new keys/units) # Re-enabled
-        self.reminder_manager.set_durations( # Re-enabled
-            self.settings.get("reminder_work_hours", 1), # Use hours # Re-enabled
-            self.settings.get("reminder_rest_minutes", 5) # Use minutes # Re-enabled
-        ) # Re-enabled
-
-
         # --- Main Layout ---
-        central_widget = QWidget()
-        self.main_layout = QVBoxLayout(central_widget)
-        self.setCentralWidget(central_widget)
+        self.tabs = QTabWidget()
+        settings_page = QWidget()
+        self.main_layout = QVBoxLayout(settings_page)
+        self.tabs.addTab(settings_page, "设置")
+        self.setCentralWidget(self.tabs)
 
         # --- Temperature Control ---
         temp_layout = QHBoxLayout()
-        self.temp_label = QLabel("色温 (Kelvin): 6500K")
+        self.temp_label = QLabel(f"色温 (Kelvin): {self.settings.get('temperature_kelvin', 6500)}K")
         self.temp_slider = QSlider(Qt.Orientation.Horizontal)
-        self.temp_slider.setRange(2500, 6500) # Reverted minimum range to 2500K
+        self.temp_slider.setRange(MIN_KELVIN, MAX_KELVIN)
         self.temp_slider.setValue(self.settings.get("temperature_kelvin", 6500)) # Use loaded value
         self.temp_slider.setSingleStep(100) # Step size
         self.temp_slider.setTickInterval(500)
         self.temp_slider.setTickPosition(QSlider.TickPosition.TicksBelow)
         self.temp_slider.valueChanged.connect(self.on_temperature_change)
+        # Live preview: at most one gamma write per frame, one save per drag
+        self.temp_preview = SliderPreview(
+            self.temp_slider, self.gamma_controller.set_temperature,
+            self._commit_slider_settings, parent=self
+        )
 
         temp_layout.addWidget(self.temp_label)
         temp_layout.addWidget(self.temp_slider)
@@ -96,11 +93,51 @@ class MainWindow(QMainWindow):
         self.brightness_slider.setTickPosition(QSlider.TickPosition.TicksBelow)
         self.brightness_slider.valueChanged.connect(self.on_brightness_change)
         self.brightness_slider.setEnabled(self.brightness_controller.is_supported()) # Enable only if supported
+        self.brightness_preview = SliderPreview(
+            self.brightness_slider,
+            lambda level: self.brightness_controller.set_brightness(level, smooth_transition=False), # Direct set for responsiveness
+            self._commit_slider_settings, parent=self
+        )
 
         brightness_layout.addWidget(self.brightness_label)
         brightness_layout.addWidget(self.brightness_slider)
         self.main_layout.addLayout(brightness_layout)
 
+        self.adaptive_brightness_checkbox = QCheckBox("根据环境光自动调节亮度")
+        self.adaptive_brightness_checkbox.setChecked(self.core.adaptive_brightness is not None)
+        self.adaptive_brightness_checkbox.setEnabled(self.brightness_controller.is_supported())
+        self.adaptive_brightness_checkbox.toggled.connect(self.toggle_adaptive_brightness)
+        self.main_layout.addWidget(self.adaptive_brightness_checkbox)
+
+        # --- Display Adjustments ---
+        # Gamma, contrast and dimming stages of the gamma ramp, previewed like the temperature
+        adjustment_group = QGroupBox("显示调整 (低视力辅助)")
+        adjustment_layout = QVBoxLayout()
+        self.adjustment_sliders = {}
+        self.adjustment_labels = {}
+        self.adjustment_previews = []
+        for name, text, (low, high) in ADJUSTMENTS:
+            row = QHBoxLayout()
+            label = QLabel()
+            slider = QSlider(Qt.Orientation.Horizontal)
+            slider.setRange(round(low * ADJUSTMENT_SCALE), round(high * ADJUSTMENT_SCALE))
+            slider.setValue(round(self.settings.get(COLOR_ADJUSTMENT_SETTINGS[name], 1.0) * ADJUSTMENT_SCALE))
+            slider.setSingleStep(5)
+            preview = SliderPreview(
+                slider, lambda value, name=name: self.gamma_controller.set_adjustments(**{name: value / ADJUSTMENT_SCALE}),
+                self._commit_slider_settings, parent=self
+            )
+            slider.valueChanged.connect(lambda value, name=name, preview=preview: self.on_adjustment_change(name, value, preview))
+            self.adjustment_sliders[name] = slider
+            self.adjustment_labels[name] = (label, text)
+            self.adjustment_previews.append(preview)
+            self.update_adjustment_label(name, slider.value())
+            row.addWidget(label)
+            row.addWidget(slider)
+            adjustment_layout.addLayout(row)
+        adjustment_group.setLayout(adjustment_layout)
+        self.main_layout.addWidget(adjustment_group)
+
         # --- Reset Button ---
         self.reset_button = QPushButton("恢复默认设置")
         self.reset_button.clicked.connect(self.reset_settings)
@@ -127,6 +164,10 @@ class MainWindow(QMainWindow):
         self.rest_time_spinbox.setValue(self.settings.get("reminder_rest_minutes", 5)) # Use minutes
         self.rest_time_spinbox.valueChanged.connect(self.update_reminder_times)
 
+        self.rest_overlay_checkbox = QCheckBox("休息时全屏显示倒计时")
+        self.rest_overlay_checkbox.setChecked(self.settings.get("rest_overlay_enabled", True))
+        self.rest_overlay_checkbox.toggled.connect(self.core.set_rest_overlay_enabled)
+
         time_layout.addWidget(self.work_time_label)
         time_layout.addWidget(self.work_time_spinbox)
         time_layout.addStretch() # Add space
@@ -135,12 +176,13 @@ class MainWindow(QMainWindow):
 
         reminder_layout.addWidget(self.reminder_enabled_checkbox)
         reminder_layout.addLayout(time_layout)
+        reminder_layout.addWidget(self.rest_overlay_checkbox)
         reminder_group.setLayout(reminder_layout)
         self.main_layout.addWidget(reminder_group) # Re-enabled adding widget
 
         # Enable/disable spinboxes based on checkbox initial state
-        self.work_time_spinbox.setEnabled(self.reminder_enabled_checkbox.isChecked())
-        self.rest_time_spinbox.setEnabled(self.reminder_enabled_checkbox.isChecked())
+        self.work_time_spinbox.setEnabled(self.reminder_enabled_checkbox.isChecked() and not sm.is_locked("reminder_work_hours"))
+        self.rest_time_spinbox.setEnabled(self.reminder_enabled_checkbox.isChecked() and not sm.is_locked("reminder_rest_minutes"))
 
 
         # --- Auto Start Settings --- (Re-enabled)
@@ -149,7 +191,8 @@ class MainWindow(QMainWindow):
         self.auto_start_checkbox = QCheckBox("开机时自动启动 护目君") # Changed checkbox text back
         # Set initial state based on settings AND registry check for consistency
         initial_auto_start_setting = self.settings.get("auto_start_enabled", False)
-        actual_auto_start_status = startup_manager.is_auto_start_enabled()
+        with startup_profiler.span("registry_check"):
+            actual_auto_start_status = startup_manager.is_auto_start_enabled()
         if initial_auto_start_setting != actual_auto_start_status:
              logging.warning(f"Settings file auto-start ({initial_auto_start_setting}) differs from registry ({actual_auto_start_status}). Using registry status.")
              # Optionally update setting file here to match registry
@@ -161,93 +204,119 @@ class MainWindow(QMainWindow):
 
         self.auto_start_checkbox.toggled.connect(self.toggle_auto_start)
         auto_start_layout.addWidget(self.auto_start_checkbox)
+        self.tray_checkbox = QCheckBox("关闭窗口后在托盘中继续运行")
+        self.tray_checkbox.setChecked(self.settings.get("tray_enabled", True))
+        self.tray_checkbox.toggled.connect(self.core.set_tray_enabled)
+        auto_start_layout.addWidget(self.tray_checkbox)
+        self.app_profiles_checkbox = QCheckBox("按前台程序自动切换情景模式")
+        self.app_profiles_checkbox.setChecked(self.core.foreground_watcher is not None)
+        self.app_profiles_checkbox.toggled.connect(self.toggle_app_profiles)
+        auto_start_layout.addWidget(self.app_profiles_checkbox)
         auto_start_group.setLayout(auto_start_layout)
         self.main_layout.addWidget(auto_start_group) # Re-enabled adding widget
 
+        # --- Diagnostics Tab ---
+        self.diagnostics_panel = DiagnosticsPanel(self.core)
+        self.tabs.addTab(self.diagnostics_panel, "诊断")
 
-        # --- Initialize Control States ---
-        self.update_brightness_label() # Get initial brightness if possible
-
-        # --- System Tray Icon (Basic Setup) ---
-        # self.create_tray_icon() # Implement later
 
         # --- Initialize Control States ---
-        # Apply initial temperature and brightness from loaded settings
-        self.apply_initial_settings()
         # Update brightness label based on actual capability/value
         self.update_brightness_label()
+        self.apply_policy_to_controls()
 
-        # --- System Tray Icon (Basic Setup) ---
-        # self.create_tray_icon() # Implement later
-
-        # --- Hotkey Manager --- (Re-enabled)
-        self.hotkey_manager = HotkeyManager(self.settings.get("hotkeys", {}), self)
-        self.hotkey_manager.hotkey_pressed.connect(self.handle_hotkey_press)
-        logging.info("Attempting to start hotkey listener...") # ADDED LOG
-        self.hotkey_manager.start_listening() # Re-enabled listener start
-        logging.info("Hotkey listener started (or attempted).") # ADDED LOG
+        # Follow color changes made while the window is open (profiles, hotkeys, tray, remote commands)
+        self.core.color_changed.connect(self.on_color_changed)
 
         logging.info("MainWindow initialized.")
 
 
-    # --- Settings Load/Save ---
-    def apply_initial_settings(self):
-        """Apply the loaded temperature and brightness settings."""
-        logging.info("Applying initial settings from loaded configuration.")
-        # Apply temperature
-        initial_temp = self.settings.get("temperature_kelvin", 6500)
-        self.temp_label.setText(f"色温 (Kelvin): {initial_temp}K") # Update label immediately
-        self.gamma_controller.set_temperature(initial_temp)
-
-        # Apply brightness (if supported)
-        if self.brightness_controller.is_supported():
-            initial_brightness = self.settings.get("brightness_percent", 80)
-            self.brightness_label.setText(f"亮度 (%): {initial_brightness}%") # Update label immediately
-            self.brightness_controller.set_brightness(initial_brightness, smooth_transition=False)
-        else:
-            # Ensure slider is disabled if brightness not supported
-             self.brightness_slider.setEnabled(False)
-
-
+    # --- Machine Policy ---
+    def apply_policy_to_controls(self):
+        """Disables controls whose setting the machine policy locks and narrows ranges to its limits."""
+        controls = {
+            "temperature_kelvin": self.temp_slider,
+            "brightness_percent": self.brightness_slider,
+            "adaptive_brightness_enabled": self.adaptive_brightness_checkbox,
+            "color_gamma": self.adjustment_sliders["gamma"],
+            "color_contrast": self.adjustment_sliders["contrast"],
+            "color_dimming": self.adjustment_sliders["dimming"],
+            "reminder_enabled": self.reminder_enabled_checkbox,
+            "reminder_work_hours": self.work_time_spinbox,
+            "reminder_rest_minutes": self.rest_time_spinbox,
+            "rest_overlay_enabled": self.rest_overlay_checkbox,
+            "auto_start_enabled": self.auto_start_checkbox,
+            "tray_enabled": self.tray_checkbox,
+            "app_profiles_enabled": self.app_profiles_checkbox,
+        }
+        for key, widget in controls.items():
+            if sm.is_locked(key):
+                widget.setEnabled(False)
+                widget.setToolTip(POLICY_LOCKED_TOOLTIP)
+                continue
+            low, high = sm.get_limits(key)
+            if key in ("color_gamma", "color_contrast", "color_dimming"): # Sliders in hundredths
+                low = None if low is None else low * ADJUSTMENT_SCALE
+                high = None if high is None else high * ADJUSTMENT_SCALE
+            if (low is not None or high is not None) and hasattr(widget, "setRange"):
+                widget.blockSignals(True) # A value pulled into range is already the enforced setting
+                widget.setRange(max(widget.minimum(), math.ceil(low)) if low is not None else widget.minimum(),
+                                min(widget.maximum(), math.floor(high)) if high is not None else widget.maximum())
+                widget.blockSignals(False)
+
+
+    # --- Settings Save ---
     def save_current_settings(self):
         """Gather current UI state and save it to the settings file."""
-        self.settings["temperature_kelvin"] = self.temp_slider.value()
-        if self.brightness_controller.is_supported():
-            # Only save brightness if it's supported and controllable
+        # While an application profile is in effect the sliders show its color, not the user's own
+        user_color = self.core.app_profile is None
+        if user_color:
+            self.settings["temperature_kelvin"] = self.temp_slider.value()
+        if self.brightness_controller.is_supported() and self.core.adaptive_brightness is None and user_color:
+            # Only save brightness if it's supported and controllable, and not currently sensor-driven
             # Use slider value as the target, even if get_brightness fails sometimes
             self.settings["brightness_percent"] = self.brightness_slider.value()
+        for name, slider in self.adjustment_sliders.items():
+            if not sm.is_locked(COLOR_ADJUSTMENT_SETTINGS[name]):
+                self.settings[COLOR_ADJUSTMENT_SETTINGS[name]] = slider.value() / ADJUSTMENT_SCALE
         # Re-enabled reminder settings saving
         self.settings["reminder_enabled"] = self.reminder_enabled_checkbox.isChecked()
         self.settings["reminder_work_hours"] = self.work_time_spinbox.value() # Save hours
         self.settings["reminder_rest_minutes"] = self.rest_time_spinbox.value() # Save minutes
         self.settings["auto_start_enabled"] = self.auto_start_checkbox.isChecked() # Re-enabled auto-start state saving
+        self.core.save_settings()
+
 
-        logging.debug(f"Saving settings: {self.settings}")
-        sm.save_settings(self.settings)
+    # --- Adaptive Brightness ---
+    def toggle_adaptive_brightness(self, checked):
+        """Start or stop following the ambient light sensor."""
+        if not self.core.set_adaptive_brightness_enabled(checked):
+            # No sensor on this device: revert the box without re-triggering this handler
+            self.adaptive_brightness_checkbox.blockSignals(True)
+            self.adaptive_brightness_checkbox.setChecked(False)
+            self.adaptive_brightness_checkbox.blockSignals(False)
+            self.adaptive_brightness_checkbox.setToolTip("未检测到环境光传感器")
+
+
+    def toggle_app_profiles(self, checked):
+        """Start or stop switching profiles by foreground application."""
+        if not self.core.set_app_profiles_enabled(checked):
+            self.app_profiles_checkbox.blockSignals(True)
+            self.app_profiles_checkbox.setChecked(False)
+            self.app_profiles_checkbox.blockSignals(False)
+            self.app_profiles_checkbox.setToolTip("当前系统不支持前台窗口事件")
 
 
     # --- Reminder Control Logic --- (Re-enabled)
     def toggle_reminder(self, checked):
         """Enable or disable the reminder timer based on checkbox state."""
-        self.work_time_spinbox.setEnabled(checked)
-        self.rest_time_spinbox.setEnabled(checked)
-        if checked:
-            logging.info("Reminder enabled by user.")
-            self.update_reminder_times() # Start timer with current values
-        else:
-            logging.info("Reminder disabled by user.")
-            self.reminder_manager.stop_timer()
-        self.save_current_settings() # Save the toggle state
+        self.work_time_spinbox.setEnabled(checked and not sm.is_locked("reminder_work_hours"))
+        self.rest_time_spinbox.setEnabled(checked and not sm.is_locked("reminder_rest_minutes"))
+        self.core.set_reminder_enabled(checked) # Starts or stops the timer and saves
 
     def update_reminder_times(self):
         """Update reminder durations when spinboxes change and restart timer if enabled."""
-        work_hours = self.work_time_spinbox.value()
-        rest_minutes = self.rest_time_spinbox.value()
-        logging.info(f"Reminder times updated: Work={work_hours}h, Rest={rest_minutes}m")
-        self.reminder_manager.set_durations(work_hours, rest_minutes)
-        if self.reminder_enabled_checkbox.isChecked():
-            self.reminder_manager.start_timer() # Restart timer with new values
-        self.save_current_settings() # Save the new time settings
+        self.core.set_reminder_durations(self.work_time_spinbox.value(), self.rest_time_spinbox.value())
 
 
     # --- Slider Callbacks ---
@@ -256,17 +325,31 @@ class MainWindow(QMainWindow):
         kelvin = value
         # Ensure value aligns with slider steps if needed (though slider handles range)
         self.temp_label.setText(f"色温 (Kelvin): {kelvin}K")
-        logging.debug(f"Slider changed, setting temperature to {kelvin}K")
-        if self.gamma_controller.set_temperature(kelvin):
-            self.save_current_settings() # Save on successful change
+        # The preview pipeline applies the newest value once per frame and saves when the drag ends
+        self.temp_preview.request(kelvin)
 
     def on_brightness_change(self, value):
         """Handle brightness slider changes."""
         level = value
         self.brightness_label.setText(f"亮度 (%): {level}%")
-        logging.debug(f"Slider changed, setting brightness to {level}%")
-        if self.brightness_controller.set_brightness(level, smooth_transition=False): # Direct set for responsiveness
-             self.save_current_settings() # Save on successful change
+        self.brightness_preview.request(level)
+
+    def on_adjustment_change(self, name, value, preview):
+        """Handle gamma/contrast/dimming slider changes."""
+        self.update_adjustment_label(name, value)
+        preview.request(value)
+
+    def update_adjustment_label(self, name, value):
+        label, text = self.adjustment_labels[name]
+        if name == "dimming":
+            label.setText(f"{text}: {value}%")
+        else:
+            label.setText(f"{text}: {value / ADJUSTMENT_SCALE:.2f}")
+
+    def _commit_slider_settings(self, value):
+        """Persist settings once a slider preview settles (release or idle)."""
+        logging.debug("Slider settled at %s, saving settings.", value)
+        self.save_current_settings()
 
     def update_brightness_label(self):
         """Update brightness label and slider with current value."""
@@ -288,87 +371,47 @@ class MainWindow(QMainWindow):
     def reset_settings(self):
         """Reset temperature and brightness to defaults."""
         logging.info("Resetting settings to default.")
-        # Reset temperature
         default_temp = 6500
-        self.temp_slider.setValue(default_temp) # This will trigger on_temperature_change
-        # self.gamma_controller.reset_gamma() # Slider change already calls set_temperature
-
-        # Reset brightness (if supported)
-        if self.brightness_controller.is_supported():
-            # What's the 'default' brightness? Often 100% or last user setting.
-            # Let's try setting to 80% as a sensible default reset.
-            default_brightness = 80
-            # We need to get the *actual* default from the system if possible,
-            # but WMI doesn't provide a 'reset' function easily.
-            # Setting to a fixed value like 80 or 100 is a common approach.
-            self.brightness_slider.setValue(default_brightness) # This triggers on_brightness_change
-            # self.brightness_controller.set_brightness(default_brightness)
-
+        # What's the 'default' brightness? Often 100% or last user setting.
+        # WMI doesn't provide a 'reset' function, so a fixed 80% is used as a sensible default.
+        default_brightness = 80
+        # One combined update and a single save (applies brightness only if supported)
+        self.core.apply_color_settings(default_temp, default_brightness)
         logging.info("Settings reset (Temperature to 6500K, Brightness attempt to 80%).")
-        # Save the reset state
-        self.save_current_settings()
-
-
-    # --- Hotkey Handling --- (Re-enabled)
-    def handle_hotkey_press(self, hotkey_str):
-        """Applies the profile associated with the pressed hotkey."""
-        logging.info(f"Hotkey pressed: {hotkey_str}")
-        profile_name = self.settings.get("hotkeys", {}).get(hotkey_str)
-
-        if not profile_name:
-            logging.warning(f"No profile associated with hotkey: {hotkey_str}")
-            return
 
-        profile_settings = self.settings.get("profiles", {}).get(profile_name)
-        if not profile_settings:
-            logging.warning(f"Profile '{profile_name}' not found in settings for hotkey {hotkey_str}")
-            return
 
-        logging.info(f"Applying profile '{profile_name}' triggered by hotkey {hotkey_str}")
-
-        # Apply temperature
-        temp = profile_settings.get("temperature")
-        if temp is not None:
-            self.temp_slider.setValue(temp) # This triggers on_temperature_change -> save_current_settings
-
-        # Apply brightness (if supported)
-        brightness = profile_settings.get("brightness")
-        if brightness is not None and self.brightness_controller.is_supported():
-             self.brightness_slider.setValue(brightness) # This triggers on_brightness_change -> save_current_settings
-
-        # Note: We don't save settings here directly, as the slider value changes
-        # already trigger the save. If they didn't, we would call self.save_current_settings() here.
+    # --- Color Changes From The Core ---
+    def on_color_changed(self, temperature, brightness):
+        """
+        Move the sliders to values the core has already applied and saved.
+        Signals are blocked, so the preview pipeline does not fire a second
+        hardware write or save.
+        """
+        self.temp_slider.blockSignals(True)
+        self.temp_slider.setValue(temperature)
+        self.temp_slider.blockSignals(False)
+        self.temp_label.setText(f"色温 (Kelvin): {temperature}K")
+        self.temp_preview.mark_committed(temperature)
 
+        if self.brightness_controller.is_supported():
+            self.brightness_slider.blockSignals(True)
+            self.brightness_slider.setValue(brightness)
+            self.brightness_slider.blockSignals(False)
+            self.brightness_label.setText(f"亮度 (%): {brightness}%")
+            self.brightness_preview.mark_committed(brightness)
 
-    # --- Placeholder for Tray Icon ---
-    # def create_tray_icon(self):
-    #     pass # Implement later
 
     # --- Handle Window Closing ---
     def closeEvent(self, event):
-        """Stop listener, save settings before closing the window.""" # Re-enabled listener stop
+        """Save settings before the window is destroyed; the core keeps running in tray mode."""
         logging.info("Window close event triggered.")
-        logging.info("Stopping hotkey listener...") # Re-enabled log
-        self.hotkey_manager.stop_listening() # Stop listener first # Re-enabled call
-
-        # Record usage statistics before saving settings (in case saving fails)
-        try:
-            end_time = datetime.datetime.now()
-            usage_duration = end_time - self.start_time
-            usage_seconds = int(usage_duration.total_seconds())
-            rests_today = self.reminder_manager.get_rest_periods_today() # Re-enabled reminder dependency
-            # rests_today = 0 # Placeholder or remove stats if reminder is gone
-            logging.info(f"Recording daily stats: Usage={usage_seconds}s, Rests={rests_today}")
-            stats_manager.record_daily_summary(usage_seconds, rests_today)
-        except Exception as e:
-            logging.error(f"Failed to record usage statistics: {e}")
-
-        logging.info("Saving final settings.")
+        # Flush any slider preview still waiting for its frame or idle commit
+        self.temp_preview.commit()
+        self.brightness_preview.commit()
+        for preview in self.adjustment_previews:
+            preview.commit()
         self.save_current_settings()
-
-        # Optional: Reset gamma/brightness on close? Usually not desired.
-        # self.reset_settings()
-        super().closeEvent(event) # Proceed with closing
+        super().closeEvent(event) # Proceed with closing (the window is deleted on close)
 
 
     # --- Auto Start Toggle --- (Re-enabled)
@@ -401,6 +444,6 @@ class MainWindow(QMainWindow):
 # Example Usage (for testing this window directly)
 if __name__ == '__main__':
     app = QApplication(sys.argv)
-    window = MainWindow()
-    window.show()
+    core = AppCore()
+    core.show_window()
     sys.exit(app.exec())
@@ -0,0 +1,66 @@
+# -*- coding: utf-8 -*-
+"""
+Process memory measurement and trimming.
+
+Used by tray mode: after the main window is destroyed, the freed heap pages
+are handed back to the OS so the resident footprint actually drops, rather
+than staying at the windowed peak until the OS needs the memory.
+"""
+
+import os
+import gc
+import ctypes
+import logging
+import platform
+
+class PROCESS_MEMORY_COUNTERS(ctypes.Structure):
+    _fields_ = [
+        ("cb", ctypes.c_ulong),
+        ("PageFaultCount", ctypes.c_ulong),
+        ("PeakWorkingSetSize", ctypes.c_size_t),
+        ("WorkingSetSize", ctypes.c_size_t),
+        ("QuotaPeakPagedPoolUsage", ctypes.c_size_t),
+        ("QuotaPagedPoolUsage", ctypes.c_size_t),
+        ("QuotaPeakNonPagedPoolUsage", ctypes.c_size_t),
+        ("QuotaNonPagedPoolUsage", ctypes.c_size_t),
+        ("PagefileUsage", ctypes.c_size_t),
+        ("PeakPagefileUsage", ctypes.c_size_t),
+    ]
+
+def get_working_set_bytes():
+    """Returns the current working set (resident set) size in bytes, or None if unknown."""
+    try:
+        if platform.system() == "Windows":
+            counters = PROCESS_MEMORY_COUNTERS()
+            counters.cb = ctypes.sizeof(counters)
+            process = ctypes.windll.kernel32.GetCurrentProcess()
+            if ctypes.windll.psapi.GetProcessMemoryInfo(process, ctypes.byref(counters), counters.cb):
+                return counters.WorkingSetSize
+            return None
+        with open("/proc/self/statm") as f:
+            resident_pages = int(f.read().split()[1])
+        return resident_pages * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, AttributeError, ValueError, IndexError):
+        return None
+
+def trim_working_set():
+    """
+    Collects garbage and returns freed memory to the OS: empties the working
+    set on Windows (pages still in use fault back in on demand) and trims the
+    malloc heap on glibc systems. Returns True if a trim was performed.
+    """
+    gc.collect()
+    try:
+        if platform.system() == "Windows":
+            kernel32 = ctypes.windll.kernel32
+            kernel32.SetProcessWorkingSetSize.argtypes = [ctypes.c_void_p, ctypes.c_size_t, ctypes.c_size_t]
+            # (SIZE_T)-1 for both limits asks Windows to remove as many pages as possible
+            return bool(kernel32.SetProcessWorkingSetSize(kernel32.GetCurrentProcess(), ctypes.c_size_t(-1).value, ctypes.c_size_t(-1).value))
+        libc = ctypes.CDLL(None)
+        return bool(libc.malloc_trim(0))
+    except (OSError, AttributeError) as e:
+        logging.debug(f"Working set trim unavailable: {e}")
+        return False
+
+def format_bytes(size):
+    return "unknown" if size is None else f"{size / (1024 * 1024):.1f} MB"
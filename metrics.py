@@ -0,0 +1,182 @@
+# -*- coding: utf-8 -*-
+"""
+Lightweight runtime metrics: counters and fixed-bucket latency histograms.
+
+Disabled by default. While disabled, measure() returns a shared no-op context
+manager, @timed functions call straight through after one flag check, and
+count() returns immediately, so instrumented hot paths (gamma ramp writes,
+WMI brightness calls, settings saves, the hotkey callback) pay next to
+nothing. Enabled from the diagnostics tab or the metrics_enabled setting;
+snapshot() feeds that tab and write_json() dumps it for fleet analysis.
+
+    with metrics.measure("gamma.set_ramp"):
+        SetDeviceGammaRamp(...)
+
+    @metrics.timed("settings.save")
+    def save_settings(settings): ...
+"""
+
+import os
+import sys
+import json
+import time
+import bisect
+import logging
+import platform
+import threading
+import functools
+import contextlib
+
+REPORT_VERSION = 1
+
+# Upper bucket bounds in milliseconds; the last bucket catches everything slower
+BUCKET_BOUNDS_MS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000, 2500)
+
+_enabled = False
+_counters = {}
+_histograms = {}
+_lock = threading.Lock() # Hotkey and instance-channel threads record too
+_started_at = time.time()
+_NULL_MEASURE = contextlib.nullcontext()
+
+class Histogram:
+    """Latency histogram with fixed buckets (BUCKET_BOUNDS_MS) plus count/sum/min/max."""
+
+    __slots__ = ("buckets", "count", "total_ms", "min_ms", "max_ms")
+
+    def __init__(self):
+        self.buckets = [0] * (len(BUCKET_BOUNDS_MS) + 1)
+        self.count = 0
+        self.total_ms = 0.0
+        self.min_ms = None
+        self.max_ms = None
+
+    def observe(self, ms):
+        self.buckets[bisect.bisect_left(BUCKET_BOUNDS_MS, ms)] += 1
+        self.count += 1
+        self.total_ms += ms
+        if self.min_ms is None or ms < self.min_ms:
+            self.min_ms = ms
+        if self.max_ms is None or ms > self.max_ms:
+            self.max_ms = ms
+
+    def percentile(self, fraction):
+        """Upper bound of the bucket holding the given fraction of samples (max for the overflow bucket)."""
+        if not self.count:
+            return None
+        rank = fraction * self.count
+        seen = 0
+        for index, bucket_count in enumerate(self.buckets):
+            seen += bucket_count
+            if seen >= rank:
+                return BUCKET_BOUNDS_MS[index] if index < len(BUCKET_BOUNDS_MS) else self.max_ms
+        return self.max_ms
+
+    def to_dict(self):
+        return {
+            "count": self.count,
+            "mean_ms": round(self.total_ms / self.count, 4) if self.count else None,
+            "min_ms": round(self.min_ms, 4) if self.min_ms is not None else None,
+            "max_ms": round(self.max_ms, 4) if self.max_ms is not None else None,
+            "p50_ms": self.percentile(0.5),
+            "p95_ms": self.percentile(0.95),
+            "p99_ms": self.percentile(0.99),
+            "buckets": list(self.buckets),
+        }
+
+def enable():
+    global _enabled
+    _enabled = True
+
+def disable():
+    global _enabled
+    _enabled = False
+
+def is_enabled():
+    return _enabled
+
+def reset():
+    """Clears every counter and histogram."""
+    global _started_at
+    with _lock:
+        _counters.clear()
+        _histograms.clear()
+        _started_at = time.time()
+
+def count(name, amount=1):
+    """Adds `amount` to counter `name`."""
+    if not _enabled:
+        return
+    with _lock:
+        _counters[name] = _counters.get(name, 0) + amount
+
+def observe(name, ms):
+    """Records one latency sample of `ms` milliseconds in histogram `name`."""
+    if not _enabled:
+        return
+    with _lock:
+        histogram = _histograms.get(name)
+        if histogram is None:
+            histogram = _histograms[name] = Histogram()
+        histogram.observe(ms)
+
+@contextlib.contextmanager
+def _timed_block(name):
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        observe(name, (time.perf_counter() - start) * 1000)
+
+def measure(name):
+    """Context manager recording the enclosed block's duration in histogram `name` (no-op when disabled)."""
+    if not _enabled:
+        return _NULL_MEASURE
+    return _timed_block(name)
+
+def timed(name):
+    """Decorator recording each call's duration in histogram `name`."""
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not _enabled:
+                return func(*args, **kwargs)
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                observe(name, (time.perf_counter() - start) * 1000)
+        return wrapper
+    return decorator
+
+def snapshot():
+    """Returns all metrics as a JSON-serializable dict."""
+    with _lock:
+        counters = dict(_counters)
+        histograms = {name: histogram.to_dict() for name, histogram in _histograms.items()}
+    return {
+        "version": REPORT_VERSION,
+        "enabled": _enabled,
+        "collected_since": _started_at,
+        "bucket_bounds_ms": list(BUCKET_BOUNDS_MS),
+        "counters": dict(sorted(counters.items())),
+        "histograms": dict(sorted(histograms.items())),
+        "environment": {
+            "platform": platform.platform(),
+            "python": platform.python_version(),
+            "frozen": bool(getattr(sys, 'frozen', False)),
+            "cpu_count": os.cpu_count(),
+        },
+    }
+
+def write_json(path):
+    """Writes snapshot() to `path` as JSON. Returns True on success."""
+    try:
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(snapshot(), f, indent=2)
+            f.write("\n")
+        logging.info("Metrics written to %s", path)
+        return True
+    except (IOError, OSError) as e:
+        logging.error("Failed to write metrics to %s: %s", path, e)
+        return False
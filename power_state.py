@@ -0,0 +1,311 @@
+# -*- coding: utf-8 -*-
+"""
+Power-state aware scheduling for background work.
+
+PowerStateService tracks one of three modes: on AC power, on battery, or
+with the display off (which wins over the power source). Background clients
+register a cadence per mode: an interval in milliseconds, or None to pause
+that work in the mode. The service calls each client's apply function with
+its cadence on registration and on every mode change:
+
+    reminder status updates   every second on AC, every minute on battery,
+                              none with the display off (the rest deadline
+                              itself always fires, see ReminderManager)
+    hotkey listener watchdog  see hotkey_manager.POLL_CADENCES_MS
+    adaptive brightness       see app_core.ADAPTIVE_BRIGHTNESS_CADENCES_MS
+
+Every client wakeup is counted against the mode it happened in, and
+wakeup_report() divides by the time spent in each mode to give wakeups per
+hour (shown on the diagnostics tab and logged at exit).
+
+Power sources report (on_battery, display_on) through a callback:
+WindowsPowerSource registers for power-setting notifications
+(WM_POWERBROADCAST, no polling); SysfsPowerSource reads
+/sys/class/power_supply once a minute, and only if the machine has a battery;
+ManualPowerSource is switched by hand for tests and benchmarks.
+"""
+
+import os
+import glob
+import time
+import uuid
+import ctypes
+import logging
+import platform
+import threading
+from PySide6.QtCore import QObject, QTimer, Signal, QAbstractNativeEventFilter, QCoreApplication
+from PySide6.QtGui import QWindow
+
+MODE_AC = "ac"
+MODE_BATTERY = "battery"
+MODE_DISPLAY_OFF = "display_off"
+MODES = (MODE_AC, MODE_BATTERY, MODE_DISPLAY_OFF)
+
+WM_POWERBROADCAST = 0x0218
+PBT_POWERSETTINGCHANGE = 0x8013
+DEVICE_NOTIFY_WINDOW_HANDLE = 0x0
+GUID_ACDC_POWER_SOURCE = uuid.UUID("5d3e9a59-e9d5-4b00-a6bd-ff34ff516548")
+GUID_CONSOLE_DISPLAY_STATE = uuid.UUID("6fe69556-704a-47a0-8f24-c28d936fda47")
+SYSFS_POLL_INTERVAL_MS = 60 * 1000
+_UNSET = object()
+
+def mode_for(on_battery, display_on):
+    if not display_on:
+        return MODE_DISPLAY_OFF
+    return MODE_BATTERY if on_battery else MODE_AC
+
+class ManualPowerSource:
+    """A power source switched by calling set_state()."""
+
+    def __init__(self, on_battery=False, display_on=True):
+        self.state = (on_battery, display_on)
+        self._callback = None
+
+    def start(self, callback):
+        self._callback = callback
+        callback(*self.state)
+        return True
+
+    def stop(self):
+        self._callback = None
+
+    def set_state(self, on_battery, display_on=True):
+        self.state = (on_battery, display_on)
+        if self._callback is not None:
+            self._callback(on_battery, display_on)
+
+class SYSTEM_POWER_STATUS(ctypes.Structure):
+    _fields_ = [("ACLineStatus", ctypes.c_ubyte), ("BatteryFlag", ctypes.c_ubyte),
+                ("BatteryLifePercent", ctypes.c_ubyte), ("SystemStatusFlag", ctypes.c_ubyte),
+                ("BatteryLifeTime", ctypes.c_ulong), ("BatteryFullLifeTime", ctypes.c_ulong)]
+
+class MSG(ctypes.Structure):
+    _fields_ = [("hwnd", ctypes.c_void_p), ("message", ctypes.c_uint), ("wParam", ctypes.c_size_t),
+                ("lParam", ctypes.c_ssize_t), ("time", ctypes.c_ulong), ("pt_x", ctypes.c_long), ("pt_y", ctypes.c_long)]
+
+class WindowsPowerSource(QAbstractNativeEventFilter):
+    """AC/battery and display on/off notifications from Windows (use on the GUI thread)."""
+
+    def __init__(self):
+        super().__init__()
+        self._callback = None
+        self._window = None
+        self._handles = []
+        self.on_battery = False
+        self.display_on = True
+
+    @staticmethod
+    def is_supported():
+        return platform.system() == "Windows"
+
+    def start(self, callback):
+        app = QCoreApplication.instance()
+        if not self.is_supported() or app is None:
+            return False
+        user32 = ctypes.windll.user32
+        status = SYSTEM_POWER_STATUS()
+        if ctypes.windll.kernel32.GetSystemPowerStatus(ctypes.byref(status)):
+            self.on_battery = status.ACLineStatus == 0
+        self._callback = callback
+        # An invisible native window to receive WM_POWERBROADCAST; Qt routes its messages through the filter
+        self._window = QWindow()
+        hwnd = int(self._window.winId())
+        user32.RegisterPowerSettingNotification.restype = ctypes.c_void_p
+        user32.RegisterPowerSettingNotification.argtypes = [ctypes.c_void_p, ctypes.c_char_p, ctypes.c_ulong]
+        for guid in (GUID_ACDC_POWER_SOURCE, GUID_CONSOLE_DISPLAY_STATE):
+            handle = user32.RegisterPowerSettingNotification(hwnd, guid.bytes_le, DEVICE_NOTIFY_WINDOW_HANDLE)
+            if handle:
+                self._handles.append(handle)
+            else:
+                logging.warning("RegisterPowerSettingNotification failed for %s", guid)
+        app.installNativeEventFilter(self)
+        callback(self.on_battery, self.display_on) # Windows also sends each setting's current value right away
+        return True
+
+    def stop(self):
+        app = QCoreApplication.instance()
+        if app is not None and self._callback is not None:
+            app.removeNativeEventFilter(self)
+        user32 = ctypes.windll.user32 if self.is_supported() else None
+        for handle in self._handles:
+            user32.UnregisterPowerSettingNotification(ctypes.c_void_p(handle))
+        self._handles = []
+        self._window = None
+        self._callback = None
+
+    def nativeEventFilter(self, event_type, message):
+        if self._callback is None or bytes(event_type) != b"windows_generic_MSG":
+            return False, 0
+        msg = MSG.from_address(int(message))
+        if msg.message != WM_POWERBROADCAST or msg.wParam != PBT_POWERSETTINGCHANGE or not msg.lParam:
+            return False, 0
+        # POWERBROADCAST_SETTING: GUID PowerSetting; DWORD DataLength; UCHAR Data[]
+        setting = uuid.UUID(bytes_le=ctypes.string_at(msg.lParam, 16))
+        value = ctypes.c_ulong.from_address(msg.lParam + 20).value
+        if setting == GUID_ACDC_POWER_SOURCE:
+            self.on_battery = value != 0 # 1 = battery, 2 = short-term source such as a UPS
+        elif setting == GUID_CONSOLE_DISPLAY_STATE:
+            self.display_on = value != 0 # 0 = off, 1 = on, 2 = dimmed
+        else:
+            return False, 0
+        self._callback(self.on_battery, self.display_on)
+        return False, 0
+
+class SysfsPowerSource:
+    """AC/battery state from /sys/class/power_supply (Linux). The display is taken to be on."""
+
+    def __init__(self, root="/sys/class/power_supply"):
+        self.root = root
+        self._timer = None
+        self._callback = None
+        self._state = None
+
+    def _read(self, name):
+        with open(os.path.join(name, "type")) as f_type:
+            supply_type = f_type.read().strip()
+        online_path = os.path.join(name, "online")
+        online = None
+        if os.path.exists(online_path):
+            with open(online_path) as f_online:
+                online = f_online.read().strip() == "1"
+        return supply_type, online
+
+    def _poll(self):
+        mains = []
+        for supply in glob.glob(os.path.join(self.root, "*")):
+            try:
+                supply_type, online = self._read(supply)
+            except OSError:
+                continue
+            if supply_type == "Mains" and online is not None:
+                mains.append(online)
+        on_battery = bool(mains) and not any(mains) # No adapter reported: assume AC
+        if on_battery != self._state:
+            self._state = on_battery
+            self._callback(on_battery, True)
+
+    def start(self, callback):
+        self._callback = callback
+        has_battery = False
+        for supply in glob.glob(os.path.join(self.root, "*")):
+            try:
+                has_battery = has_battery or self._read(supply)[0] == "Battery"
+            except OSError:
+                continue
+        self._poll()
+        if has_battery: # Without a battery the machine is always on AC; nothing to watch
+            self._timer = QTimer()
+            self._timer.setInterval(SYSFS_POLL_INTERVAL_MS)
+            self._timer.timeout.connect(self._poll)
+            self._timer.start()
+        return True
+
+    def stop(self):
+        if self._timer is not None:
+            self._timer.stop()
+            self._timer = None
+        self._callback = None
+
+def default_source():
+    return WindowsPowerSource() if WindowsPowerSource.is_supported() else SysfsPowerSource()
+
+class PowerClient:
+    """One registered client: its cadences, the interval in effect and its wakeup counts per mode."""
+
+    def __init__(self, service, name, cadences, apply):
+        self.service = service
+        self.name = name
+        self.cadences = dict(cadences)
+        self.apply = apply
+        self.interval = _UNSET
+        self.wakeups = dict.fromkeys(MODES, 0)
+
+    def record_wakeup(self):
+        """Counts one wakeup in the current mode. Safe to call from any thread."""
+        with self.service._lock:
+            self.wakeups[self.service.mode] += 1
+
+    def _update(self, mode):
+        interval = self.cadences.get(mode, self.cadences.get(MODE_AC))
+        if interval != self.interval:
+            self.interval = interval
+            if self.apply is not None:
+                self.apply(interval)
+
+class PowerStateService(QObject):
+    """Current power mode and the cadence of every registered background client."""
+
+    mode_changed = Signal(str)
+
+    def __init__(self, source=None, parent=None):
+        super().__init__(parent)
+        self.source = source
+        self.mode = MODE_AC
+        self.clients = {}
+        self._lock = threading.Lock()
+        self._mode_seconds = dict.fromkeys(MODES, 0.0)
+        self._mode_since = time.monotonic()
+        self._running = False
+
+    def start(self):
+        """Starts following the power source (AC is assumed until then, or if it fails)."""
+        if self._running:
+            return True
+        self.source = self.source or default_source()
+        self._running = self.source.start(self._on_state)
+        if not self._running:
+            logging.warning("Power state unavailable; background work keeps its AC cadence.")
+        return self._running
+
+    def stop(self):
+        if self._running:
+            self.source.stop()
+            self._running = False
+
+    def register(self, name, cadences, apply=None, timer=None):
+        """
+        Registers a client: `cadences` maps modes to an interval in ms (None
+        pauses the work in that mode) and `apply(interval)` is called with the
+        interval for the current mode now and on every mode change. A QTimer
+        passed as `timer` has its timeouts counted as the client's wakeups.
+        """
+        client = PowerClient(self, name, cadences, apply)
+        self.clients[name] = client
+        if timer is not None:
+            timer.timeout.connect(client.record_wakeup)
+        client._update(self.mode)
+        return client
+
+    def count_timer(self, name, timer):
+        """Counts a fixed-interval QTimer's timeouts in the report, without throttling it."""
+        return self.register(name, {}, timer=timer)
+
+    def _on_state(self, on_battery, display_on):
+        mode = mode_for(on_battery, display_on)
+        if mode == self.mode:
+            return
+        now = time.monotonic()
+        with self._lock:
+            self._mode_seconds[self.mode] += now - self._mode_since
+            self._mode_since = now
+            previous, self.mode = self.mode, mode
+        logging.info("Power mode: %s -> %s", previous, mode)
+        for client in list(self.clients.values()):
+            client._update(mode)
+        self.mode_changed.emit(mode)
+
+    def wakeup_report(self, now=None):
+        """{client: {mode: {"wakeups", "hours", "per_hour"}}} for every mode the app has spent time in."""
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            seconds = dict(self._mode_seconds)
+            seconds[self.mode] += now - self._mode_since
+            counts = {name: dict(client.wakeups) for name, client in self.clients.items()}
+        report = {}
+        for name, wakeups in counts.items():
+            report[name] = {
+                mode: {"wakeups": wakeups[mode], "hours": round(seconds[mode] / 3600, 4),
+                       "per_hour": round(wakeups[mode] * 3600 / seconds[mode], 1)}
+                for mode in MODES if seconds[mode] > 0
+            }
+        return report
@@ -0,0 +1,107 @@
+# -*- coding: utf-8 -*-
+"""
+Binary snapshot of the last saved gamma ramp, for restoring it at login.
+
+At autostart the screen would otherwise stay at full blue light until Qt,
+the settings and GammaController have all loaded. main.py calls restore()
+right after taking the single-instance lock and before importing Qt: it
+memory-maps the snapshot next to settings.json and pushes the ramp straight
+to the display. The snapshot is rewritten whenever the saved temperature
+changes.
+
+Layout (little-endian, 1552 bytes):
+    magic b"HMJR", version u16, reserved u16, kelvin u32,
+    red/green/blue u16[256] each (the RAMP structure), CRC-32 of the ramp u32
+
+Only the standard library is imported here, to keep the early path fast.
+"""
+
+import os
+import mmap
+import zlib
+import ctypes
+import struct
+import logging
+import platform
+
+SNAPSHOT_FILE = "gamma_ramp.bin"
+MAGIC = b"HMJR"
+VERSION = 1
+HEADER = struct.Struct("<4sHHI")
+RAMP_BYTES = 3 * 256 * 2
+CRC = struct.Struct("<I")
+SNAPSHOT_BYTES = HEADER.size + RAMP_BYTES + CRC.size
+
+def get_snapshot_path():
+    import settings_manager as sm
+    return os.path.join(os.path.dirname(sm.get_settings_path()), SNAPSHOT_FILE)
+
+def save(ramp_bytes, kelvin, path=None):
+    """Atomically writes the snapshot for a RAMP's bytes. Returns True on success."""
+    if len(ramp_bytes) != RAMP_BYTES:
+        raise ValueError(f"A gamma ramp is {RAMP_BYTES} bytes, got {len(ramp_bytes)}")
+    path = path or get_snapshot_path()
+    data = HEADER.pack(MAGIC, VERSION, 0, int(kelvin)) + bytes(ramp_bytes) + CRC.pack(zlib.crc32(ramp_bytes))
+    temp_path = path + ".tmp"
+    try:
+        with open(temp_path, 'wb') as f:
+            f.write(data)
+        os.replace(temp_path, path) # Never leaves a half-written snapshot behind
+        logging.debug("Gamma ramp snapshot for %sK written to %s", kelvin, path)
+        return True
+    except OSError as e:
+        logging.error("Failed to write gamma ramp snapshot %s: %s", path, e)
+        return False
+
+def _validate(buffer):
+    """Returns the snapshot's kelvin if `buffer` holds a valid snapshot, else None."""
+    if len(buffer) != SNAPSHOT_BYTES:
+        return None
+    magic, version, _, kelvin = HEADER.unpack_from(buffer, 0)
+    if magic != MAGIC or version != VERSION:
+        return None
+    ramp_end = HEADER.size + RAMP_BYTES
+    if zlib.crc32(buffer[HEADER.size:ramp_end]) != CRC.unpack_from(buffer, ramp_end)[0]:
+        return None
+    return kelvin
+
+def restore(path=None):
+    """
+    Pushes the snapshot to the display (Windows only). Returns the restored
+    kelvin, or None if there is no valid snapshot or the write failed.
+    """
+    if platform.system() != "Windows":
+        return None
+    path = path or get_snapshot_path()
+    try:
+        with open(path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_COPY) as view:
+            kelvin = _validate(view)
+            if kelvin is None:
+                logging.warning("Ignoring invalid gamma ramp snapshot %s", path)
+                return None
+            ramp = (ctypes.c_ubyte * RAMP_BYTES).from_buffer(view, HEADER.size) # The mapping itself, no copy
+            try:
+                user32, gdi32 = ctypes.windll.user32, ctypes.windll.gdi32
+                user32.GetDC.restype = ctypes.c_void_p
+                gdi32.SetDeviceGammaRamp.argtypes = [ctypes.c_void_p, ctypes.c_void_p]
+                gdi32.SetDeviceGammaRamp.restype = ctypes.c_bool
+                user32.ReleaseDC.argtypes = [ctypes.c_void_p, ctypes.c_void_p]
+                hdc = user32.GetDC(None)
+                if not hdc:
+                    return None
+                try:
+                    ok = gdi32.SetDeviceGammaRamp(hdc, ramp)
+                finally:
+                    user32.ReleaseDC(None, hdc)
+            finally:
+                del ramp # The mapping cannot be closed while a ctypes view of it exists
+    except FileNotFoundError:
+        return None
+    except (OSError, ValueError) as e:
+        logging.warning("Could not restore gamma ramp snapshot %s: %s", path, e)
+        return None
+    if not ok:
+        logging.warning("SetDeviceGammaRamp rejected the gamma ramp snapshot.")
+        return None
+    logging.info("Restored %sK from the gamma ramp snapshot.", kelvin)
+    return kelvin
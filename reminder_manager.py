@@ -1,15 +1,30 @@
 # -*- coding: utf-8 -*-
 
+import math
 import logging
-from PySide6.QtCore import QObject, QTimer, Signal
-from plyer import notification
+from PySide6.QtCore import QObject, QTimer, Signal, Qt
 import time
+import metrics
+from lazy_import import lazy_import
+from power_state import MODE_AC, MODE_BATTERY, MODE_DISPLAY_OFF
 
-# Configure logging
-logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+# plyer resolves its platform backend on import; only needed when a notification is sent
+plyer = lazy_import("plyer")
+
+# How often the status countdown is refreshed in each power mode (None: not at all).
+# Work and rest periods end on time regardless: the timer is always due by the deadline.
+STATUS_CADENCES_MS = {MODE_AC: 1000, MODE_BATTERY: 60 * 1000, MODE_DISPLAY_OFF: None}
+DEADLINE_SLACK_SECONDS = 0.005 # A timer this close to the deadline counts as having reached it
 
 class ReminderManager(QObject):
-    """Manages the work/rest reminder timer and notifications."""
+    """
+    Manages the work/rest reminder timer and notifications.
+
+    Each work or rest period has a deadline on the monotonic clock. A single-
+    shot timer wakes up at the deadline, and in between only as often as the
+    status cadence asks for, so a period costs one wakeup when nobody needs
+    the countdown.
+    """
 
     # Signals to update the GUI status label
     status_updated = Signal(str)
@@ -22,21 +37,53 @@ class ReminderManager(QObject):
     STATE_WORKING = "working"
     STATE_RESTING = "resting"
 
-    def __init__(self, parent=None):
+    def __init__(self, parent=None, clock=time.monotonic):
         super().__init__(parent)
         # Store durations in the units received (hours, minutes)
         self.work_hours = 1
         self.rest_minutes = 5
         self.state = self.STATE_IDLE
-        self.remaining_seconds = 0 # Internal timer always uses seconds
         self.rest_periods_today = 0 # Counter for stats
+        self.paused = False
+        self.status_interval_ms = STATUS_CADENCES_MS[MODE_AC] # Set by the power state service
+        self._clock = clock
+        self._deadline = None # Clock time the current period ends, while counting down
+        self._remaining = 0 # Seconds left while paused or stopped
 
         self.timer = QTimer(self)
-        self.timer.setInterval(1000) # Tick every second
+        self.timer.setSingleShot(True) # Rescheduled after every wakeup, see _schedule()
+        self.timer.setTimerType(Qt.TimerType.PreciseTimer) # Coarse timers may fire early and miss the deadline
         self.timer.timeout.connect(self.tick)
 
         logging.info("ReminderManager initialized.")
 
+    @property
+    def remaining_seconds(self):
+        """Whole seconds left in the current period."""
+        if self._deadline is None:
+            return max(0, math.ceil(self._remaining))
+        return max(0, math.ceil(self._deadline - self._clock() - DEADLINE_SLACK_SECONDS))
+
+    def set_status_interval(self, interval_ms):
+        """Sets how often the status countdown is refreshed (None: only at period changes)."""
+        self.status_interval_ms = interval_ms
+        if self._deadline is not None:
+            self.update_status_display()
+            self._schedule()
+
+    def _start_period(self, seconds):
+        self._deadline = self._clock() + seconds
+        self._schedule()
+
+    def _schedule(self):
+        """Arms the timer for the next status refresh or the deadline, whichever is first."""
+        remaining_ms = max(0.0, (self._deadline - self._clock()) * 1000)
+        delay_ms = remaining_ms
+        if self.status_interval_ms:
+            # Land on whole-interval boundaries of the countdown, so the display ticks evenly
+            delay_ms = min(remaining_ms, remaining_ms % self.status_interval_ms or self.status_interval_ms)
+        self.timer.start(math.ceil(delay_ms))
+
     def set_durations(self, work_hours, rest_minutes):
         """Update the work (hours) and rest (minutes) durations."""
         self.work_hours = work_hours
@@ -55,39 +102,60 @@ class ReminderManager(QObject):
 
         logging.info("Starting reminder timer.")
         self.state = self.STATE_WORKING
+        self.paused = False
         # Convert work hours to seconds for the internal timer
-        self.remaining_seconds = self.work_hours * 3600
+        self._start_period(self.work_hours * 3600)
         self.update_status_display()
-        self.timer.start()
 
     def stop_timer(self):
         """Stops the timer."""
         if self.timer.isActive():
             logging.info("Stopping reminder timer.")
             self.timer.stop()
+        self.paused = False
         self.state = self.STATE_IDLE
-        self.remaining_seconds = 0
+        self._deadline = None
+        self._remaining = 0
         self.status_updated.emit("状态: 已禁用")
 
 
+    def pause(self):
+        """Pauses the countdown, keeping the current state and remaining time."""
+        if self.timer.isActive():
+            logging.info("Pausing reminder timer.")
+            self._remaining = self._deadline - self._clock()
+            self._deadline = None
+            self.timer.stop()
+            self.paused = True
+            self.status_updated.emit("状态: 已暂停")
+
+    def resume(self):
+        """Resumes a countdown paused with pause()."""
+        if self.paused:
+            logging.info("Resuming reminder timer.")
+            self.paused = False
+            self._start_period(max(0.0, self._remaining))
+            self.update_status_display()
+
+    @metrics.timed("reminder.tick")
     def tick(self):
-        """Called every second by the QTimer."""
-        if self.remaining_seconds > 0:
-            self.remaining_seconds -= 1
+        """Called by the QTimer at each status refresh and at the deadline."""
+        if self._deadline is None:
+            return
+        if self._clock() < self._deadline - DEADLINE_SLACK_SECONDS:
             self.update_status_display()
-        else:
-            # Time's up, switch state
-            if self.state == self.STATE_WORKING:
-                self.start_rest_period()
-            elif self.state == self.STATE_RESTING:
-                self.end_rest_period()
+            self._schedule()
+        elif self.state == self.STATE_WORKING: # Time's up, switch state
+            self.start_rest_period()
+        elif self.state == self.STATE_RESTING:
+            self.end_rest_period()
 
     def start_rest_period(self):
         """Initiate the rest period (using minutes)."""
         logging.info("Work time finished. Starting rest period.")
         self.state = self.STATE_RESTING
         # Convert rest minutes to seconds for the internal timer
-        self.remaining_seconds = self.rest_minutes * 60
+        self._start_period(self.rest_minutes * 60)
         self.rest_periods_today += 1 # Increment rest counter
         logging.info(f"Rest periods today: {self.rest_periods_today}")
         self.update_status_display()
@@ -124,7 +192,7 @@ class ReminderManager(QObject):
         """Sends a desktop notification using plyer."""
         logging.info(f"Sending notification: Title='{title}', Message='{message}'")
         try:
-            notification.notify(
+            plyer.notification.notify(
                 title=title,
                 message=message,
                 app_name="Eye Protector",
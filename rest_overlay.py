@@ -0,0 +1,238 @@
+# -*- coding: utf-8 -*-
+"""
+Full-screen rest overlay.
+
+RestOverlay keeps one frameless, always-on-top window per screen. prepare()
+builds them ahead of time: widgets polished, native windows created and the
+text laid out, then left hidden, so show_rest() only has to map the windows
+when ReminderManager.rest_period_started fires.
+
+The countdown is driven by one deadline on the monotonic clock. A single-shot
+timer wakes up on each whole second of the countdown and repaints only the
+countdown rectangle. The digits are pre-laid-out QStaticText glyphs placed in
+fixed-width cells, so a repaint does no string formatting or text layout.
+The overlay hides itself when the deadline passes, or earlier on
+rest_period_ended or Esc, and the countdown timer is stopped.
+release() deletes the windows; the core calls it when reminders or the
+overlay are turned off, and the windows are rebuilt when the screens change.
+"""
+
+import math
+import time
+import logging
+from PySide6.QtCore import QObject, QTimer, QRect, Qt, Signal
+from PySide6.QtGui import QGuiApplication, QPainter, QColor, QFont, QFontMetrics, QStaticText
+from PySide6.QtWidgets import QWidget
+
+import metrics
+
+BACKGROUND_COLOR = QColor(20, 28, 24)
+TEXT_COLOR = QColor(200, 225, 205)
+WINDOW_OPACITY = 0.92
+TITLE_TEXT = "休息一下，看看远处"
+HINT_TEXT = "按 Esc 跳过本次休息"
+COUNTDOWN_CHARS = "0123456789:"
+DEADLINE_SLACK_SECONDS = 0.005 # Matches reminder_manager: this close to the deadline counts as reached
+
+class _Glyphs:
+    """Static texts laid out once and shared by every overlay window."""
+
+    def __init__(self):
+        self.title_font = QFont()
+        self.title_font.setPointSize(28)
+        self.countdown_font = QFont()
+        self.countdown_font.setPointSize(96)
+        self.hint_font = QFont()
+        self.hint_font.setPointSize(12)
+        self.title = self._static(TITLE_TEXT, self.title_font)
+        self.hint = self._static(HINT_TEXT, self.hint_font)
+        self.colon = self._static(":", self.countdown_font)
+        self.digits = [self._static(str(digit), self.countdown_font) for digit in range(10)]
+        font_metrics = QFontMetrics(self.countdown_font)
+        self.cell_width = max(font_metrics.horizontalAdvance(char) for char in COUNTDOWN_CHARS)
+        self.cell_height = font_metrics.height()
+
+    @staticmethod
+    def _static(text, font):
+        static = QStaticText(text)
+        static.setPerformanceHint(QStaticText.PerformanceHint.AggressiveCaching)
+        static.prepare(font=font)
+        return static
+
+class RestOverlayWindow(QWidget):
+    """One screen's overlay. Paints the remaining time of its RestOverlay."""
+
+    def __init__(self, overlay, screen):
+        super().__init__(None, Qt.WindowType.FramelessWindowHint | Qt.WindowType.WindowStaysOnTopHint
+                         | Qt.WindowType.Tool)
+        self.overlay = overlay
+        self.glyphs = overlay.glyphs
+        self.setAttribute(Qt.WidgetAttribute.WA_OpaquePaintEvent) # Every pixel is painted; skip the erase
+        self.setFocusPolicy(Qt.FocusPolicy.StrongFocus)
+        self.setWindowOpacity(WINDOW_OPACITY)
+        self.setScreen(screen)
+        self.setGeometry(screen.geometry())
+        screen.geometryChanged.connect(self.setGeometry)
+        self._layout()
+        self.ensurePolished()
+        self.winId() # Create the native window now, not on first show
+
+    def resizeEvent(self, event):
+        self._layout()
+        super().resizeEvent(event)
+
+    def _layout(self):
+        """Positions the title, the five countdown cells (MM:SS) and the hint for the current size."""
+        glyphs = self.glyphs
+        width, height = self.width(), self.height()
+        countdown_width = glyphs.cell_width * 5
+        self.countdown_rect = QRect((width - countdown_width) // 2, (height - glyphs.cell_height) // 2,
+                                    countdown_width, glyphs.cell_height)
+        title_size = glyphs.title.size()
+        self.title_pos = ((width - title_size.width()) / 2, self.countdown_rect.top() - title_size.height() * 2)
+        hint_size = glyphs.hint.size()
+        self.hint_pos = ((width - hint_size.width()) / 2, self.countdown_rect.bottom() + hint_size.height() * 2)
+
+    def paintEvent(self, event):
+        glyphs = self.glyphs
+        painter = QPainter(self)
+        painter.fillRect(event.rect(), BACKGROUND_COLOR)
+        painter.setPen(TEXT_COLOR)
+        if event.rect() != self.countdown_rect: # A countdown tick repaints only the countdown
+            painter.setFont(glyphs.title_font)
+            painter.drawStaticText(*self.title_pos, glyphs.title)
+            painter.setFont(glyphs.hint_font)
+            painter.drawStaticText(*self.hint_pos, glyphs.hint)
+        painter.setFont(glyphs.countdown_font)
+        mins, secs = divmod(self.overlay.remaining_seconds, 60)
+        x, y = self.countdown_rect.left(), self.countdown_rect.top()
+        digits = glyphs.digits
+        for i, static in enumerate((digits[mins // 10], digits[mins % 10], glyphs.colon, digits[secs // 10], digits[secs % 10])):
+            painter.drawStaticText(x + i * glyphs.cell_width + (glyphs.cell_width - static.size().width()) / 2, y, static)
+        painter.end()
+
+    def keyPressEvent(self, event):
+        if event.key() == Qt.Key.Key_Escape:
+            logging.info("Rest overlay skipped.")
+            self.overlay.hide_overlay()
+        else:
+            super().keyPressEvent(event)
+
+class RestOverlay(QObject):
+    """Pre-built overlay windows for every screen, shown for the length of a rest period."""
+
+    # Emitted when the overlay is hidden, with True if the rest ran to its deadline
+    finished = Signal(bool)
+
+    def __init__(self, parent=None, clock=time.monotonic):
+        super().__init__(parent)
+        self.windows = []
+        self.glyphs = None
+        self.repaint_interval_ms = 1000 # None: no countdown repaints (display off); set by the power state service
+        self._clock = clock
+        self._deadline = None # Clock time the rest ends, while the overlay is up
+        self._screens_changed = False
+
+        self.timer = QTimer(self)
+        self.timer.setSingleShot(True) # Rescheduled after every wakeup, see _schedule()
+        self.timer.setTimerType(Qt.TimerType.PreciseTimer)
+        self.timer.timeout.connect(self._tick)
+
+        app = QGuiApplication.instance()
+        if app is not None:
+            app.screenAdded.connect(self._on_screens_changed)
+            app.screenRemoved.connect(self._on_screens_changed)
+
+    @property
+    def visible(self):
+        return self._deadline is not None
+
+    @property
+    def remaining_seconds(self):
+        """Whole seconds left in the rest, 0 when the overlay is down."""
+        if self._deadline is None:
+            return 0
+        return max(0, math.ceil(self._deadline - self._clock() - DEADLINE_SLACK_SECONDS))
+
+    def prepare(self):
+        """Builds the hidden windows (one per screen) if they are not built yet."""
+        if self.windows:
+            return
+        app = QGuiApplication.instance()
+        if app is None:
+            return
+        if self.glyphs is None:
+            self.glyphs = _Glyphs()
+        self.windows = [RestOverlayWindow(self, screen) for screen in app.screens()]
+        logging.info("Rest overlay prepared for %d screen(s).", len(self.windows))
+
+    def release(self):
+        """Hides and deletes the windows and the laid-out text."""
+        self.hide_overlay()
+        for window in self.windows:
+            window.deleteLater()
+        self.windows = []
+        self.glyphs = None
+
+    @metrics.timed("rest_overlay.show")
+    def show_rest(self, seconds):
+        """Covers every screen until `seconds` from now. Connect to rest_period_started."""
+        self.prepare() # Already done unless the screens changed or the overlay was released
+        self._deadline = self._clock() + seconds
+        for window in self.windows:
+            window.show()
+            window.raise_()
+        if self.windows:
+            self.windows[0].activateWindow() # For Esc
+        self._schedule()
+
+    def hide_overlay(self):
+        """Hides the windows and stops the countdown. Connect to rest_period_ended."""
+        if self._deadline is None:
+            return
+        completed = self.remaining_seconds == 0
+        self._deadline = None
+        self.timer.stop()
+        for window in self.windows:
+            window.hide()
+        if self._screens_changed:
+            self._rebuild()
+        self.finished.emit(completed)
+
+    def set_repaint_interval(self, interval_ms):
+        """Sets how often the countdown is repainted (None: only the deadline wakes the overlay)."""
+        self.repaint_interval_ms = interval_ms
+        if self._deadline is not None:
+            self._schedule()
+
+    def _schedule(self):
+        """Arms the timer for the next whole second of the countdown, or the deadline."""
+        remaining_ms = max(0.0, (self._deadline - self._clock()) * 1000)
+        delay_ms = remaining_ms
+        if self.repaint_interval_ms:
+            delay_ms = min(remaining_ms, remaining_ms % self.repaint_interval_ms or self.repaint_interval_ms)
+        self.timer.start(math.ceil(delay_ms))
+
+    def _tick(self):
+        if self._deadline is None:
+            return
+        if self._clock() >= self._deadline - DEADLINE_SLACK_SECONDS:
+            self.hide_overlay()
+            return
+        for window in self.windows:
+            window.update(window.countdown_rect)
+        self._schedule()
+
+    def _on_screens_changed(self, screen):
+        self._screens_changed = True
+        if self._deadline is None:
+            self._rebuild()
+
+    def _rebuild(self):
+        """Replaces the windows after screens were added or removed (deferred while the overlay is up)."""
+        self._screens_changed = False
+        if self.windows:
+            for window in self.windows:
+                window.deleteLater()
+            self.windows = []
+            self.prepare()
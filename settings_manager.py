@@ -1,16 +1,57 @@
 # -*- coding: utf-8 -*-
+"""
+Settings storage, layered as: built-in defaults < machine policy defaults <
+the user's settings.json < machine policy locks and limits.
 
+The policy file (policy.json in the machine-wide data directory, or the path
+in HUMUJUN_POLICY_FILE) is written by administrators and never by the app:
+
+    {
+        "defaults": {"reminder_enabled": true},
+        "locked":   {"reminder_enabled": true},
+        "limits":   {"reminder_rest_minutes": {"min": 5},
+                     "profiles.Night Mode.temperature": {"max": 3400}}
+    }
+
+Locked values and limits use dotted paths into nested settings. The merged
+view is built once and cached with the size and mtime of both files, so it is
+only rebuilt after one of them changes.
+
+The user file only holds what the user changed: save_settings() drops every
+top-level key equal to the built-in or policy default, so a policy default
+applies until the user picks something else. Where a lock or limit enforced a
+value it writes the user's own value back, so lifting it restores the
+user's choice.
+"""
+
+import copy
 import json
 import os
 import logging
-import appdirs # Use appdirs to find appropriate user data directory
+import metrics
+from lazy_import import lazy_import
 
-# Configure logging
-logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+appdirs = lazy_import("appdirs") # Use appdirs to find appropriate user data directory
 
 APP_NAME = "护目君" # Changed application name back
 APP_AUTHOR = "ClineUser" # Or your preferred author name
 SETTINGS_FILE = "settings.json"
+POLICY_FILE = "policy.json"
+POLICY_PATH_ENV = "HUMUJUN_POLICY_FILE" # Overrides the machine-wide policy location
+
+_layers = None # Cached merged view, see _get_layers()
+_layer_paths = None # (policy path, settings path), resolved once
+
+class _Layers:
+    """The merged settings and the policy that produced them, for one (policy, user file) signature."""
+
+    def __init__(self, signature, effective, base, user, locked, limits):
+        self.signature = signature
+        self.effective = effective # Every layer applied, policy enforced
+        self.base = base # Built-in defaults with the policy defaults over them
+        self.user = user # The user file as read
+        self.locked = locked # {dotted path: value}
+        self.limits = limits # {dotted path: (min or None, max or None)}
 
 def get_settings_path():
     """Gets the full path to the settings file in the user's data directory."""
@@ -25,15 +66,47 @@ def get_settings_path():
             return os.path.join(".", SETTINGS_FILE)
     return os.path.join(data_dir, SETTINGS_FILE)
 
+def get_policy_path():
+    """Gets the path of the machine-wide policy file (it may not exist)."""
+    override = os.environ.get(POLICY_PATH_ENV)
+    if override:
+        return override
+    return os.path.join(appdirs.site_data_dir(APP_NAME, APP_AUTHOR), POLICY_FILE)
+
 def get_default_settings():
     """Returns a dictionary containing the default application settings."""
     return {
         "temperature_kelvin": 6500,
         "brightness_percent": 80, # Default brightness target
+        "color_gamma": 1.0, # Extra gamma applied before the temperature (above 1 lifts the mid-tones), 0.5-2.0
+        "color_contrast": 1.0, # Contrast around mid-grey, 0.5-1.5
+        "color_dimming": 1.0, # Software dimming of linear light, 0.3-1.0, for displays without brightness control
         "reminder_enabled": False,
         "reminder_work_hours": 1, # Default work time: 1 hour
         "reminder_rest_minutes": 5, # Default rest time: 5 minutes
         "auto_start_enabled": False, # Default: disabled
+        "stats_checkpoint_minutes": 5, # How often usage is written to the stats log
+        "control_api_enabled": False, # Local JSON-RPC control channel for automation scripts
+        "tray_enabled": True, # Keep running in the system tray when the window is closed
+        "adaptive_brightness_enabled": False, # Follow the ambient light sensor (where the device has one)
+        "adaptive_brightness_curve": [[0, 20], [10, 30], [100, 50], [1000, 80], [10000, 100]], # [lux, brightness %] points
+        "adaptive_brightness_hysteresis": 5, # Minimum brightness change (%) before the screen is updated
+        "app_profiles_enabled": False, # Switch profiles by foreground application (Windows only)
+        "app_profile_rules": [ # First match wins; process names are shell-style patterns, case-insensitive
+             {"process": "photoshop.exe", "profile": "Default"},
+             {"process": "lightroom*.exe", "profile": "Default"},
+             {"process": "gimp*.exe", "profile": "Default"},
+             {"process": "acrord32.exe", "profile": "Reading"},
+             {"process": "acrobat.exe", "profile": "Reading"},
+             {"process": "sumatrapdf.exe", "profile": "Reading"}
+        ],
+        "app_profile_debounce_ms": 500, # Wait for the foreground window to settle before switching
+        "metrics_enabled": False, # Collect hot-path latency metrics (diagnostics tab); written to metrics.json on exit
+        "rest_overlay_enabled": True, # Cover every screen with a countdown during rest periods (Esc skips)
+        "power_throttling_enabled": True, # Slow background work on battery, pause what can wait while the display is off
+        "autostart_max_delay_seconds": 60, # At login, finish starting up after this even if the system stays busy
+        "autostart_idle_cpu_percent": 30, # At login, the system counts as idle below this CPU load...
+        "autostart_idle_disk_percent": 30, # ...and below this disk load
         # Add more settings later (e.g., saved profiles, hotkeys)
         "profiles": {
              "Default": {"temperature": 6500, "brightness": 80},
@@ -47,38 +120,199 @@ def get_default_settings():
         }
     }
 
-def load_settings():
-    """Loads settings from the JSON file. Returns defaults if file not found or invalid."""
-    settings_path = get_settings_path()
-    defaults = get_default_settings()
-    if not os.path.exists(settings_path):
-        logging.info(f"Settings file not found at {settings_path}. Using defaults and creating file.")
-        save_settings(defaults) # Save defaults if file doesn't exist
-        return defaults
+# --- Layers ---
+def _file_signature(path):
+    try:
+        stat = os.stat(path)
+        return stat.st_size, stat.st_mtime_ns
+    except OSError:
+        return None
 
+def _read_json_object(path, description):
+    """Returns the JSON object in `path`, or None if it is missing or invalid."""
     try:
-        with open(settings_path, 'r', encoding='utf-8') as f:
+        with open(path, 'r', encoding='utf-8') as f:
             loaded = json.load(f)
-            logging.info(f"Settings loaded successfully from {settings_path}")
-            # Merge loaded settings with defaults to handle missing keys in old files
-            settings = defaults.copy()
-            settings.update(loaded) # Overwrite defaults with loaded values
-            return settings
-    except (json.JSONDecodeError, IOError, TypeError) as e:
-        logging.error(f"Failed to load or parse settings file {settings_path}: {e}. Using default settings.")
-        # Optionally backup the corrupted file here
-        return defaults
+    except FileNotFoundError:
+        return None
+    except (json.JSONDecodeError, IOError, TypeError, ValueError) as e:
+        logging.error(f"Failed to load or parse {description} {path}: {e}. Ignoring it.")
+        return None
+    if not isinstance(loaded, dict):
+        logging.error(f"Ignoring {description} {path}: expected a JSON object.")
+        return None
+    return loaded
+
+def _split_path(path):
+    return path.split(".")
+
+def _get_path(settings, path, default=None):
+    value = settings
+    for key in _split_path(path):
+        if not isinstance(value, dict) or key not in value:
+            return default
+        value = value[key]
+    return value
+
+def _set_path(settings, path, value):
+    keys = _split_path(path)
+    for key in keys[:-1]:
+        child = settings.get(key)
+        if not isinstance(child, dict):
+            child = settings[key] = {}
+        settings = child
+    settings[keys[-1]] = value
+
+def _delete_path(settings, path):
+    keys = _split_path(path)
+    for key in keys[:-1]:
+        settings = settings.get(key)
+        if not isinstance(settings, dict):
+            return
+    settings.pop(keys[-1], None)
+
+def _clamp(value, limit):
+    low, high = limit
+    if not isinstance(value, (int, float)) or isinstance(value, bool):
+        return value
+    if low is not None and value < low:
+        return low
+    if high is not None and value > high:
+        return high
+    return value
 
+def _is_bound(value):
+    return value is None or (isinstance(value, (int, float)) and not isinstance(value, bool))
+
+def _parse_policy(policy):
+    """
+    Returns (defaults, locked, limits) from a policy object, skipping malformed
+    entries. A limit needs a numeric min and/or max (not a string or a bool),
+    with min <= max when both are given.
+    """
+    defaults = policy.get("defaults") if isinstance(policy.get("defaults"), dict) else {}
+    locked = policy.get("locked") if isinstance(policy.get("locked"), dict) else {}
+    limits = {}
+    raw_limits = policy.get("limits")
+    for path, limit in (raw_limits.items() if isinstance(raw_limits, dict) else ()):
+        if isinstance(limit, dict) and ("min" in limit or "max" in limit):
+            low, high = limit.get("min"), limit.get("max")
+            if _is_bound(low) and _is_bound(high) and (low is None or high is None or low <= high):
+                limits[path] = (low, high)
+                continue
+        logging.warning(f"Ignoring malformed policy limit for '{path}': {limit}")
+    return defaults, locked, limits
+
+def _enforce(settings, locked, limits):
+    for path, limit in limits.items():
+        value = _get_path(settings, path)
+        if value is not None:
+            _set_path(settings, path, _clamp(value, limit))
+    for path, value in locked.items():
+        _set_path(settings, path, copy.deepcopy(value))
+
+def _get_layers():
+    """Returns the cached _Layers, rebuilding them if the policy or user file changed since."""
+    global _layers, _layer_paths
+    if _layer_paths is None:
+        _layer_paths = (get_policy_path(), get_settings_path())
+    policy_path, settings_path = _layer_paths
+    signature = (_file_signature(policy_path), _file_signature(settings_path))
+    if _layers is not None and _layers.signature == signature:
+        return _layers
+
+    policy_defaults, locked, limits = _parse_policy(_read_json_object(policy_path, "policy file") or {})
+    user = _read_json_object(settings_path, "settings file") or {}
+    # Merge loaded settings with defaults to handle missing keys in old files
+    base = get_default_settings()
+    base.update(copy.deepcopy(policy_defaults))
+    effective = copy.deepcopy(base)
+    effective.update(copy.deepcopy(user)) # Overwrite defaults with loaded values
+    _enforce(effective, locked, limits)
+    if locked or limits or policy_defaults:
+        logging.info(f"Policy from {policy_path}: defaults {sorted(policy_defaults)}, locked {sorted(locked)}, limits {limits}")
+    _layers = _Layers(signature, effective, base, user, locked, limits)
+    return _layers
+
+def get_effective_settings():
+    """
+    The cached merged settings. Shared and read-only: use load_settings() for
+    a copy to modify. Costs two stat calls while neither file has changed.
+    """
+    return _get_layers().effective
+
+def get_setting(key, default=None):
+    """One effective setting from the cached merged view."""
+    return _get_layers().effective.get(key, default)
+
+def is_locked(path):
+    """True if the policy fixes the value at `path` (e.g. "reminder_enabled")."""
+    return path in _get_layers().locked
+
+def get_limits(path):
+    """Returns the policy's (min, max) for `path`; either may be None."""
+    return _get_layers().limits.get(path, (None, None))
+
+def constrain(path, value):
+    """Returns the value the policy allows at `path` in place of `value`."""
+    layers = _get_layers()
+    if path in layers.locked:
+        return copy.deepcopy(layers.locked[path])
+    if path in layers.limits:
+        return _clamp(value, layers.limits[path])
+    return value
+
+def apply_policy(settings):
+    """Enforces the policy's locks and limits on a settings dict in place. Returns it."""
+    layers = _get_layers()
+    _enforce(settings, layers.locked, layers.limits)
+    return settings
+
+def load_settings():
+    """
+    Returns a copy of the effective settings (defaults, policy and the user
+    file merged, policy enforced). A missing user file is not created: it
+    would pin every default over the policy defaults.
+    """
+    settings_path = get_settings_path()
+    if not os.path.exists(settings_path):
+        logging.info(f"Settings file not found at {settings_path}. Using defaults.")
+    else:
+        logging.info(f"Settings loaded successfully from {settings_path}")
+    return copy.deepcopy(get_effective_settings())
+
+@metrics.timed("settings.save")
 def save_settings(settings):
-    """Saves the provided settings dictionary to the JSON file."""
+    """
+    Saves the settings that differ from the built-in and policy defaults to the
+    JSON file (see the module docstring).
+    """
     settings_path = get_settings_path()
+    layers = _get_layers()
+    if layers.locked or layers.limits:
+        # Keep the user's own choice rather than a value the policy enforced on it
+        settings = copy.deepcopy(settings)
+        for path in list(layers.locked) + list(layers.limits):
+            own = _get_path(layers.user, path)
+            if own is None:
+                own = _get_path(layers.base, path)
+            enforced = layers.locked[path] if path in layers.locked else _clamp(own, layers.limits[path])
+            if _get_path(settings, path) != enforced:
+                continue # Changed by the user within the limits
+            if own is None:
+                _delete_path(settings, path)
+            else:
+                _set_path(settings, path, copy.deepcopy(own))
+    settings = {key: value for key, value in settings.items()
+                if key not in layers.base or value != layers.base[key]}
     try:
         with open(settings_path, 'w', encoding='utf-8') as f:
             json.dump(settings, f, indent=4, ensure_ascii=False)
-        logging.info(f"Settings saved successfully to {settings_path}")
+        logging.debug("Settings saved successfully to %s", settings_path)
         return True
     except (IOError, TypeError) as e:
-        logging.error(f"Failed to save settings to {settings_path}: {e}")
+        metrics.count("settings.save.failed")
+        logging.error("Failed to save settings to %s: %s", settings_path, e)
         return False
 
 # Example Usage (for testing)
@@ -91,6 +325,39 @@ if __name__ == "__main__":
         print("Please install 'appdirs': pip install appdirs")
         exit()
 
+    # A policy default must win over a built-in default the user never changed
+    import tempfile
+    with tempfile.TemporaryDirectory() as check_dir:
+        real_settings_path = get_settings_path
+        get_settings_path = lambda: os.path.join(check_dir, SETTINGS_FILE)
+        os.environ[POLICY_PATH_ENV] = os.path.join(check_dir, POLICY_FILE)
+        with open(os.environ[POLICY_PATH_ENV], 'w', encoding='utf-8') as f:
+            json.dump({"defaults": {"reminder_enabled": True, "reminder_rest_minutes": 10}}, f)
+        first = load_settings()
+        first["temperature_kelvin"] = 4000
+        save_settings(first)
+        second = load_settings()
+        with open(get_settings_path(), encoding='utf-8') as f:
+            stored = json.load(f)
+        assert first["reminder_enabled"] is True and first["reminder_rest_minutes"] == 10, first
+        assert second["reminder_enabled"] is True and second["reminder_rest_minutes"] == 10, second
+        assert stored == {"temperature_kelvin": 4000}, stored
+        print("Policy defaults check passed.")
+
+        # Limits with a string or bool bound, or min above max, are dropped instead of failing every load
+        with open(os.environ[POLICY_PATH_ENV], 'w', encoding='utf-8') as f:
+            json.dump({"limits": {"temperature_kelvin": {"max": "5000"}, "brightness_percent": {"min": True},
+                                  "reminder_rest_minutes": {"min": 20, "max": 10},
+                                  "reminder_work_hours": {"max": 2}}}, f)
+        limited = load_settings()
+        assert limited["temperature_kelvin"] == 4000 and limited["reminder_rest_minutes"] == 5, limited
+        assert get_limits("temperature_kelvin") == get_limits("brightness_percent") == (None, None)
+        assert get_limits("reminder_rest_minutes") == (None, None) and get_limits("reminder_work_hours") == (None, 2)
+        print("Malformed policy limits check passed.")
+        del os.environ[POLICY_PATH_ENV]
+        get_settings_path = real_settings_path
+        _layers = _layer_paths = None
+
     print(f"Settings file path: {get_settings_path()}")
 
     # Load initial settings (might be defaults or existing)
@@ -0,0 +1,206 @@
+# -*- coding: utf-8 -*-
+"""
+Single-instance enforcement and command forwarding between launches.
+
+The first launch takes a per-user instance lock (a named mutex on Windows, a
+locked file elsewhere) and listens on a local channel (a named pipe on
+Windows, a Unix socket elsewhere). Later launches fail to take the lock, send
+their command-line action to the first instance and exit, without importing
+Qt or building any window.
+
+The lock file, the socket and the channel's authkey live in a per-user
+runtime directory that only the user can open. The authkey is random and
+new for every session. The listening instance writes it there with owner-only
+permissions, so another local user cannot compute or read it. Commands travel
+as JSON bytes, never pickles. The receiver only accepts the actions listed
+below, with fields of the expected types (see validate_command).
+
+This module must stay free of Qt imports; the listening side lives in
+instance_server.py, which only the running instance imports.
+"""
+
+import os
+import json
+import time
+import getpass
+import hashlib
+import logging
+import platform
+import tempfile
+from lazy_import import lazy_import
+
+# Only a forwarding launch needs the channel client; the primary instance never does
+connection = lazy_import("multiprocessing.connection")
+
+APP_ID = "HuMuJun" # ASCII id shared by the lock and the channel names
+ERROR_ALREADY_EXISTS = 183
+FORWARD_TIMEOUT_SECONDS = 3.0 # How long a later launch waits for the first instance to start listening
+AUTHKEY_FILE = "instance.key"
+AUTHKEY_BYTES = 32
+MAX_COMMAND_BYTES = 4096 # A forwarded command is a few dozen bytes of JSON
+
+# Commands understood by the running instance
+ACTION_SHOW = "show"
+ACTION_APPLY_PROFILE = "apply_profile"
+ACTION_PAUSE_REMINDERS = "pause_reminders"
+ACTION_RESUME_REMINDERS = "resume_reminders"
+ACTION_SET_COLOR = "set_color" # {"temperature": int or None, "brightness": int or None}
+# Fields each action carries, with their type (None is also allowed for set_color's)
+COMMAND_FIELDS = {
+    ACTION_SHOW: {},
+    ACTION_APPLY_PROFILE: {"profile": str},
+    ACTION_PAUSE_REMINDERS: {},
+    ACTION_RESUME_REMINDERS: {},
+    ACTION_SET_COLOR: {"temperature": int, "brightness": int},
+}
+
+_instance_lock = None # Kept for the life of the process
+
+def get_user_tag():
+    """Short per-user suffix so different users on one machine get separate instances."""
+    try:
+        user = getpass.getuser()
+    except Exception:
+        user = "default"
+    return hashlib.sha1(user.encode('utf-8')).hexdigest()[:12]
+
+def get_runtime_dir():
+    """
+    Returns this user's private runtime directory, creating it if needed.
+    Raises OSError if it exists but another user owns it or others can open it.
+    """
+    if platform.system() == "Windows":
+        # The local profile is only accessible to the user (and administrators)
+        base = os.environ.get("LOCALAPPDATA") or tempfile.gettempdir()
+        path = os.path.join(base, APP_ID)
+        os.makedirs(path, exist_ok=True)
+        return path
+    base = os.environ.get("XDG_RUNTIME_DIR")
+    path = os.path.join(base, APP_ID.lower()) if base else os.path.join(tempfile.gettempdir(), f"{APP_ID.lower()}-{os.getuid()}")
+    try:
+        os.mkdir(path, 0o700)
+    except FileExistsError:
+        pass
+    info = os.lstat(path)
+    if not os.path.isdir(path) or os.path.islink(path) or info.st_uid != os.getuid() or info.st_mode & 0o077:
+        raise OSError(f"Runtime directory {path} is not private to this user")
+    return path
+
+def get_channel_address():
+    """Returns the local channel address for this user."""
+    if platform.system() == "Windows":
+        return rf"\\.\pipe\{APP_ID}-{get_user_tag()}"
+    return os.path.join(get_runtime_dir(), "instance.sock")
+
+def create_authkey():
+    """Generates this session's random authkey and stores it for later launches (owner-only file)."""
+    authkey = os.urandom(AUTHKEY_BYTES)
+    path = os.path.join(get_runtime_dir(), AUTHKEY_FILE)
+    temp_path = path + ".tmp"
+    if os.path.exists(temp_path):
+        os.remove(temp_path)
+    fd = os.open(temp_path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+    with os.fdopen(fd, 'wb') as f:
+        f.write(authkey)
+    os.replace(temp_path, path) # A later launch never reads a half-written key
+    return authkey
+
+def read_authkey():
+    """The running instance's authkey. Raises OSError if it has not written one yet."""
+    with open(os.path.join(get_runtime_dir(), AUTHKEY_FILE), 'rb') as f:
+        authkey = f.read()
+    if len(authkey) != AUTHKEY_BYTES:
+        raise OSError("Incomplete instance authkey")
+    return authkey
+
+def encode_command(command):
+    return json.dumps(command).encode('utf-8')
+
+def validate_command(command):
+    """Returns the command if it is a known action with well-typed fields, else None."""
+    if not isinstance(command, dict):
+        return None
+    fields = COMMAND_FIELDS.get(command.get("action"))
+    if fields is None or not set(command) <= set(fields) | {"action"}:
+        return None
+    for name, expected_type in fields.items():
+        value = command.get(name)
+        if value is None and command["action"] == ACTION_SET_COLOR:
+            continue
+        if isinstance(value, bool) or not isinstance(value, expected_type):
+            return None
+    return command
+
+def decode_command(data):
+    """Parses and validates a received command. Returns None if it is not acceptable."""
+    try:
+        return validate_command(json.loads(data.decode('utf-8')))
+    except (UnicodeDecodeError, ValueError):
+        return None
+
+def acquire_instance_lock():
+    """
+    Tries to become the primary instance. Returns True if this process now
+    holds the lock, False if another instance already holds it.
+    """
+    global _instance_lock
+    if _instance_lock is not None:
+        return True
+    if platform.system() == "Windows":
+        import ctypes
+        kernel32 = ctypes.windll.kernel32
+        handle = kernel32.CreateMutexW(None, False, f"Local\\{APP_ID}-{get_user_tag()}")
+        if not handle:
+            logging.error("CreateMutexW failed; continuing without single-instance protection.")
+            return True
+        if kernel32.GetLastError() == ERROR_ALREADY_EXISTS:
+            kernel32.CloseHandle(handle)
+            return False
+        _instance_lock = handle
+        return True
+
+    import fcntl
+    try:
+        lock_file = open(os.path.join(get_runtime_dir(), "instance.lock"), 'a')
+    except OSError as e:
+        logging.error(f"Cannot open the instance lock ({e}); continuing without single-instance protection.")
+        return True
+    try:
+        fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except OSError:
+        lock_file.close()
+        return False
+    _instance_lock = lock_file
+    return True
+
+def send_command(command, timeout=FORWARD_TIMEOUT_SECONDS):
+    """
+    Sends a command dict (e.g. {"action": "show"}) to the running instance and
+    waits for its acknowledgement. Retries until `timeout` in case the first
+    instance holds the lock but has not started listening yet.
+    Returns True if the running instance accepted the command.
+    """
+    deadline = time.monotonic() + timeout
+    address = None
+    while True:
+        try:
+            # The key file appears (or is replaced) once the running instance listens
+            address = get_channel_address()
+            with connection.Client(address, authkey=read_authkey()) as conn:
+                conn.send_bytes(encode_command(command))
+                return json.loads(conn.recv_bytes(MAX_COMMAND_BYTES).decode('utf-8')) is True
+        except (OSError, EOFError, ValueError, connection.AuthenticationError) as e:
+            if time.monotonic() >= deadline:
+                logging.error(f"Could not reach the running instance at {address}: {e}")
+                return False
+            time.sleep(0.05)
+
+def command_from_args(args):
+    """Builds the command to forward from parsed main.py arguments (see main.parse_args)."""
+    if args.profile:
+        return {"action": ACTION_APPLY_PROFILE, "profile": args.profile}
+    if args.pause_reminders:
+        return {"action": ACTION_PAUSE_REMINDERS}
+    if args.resume_reminders:
+        return {"action": ACTION_RESUME_REMINDERS}
+    return {"action": ACTION_SHOW}
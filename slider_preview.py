@@ -0,0 +1,87 @@
+# -*- coding: utf-8 -*-
+
+from PySide6.QtCore import QObject, QTimer
+from PySide6.QtGui import QGuiApplication
+
+DEFAULT_FRAME_INTERVAL_MS = 16 # ~60 Hz, used when the screen refresh rate is unknown
+DEFAULT_IDLE_COMMIT_MS = 1000
+
+def frame_interval_ms():
+    """Returns the primary screen's frame interval in milliseconds."""
+    app = QGuiApplication.instance()
+    screen = app.primaryScreen() if app is not None else None
+    if screen is not None and screen.refreshRate() > 0:
+        return max(1, int(1000 / screen.refreshRate()))
+    return DEFAULT_FRAME_INTERVAL_MS
+
+class SliderPreview(QObject):
+    """
+    Turns a slider's stream of valueChanged values into a live preview and a
+    single commit.
+
+    request() only records the newest value. At most once per display frame
+    the newest value is passed to `apply_func` (the hardware write); values
+    superseded within the same frame are never applied. `commit_func` (the
+    settings save) runs once, when the slider is released or after the value
+    has been idle for `idle_commit_ms` (for keyboard/wheel changes, which have
+    no release).
+    """
+
+    def __init__(self, slider, apply_func, commit_func, idle_commit_ms=DEFAULT_IDLE_COMMIT_MS, parent=None):
+        super().__init__(parent)
+        self.slider = slider
+        self.apply_func = apply_func
+        self.commit_func = commit_func
+        self._pending_value = None # Newest requested value not yet applied
+        self._applied_value = None
+        self._committed_value = None
+
+        self.frame_timer = QTimer(self)
+        self.frame_timer.setSingleShot(True)
+        self.frame_timer.setInterval(frame_interval_ms())
+        self.frame_timer.timeout.connect(self._apply_pending)
+
+        self.idle_timer = QTimer(self)
+        self.idle_timer.setSingleShot(True)
+        self.idle_timer.setInterval(idle_commit_ms)
+        self.idle_timer.timeout.connect(self._on_idle)
+
+        slider.sliderReleased.connect(self.commit)
+
+    def request(self, value):
+        """Schedules `value` for preview; call from the slider's valueChanged handler."""
+        self._pending_value = value
+        if not self.frame_timer.isActive():
+            self.frame_timer.start()
+        self.idle_timer.start() # Restart the idle countdown
+
+    def _apply_pending(self):
+        """Applies the newest requested value, if it differs from what is on screen."""
+        value, self._pending_value = self._pending_value, None
+        if value is None or value == self._applied_value:
+            return
+        if self.apply_func(value):
+            self._applied_value = value
+
+    def _on_idle(self):
+        # While the user is still holding the handle, the release will commit
+        if self.slider.isSliderDown():
+            return
+        self.commit()
+
+    def commit(self):
+        """Applies any pending value immediately and persists the result once."""
+        self.frame_timer.stop()
+        self.idle_timer.stop()
+        self._apply_pending()
+        if self._applied_value is not None and self._applied_value != self._committed_value:
+            self.commit_func(self._applied_value)
+            self._committed_value = self._applied_value
+
+    def mark_committed(self, value):
+        """Records a value applied and saved outside the pipeline, cancelling any pending preview."""
+        self.frame_timer.stop()
+        self.idle_timer.stop()
+        self._pending_value = None
+        self._applied_value = value
+        self._committed_value = value
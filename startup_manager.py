@@ -1,17 +1,18 @@
 # -*- coding: utf-8 -*-
 
-import winreg
 import os
 import sys
 import logging
+from lazy_import import lazy_import
 
-# Configure logging
-logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+winreg = lazy_import("winreg") # Windows-only; imported when the registry is first accessed
 
 # Use a consistent name for the registry entry
 APP_NAME = "护目君" # Changed application name back for registry key
 # Registry path for current user startup programs
 RUN_KEY_PATH = r"Software\Microsoft\Windows\CurrentVersion\Run"
+# Tells main.py it was launched at login, so it starts staged (see system_idle.py)
+AUTOSTART_FLAG = "--autostart"
 
 def get_executable_path():
     """
@@ -53,6 +54,14 @@ def get_executable_path():
         # Let's try pythonw path directly
         return f'"{pythonw_path}" "{main_script_abs_path}"'
 
+def get_auto_start_command():
+    """The command line stored in the Run key: the executable (or script) plus AUTOSTART_FLAG."""
+    executable_path_or_command = get_executable_path()
+    if not executable_path_or_command:
+        return None
+    if not executable_path_or_command.startswith('"'):
+        executable_path_or_command = f'"{executable_path_or_command}"' # Paths with spaces need quoting
+    return f"{executable_path_or_command} {AUTOSTART_FLAG}"
 
 def is_auto_start_enabled():
     """Checks if the application is configured to run at startup."""
@@ -71,7 +80,7 @@ def is_auto_start_enabled():
 
 def enable_auto_start():
     """Adds the application to the Windows startup registry."""
-    executable_path_or_command = get_executable_path()
+    executable_path_or_command = get_auto_start_command()
     if not executable_path_or_command:
         logging.error("Could not determine executable path for auto-start.")
         return False
@@ -105,6 +114,7 @@ def disable_auto_start():
 if __name__ == "__main__":
     print("Testing Startup Manager...")
     print(f"Executable path/command: {get_executable_path()}")
+    print(f"Auto-start command: {get_auto_start_command()}")
 
     print("\nChecking current status...")
     if is_auto_start_enabled():
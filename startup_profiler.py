@@ -0,0 +1,104 @@
+# -*- coding: utf-8 -*-
+"""
+Lightweight named timing spans for application startup.
+
+Disabled by default; every span() call then returns a shared no-op context
+manager. main.py enables it for --profile-startup and writes the report as
+JSON so startup timings can be collected and compared across machines.
+"""
+
+import os
+import sys
+import json
+import time
+import logging
+import platform
+import contextlib
+
+REPORT_VERSION = 1
+
+_enabled = False
+_origin = time.perf_counter() # Overridden by enable() with the process start time
+_spans = [] # Completed spans, in completion order
+_marks = [] # Instant events
+_depth = 0
+_NULL_SPAN = contextlib.nullcontext()
+
+def enable(origin=None):
+    """Starts collecting spans. `origin` is the perf_counter() value treated as time zero."""
+    global _enabled, _origin
+    _enabled = True
+    if origin is not None:
+        _origin = origin
+
+def is_enabled():
+    return _enabled
+
+def _ms_since_origin(timestamp):
+    return round((timestamp - _origin) * 1000, 3)
+
+@contextlib.contextmanager
+def _timed_span(name):
+    global _depth
+    start = time.perf_counter()
+    _depth += 1
+    try:
+        yield
+    finally:
+        _depth -= 1
+        end = time.perf_counter()
+        _spans.append({
+            "name": name,
+            "start_ms": _ms_since_origin(start),
+            "duration_ms": round((end - start) * 1000, 3),
+            "depth": _depth,
+        })
+
+def span(name):
+    """Context manager timing the enclosed block as `name` (no-op when disabled)."""
+    if not _enabled:
+        return _NULL_SPAN
+    return _timed_span(name)
+
+def mark(name):
+    """Records an instant event, e.g. 'first_paint'."""
+    if _enabled:
+        _marks.append({"name": name, "at_ms": _ms_since_origin(time.perf_counter())})
+
+def report():
+    """Returns the collected timings as a JSON-serializable dict."""
+    return {
+        "version": REPORT_VERSION,
+        "total_ms": _ms_since_origin(time.perf_counter()),
+        "spans": sorted(_spans, key=lambda s: s["start_ms"]),
+        "marks": list(_marks),
+        "environment": {
+            "platform": platform.platform(),
+            "python": platform.python_version(),
+            "frozen": bool(getattr(sys, 'frozen', False)),
+            "cpu_count": os.cpu_count(),
+        },
+    }
+
+def write_report(path=None):
+    """
+    Writes the report as JSON to `path`, or to standard output if no path is
+    given. Windowed builds have no standard output; a path is required there.
+    Returns True on success.
+    """
+    data = json.dumps(report(), indent=2)
+    try:
+        if path:
+            with open(path, 'w', encoding='utf-8') as f:
+                f.write(data + "\n")
+            logging.info(f"Startup profile written to {path}")
+        elif sys.stdout is not None:
+            sys.stdout.write(data + "\n")
+            sys.stdout.flush()
+        else:
+            logging.error("No standard output available for the startup profile; pass a file path.")
+            return False
+        return True
+    except (IOError, OSError) as e:
+        logging.error(f"Failed to write startup profile: {e}")
+        return False
@@ -0,0 +1,92 @@
+# EyeProtector usage statistics command line tool
+# -*- coding: utf-8 -*-
+"""
+Exports usage statistics without starting the GUI.
+
+Examples:
+    python stats_cli.py export --format json --from 2025-01-01 --to 2025-12-31
+    python stats_cli.py export --format csv --output usage.csv
+    python stats_cli.py compact
+    python stats_cli.py fleet collected/ --period weekly --output org_weekly.csv
+"""
+
+import sys
+import argparse
+import datetime
+import logging
+
+import stats_manager
+import log_setup
+from lazy_import import lazy_import
+
+fleet_stats = lazy_import("fleet_stats") # Only the fleet command needs it
+
+def parse_date(value):
+    """argparse type for YYYY-MM-DD dates."""
+    try:
+        return datetime.date.fromisoformat(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"Invalid date '{value}', expected YYYY-MM-DD")
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="stats_cli.py", description="护目君 usage statistics tool")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    export_parser = subparsers.add_parser("export", help="Export daily usage totals")
+    export_parser.add_argument("--format", choices=["csv", "json"], default="csv", help="Output format (default: csv)")
+    export_parser.add_argument("--from", dest="start_date", type=parse_date, help="First day to include (YYYY-MM-DD)")
+    export_parser.add_argument("--to", dest="end_date", type=parse_date, help="Last day to include (YYYY-MM-DD)")
+    export_parser.add_argument("--output", "-o", help="Output file (default: standard output)")
+
+    subparsers.add_parser("compact", help="Fold the event log into the daily summary file")
+
+    fleet_parser = subparsers.add_parser("fleet", help="Aggregate statistics collected from many workstations")
+    fleet_parser.add_argument("root", help="Directory tree holding one statistics directory per user")
+    fleet_parser.add_argument("--period", choices=["daily", "weekly"], default="daily", help="Report period (default: daily)")
+    fleet_parser.add_argument("--format", choices=["csv", "json"], default="csv", help="Output format (default: csv)")
+    fleet_parser.add_argument("--from", dest="start_date", type=parse_date, help="First day to include (YYYY-MM-DD)")
+    fleet_parser.add_argument("--to", dest="end_date", type=parse_date, help="Last day to include (YYYY-MM-DD)")
+    fleet_parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: one per core; 0 = none)")
+    fleet_parser.add_argument("--batch-size", type=int, default=64, help="User directories per worker task (default: 64)")
+    fleet_parser.add_argument("--work-hours", type=float, default=1, help="Work interval per due rest, in hours (default: 1)")
+    fleet_parser.add_argument("--output", "-o", help="Output file (default: standard output)")
+    return parser
+
+def run_export(args):
+    exporter = stats_manager.export_json if args.format == "json" else stats_manager.export_csv
+    if args.output:
+        with open(args.output, 'w', newline='', encoding='utf-8') as out_file:
+            count = exporter(out_file, args.start_date, args.end_date)
+        logging.info(f"Exported {count} days to {args.output}")
+    else:
+        sys.stdout.reconfigure(newline='') # Let the csv module control line endings
+        exporter(sys.stdout, args.start_date, args.end_date)
+    return 0
+
+def run_fleet(args):
+    daily, user_count = fleet_stats.aggregate(args.root, args.workers, args.batch_size, args.work_hours,
+                                              args.start_date, args.end_date)
+    table = fleet_stats.weekly_rollup(daily) if args.period == "weekly" else daily
+    writer = fleet_stats.write_json if args.format == "json" else fleet_stats.write_csv
+    if args.output:
+        with open(args.output, 'w', newline='', encoding='utf-8') as out_file:
+            count = writer(out_file, table)
+        logging.info(f"Wrote {count} {args.period} rows for {user_count} users to {args.output}")
+    else:
+        sys.stdout.reconfigure(newline='')
+        writer(sys.stdout, table)
+    return 0
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    log_setup.setup_logging(log_file=False)
+    if args.command == "export":
+        return run_export(args)
+    if args.command == "compact":
+        return 0 if stats_manager.compact_stats() else 1
+    if args.command == "fleet":
+        return run_fleet(args)
+    return 2
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,184 @@
+# -*- coding: utf-8 -*-
+
+import sqlite3
+import logging
+import datetime
+
+SCHEMA_VERSION = 1
+
+# The date is the primary key of a WITHOUT ROWID table, so the table itself is
+# a B-tree clustered on date: range scans read contiguous pages in date order.
+SCHEMA_SQL = """
+CREATE TABLE IF NOT EXISTS daily_stats (
+    date TEXT PRIMARY KEY,
+    total_usage_seconds INTEGER NOT NULL DEFAULT 0,
+    rest_periods_taken INTEGER NOT NULL DEFAULT 0
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+) WITHOUT ROWID;
+"""
+
+# Statement texts are constants so sqlite3's statement cache reuses the
+# prepared statements instead of re-parsing the SQL on every call.
+UPSERT_SQL = """
+INSERT INTO daily_stats (date, total_usage_seconds, rest_periods_taken)
+VALUES (?, ?, ?)
+ON CONFLICT(date) DO UPDATE SET
+    total_usage_seconds = total_usage_seconds + excluded.total_usage_seconds,
+    rest_periods_taken = rest_periods_taken + excluded.rest_periods_taken
+"""
+
+RANGE_SQL = """
+SELECT date, total_usage_seconds, rest_periods_taken
+FROM daily_stats
+WHERE date BETWEEN ? AND ?
+ORDER BY date
+"""
+
+# Week buckets start on Monday: strftime('%w') is 0 for Sunday, so shifting
+# back by (%w + 6) % 7 days lands on that week's Monday.
+WEEKLY_SQL = """
+SELECT date(date, '-' || ((CAST(strftime('%w', date) AS INTEGER) + 6) % 7) || ' days') AS period,
+       SUM(total_usage_seconds), SUM(rest_periods_taken), COUNT(*)
+FROM daily_stats
+WHERE date BETWEEN ? AND ?
+GROUP BY period
+ORDER BY period
+"""
+
+MONTHLY_SQL = """
+SELECT substr(date, 1, 7) AS period,
+       SUM(total_usage_seconds), SUM(rest_periods_taken), COUNT(*)
+FROM daily_stats
+WHERE date BETWEEN ? AND ?
+GROUP BY period
+ORDER BY period
+"""
+
+CSV_MIGRATED_KEY = "csv_migrated"
+
+def _date_str(value):
+    """Accepts a date/datetime or an ISO date string and returns 'YYYY-MM-DD'."""
+    if isinstance(value, (datetime.date, datetime.datetime)):
+        return value.strftime("%Y-%m-%d")
+    return str(value)
+
+class StatsDatabase:
+    """SQLite store of daily usage summaries with date-range and rollup queries."""
+
+    def __init__(self, db_path):
+        self.db_path = db_path
+        self.conn = sqlite3.connect(db_path)
+        # WAL lets readers run while a write is in progress and makes each
+        # commit an append to the log instead of a rewrite of database pages.
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self._ensure_schema()
+        logging.info(f"Statistics database opened: {db_path}")
+
+    def _ensure_schema(self):
+        """Creates the tables on first use and records the schema version."""
+        version = self.conn.execute("PRAGMA user_version").fetchone()[0]
+        if version < SCHEMA_VERSION:
+            with self.conn:
+                self.conn.executescript(SCHEMA_SQL)
+                self.conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+
+    def close(self):
+        """Closes the database connection."""
+        if self.conn is not None:
+            self.conn.close()
+            self.conn = None
+
+    def upsert_daily(self, date, usage_seconds, rest_periods):
+        """Adds usage and rest counts to the row for a date, creating it if needed."""
+        with self.conn:
+            self.conn.execute(UPSERT_SQL, (_date_str(date), int(usage_seconds), int(rest_periods)))
+
+    def upsert_many(self, rows):
+        """Applies (date, usage_seconds, rest_periods) rows in a single transaction."""
+        with self.conn:
+            self.conn.executemany(
+                UPSERT_SQL,
+                ((_date_str(date), int(usage), int(rests)) for date, usage, rests in rows)
+            )
+
+    def is_csv_migrated(self):
+        """Returns True once the CSV history has been imported."""
+        row = self.conn.execute("SELECT value FROM meta WHERE key = ?", (CSV_MIGRATED_KEY,)).fetchone()
+        return row is not None
+
+    def migrate_from_totals(self, daily_totals):
+        """
+        One-time import of {date_str: (usage_seconds, rest_periods)} history.
+        The rows and the migration marker are committed together, so an
+        interrupted migration is simply retried on the next open.
+        """
+        if self.is_csv_migrated():
+            return False
+        with self.conn:
+            self.conn.executemany(
+                UPSERT_SQL,
+                ((date_str, int(usage), int(rests)) for date_str, (usage, rests) in daily_totals.items())
+            )
+            self.conn.execute(
+                "INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)",
+                (CSV_MIGRATED_KEY, datetime.datetime.now().isoformat(timespec="seconds"))
+            )
+        logging.info(f"Migrated {len(daily_totals)} days of CSV statistics into {self.db_path}")
+        return True
+
+    def rebuild_from_totals(self, daily_totals):
+        """
+        Replaces every row with {date_str: (usage_seconds, rest_periods)} and
+        marks the CSV history as imported, in one transaction. Used when the
+        database missed events that only reached the CSV log.
+        """
+        with self.conn:
+            self.conn.execute("DELETE FROM daily_stats")
+            self.conn.executemany(
+                UPSERT_SQL,
+                ((date_str, int(usage), int(rests)) for date_str, (usage, rests) in daily_totals.items())
+            )
+            self.conn.execute(
+                "INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)",
+                (CSV_MIGRATED_KEY, datetime.datetime.now().isoformat(timespec="seconds"))
+            )
+        logging.info(f"Rebuilt {len(daily_totals)} days of statistics in {self.db_path} from the CSV history")
+
+    def query_range(self, start_date, end_date):
+        """Returns [(date_str, usage_seconds, rest_periods)] for start..end inclusive."""
+        return self.conn.execute(RANGE_SQL, (_date_str(start_date), _date_str(end_date))).fetchall()
+
+    def weekly_rollup(self, start_date, end_date):
+        """Returns [(week_start_date, usage_seconds, rest_periods, days_recorded)] per Monday-based week."""
+        return self.conn.execute(WEEKLY_SQL, (_date_str(start_date), _date_str(end_date))).fetchall()
+
+    def monthly_rollup(self, start_date, end_date):
+        """Returns [('YYYY-MM', usage_seconds, rest_periods, days_recorded)] per calendar month."""
+        return self.conn.execute(MONTHLY_SQL, (_date_str(start_date), _date_str(end_date))).fetchall()
+
+# Example Usage (for testing)
+if __name__ == "__main__":
+    print("Testing stats database (in memory)...")
+    db = StatsDatabase(":memory:")
+    today = datetime.date.today()
+    db.upsert_daily(today, 3600, 5)
+    db.upsert_daily(today, 1800, 2)
+    db.upsert_daily(today - datetime.timedelta(days=1), 7200, 6)
+
+    start = today - datetime.timedelta(days=30)
+    print("\nDaily rows:")
+    for row in db.query_range(start, today):
+        print(row)
+    print("\nWeekly rollup:")
+    for row in db.weekly_rollup(start, today):
+        print(row)
+    print("\nMonthly rollup:")
+    for row in db.monthly_rollup(start, today):
+        print(row)
+
+    db.close()
+    print("\nTest complete.")
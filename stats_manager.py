@@ -1,21 +1,40 @@
 # -*- coding: utf-8 -*-
 
 import csv
+import io
 import os
+import json
+import bisect
 import logging
 import datetime
-import appdirs # Use appdirs again for consistency
+from lazy_import import lazy_import
 
-# Configure logging
-logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+appdirs = lazy_import("appdirs") # Use appdirs again for consistency
+# Storage backends are only needed once statistics are first recorded or queried
+sqlite3 = lazy_import("sqlite3")
+stats_db = lazy_import("stats_db")
+activity_timeline = lazy_import("activity_timeline")
 
 APP_NAME = "EyeProtector"
 APP_AUTHOR = "ClineUser" # Match settings_manager
-STATS_FILE = "usage_stats.csv"
+STATS_FILE = "usage_stats.csv" # Compacted daily summary, one row per date, sorted by date
+EVENTS_FILE = "usage_events.csv" # Append-only log of recorded sessions, folded into STATS_FILE on compaction
+PENDING_EVENTS_FILE = "usage_events.compacting.csv" # Events detached from the log while a compaction runs
 CSV_HEADER = ["date", "total_usage_seconds", "rest_periods_taken"] # Simplified header for now
+MERGED_BATCH_PREFIX = "merged_batch=" # Extra summary header field naming the last pending file merged into it
+EVENT_HEADER = ["date", "usage_seconds", "rest_periods"]
+STATS_DB_FILE = "usage_stats.db" # SQLite index of daily totals for range and rollup queries
+STATS_DB_RESYNC_FILE = "usage_stats.db.resync" # Present while the database is missing events recorded in the CSV log
+TIMELINE_FILE = "activity_timeline.bin" # Per-minute activity states, memory-mapped
+COMPACT_THRESHOLD_BYTES = 64 * 1024 # Compact once the event log grows past this size
+INDEX_SUFFIX = ".idx" # Sparse index of a summary file, stored next to it
+INDEX_STRIDE = 256 # One index entry every this many rows
 
-def get_stats_path():
-    """Gets the full path to the statistics CSV file."""
+_stats_db = None # Opened lazily by get_stats_db()
+_activity_timeline = None # Opened lazily by get_activity_timeline()
+
+def get_data_dir():
+    """Gets the statistics data directory, creating it if necessary."""
     data_dir = appdirs.user_data_dir(APP_NAME, APP_AUTHOR)
     # Ensure data directory exists (might have been created by settings_manager)
     if not os.path.exists(data_dir):
@@ -25,8 +44,28 @@ def get_stats_path():
         except OSError as e:
             logging.error(f"Failed to create data directory {data_dir}: {e}")
             # Fallback to current directory
-            return os.path.join(".", STATS_FILE)
-    return os.path.join(data_dir, STATS_FILE)
+            return "."
+    return data_dir
+
+def get_stats_path():
+    """Gets the full path to the statistics CSV file."""
+    return os.path.join(get_data_dir(), STATS_FILE)
+
+def get_events_path():
+    """Gets the full path to the append-only usage event log."""
+    return os.path.join(get_data_dir(), EVENTS_FILE)
+
+def get_stats_db_path():
+    """Gets the full path to the SQLite statistics database."""
+    return os.path.join(get_data_dir(), STATS_DB_FILE)
+
+def get_stats_db_resync_path():
+    """Gets the full path to the marker that the database must be rebuilt from the CSV history."""
+    return os.path.join(get_data_dir(), STATS_DB_RESYNC_FILE)
+
+def get_timeline_path():
+    """Gets the full path to the per-minute activity timeline file."""
+    return os.path.join(get_data_dir(), TIMELINE_FILE)
 
 def initialize_stats_file():
     """Creates the CSV file and writes the header if it doesn't exist."""
@@ -40,53 +79,517 @@ def initialize_stats_file():
         except IOError as e:
             logging.error(f"Failed to initialize statistics file {stats_path}: {e}")
 
-def record_daily_summary(usage_seconds, rest_periods):
+def _cut_torn_row(path):
     """
-    Appends or updates the daily summary for today in the CSV file.
+    Truncates the file back to its last complete line if a crash left a row
+    without its line ending, so the next row is not glued onto the fragment
+    (and a fragment such as "2024-05-01,36" is not read as a real event).
+    """
+    try:
+        with open(path, 'r+b') as f:
+            end = f.seek(0, os.SEEK_END)
+            if end == 0:
+                return
+            f.seek(end - 1)
+            last = f.read(1)
+            if last == b"\n":
+                return
+            if last == b"\r": # Only the "\n" of the row's "\r\n" is missing
+                f.write(b"\n")
+                return
+            keep, pos = 0, end
+            while pos > 0:
+                start = max(0, pos - 4096)
+                f.seek(start)
+                cut = f.read(pos - start).rfind(b"\n")
+                if cut >= 0:
+                    keep = start + cut + 1
+                    break
+                pos = start
+            f.truncate(keep)
+        logging.warning(f"Removed a torn row ({end - keep} bytes) from the end of {path}")
+    except FileNotFoundError:
+        return
 
-    :param usage_seconds: Total seconds the application was used today.
-    :param rest_periods: Number of rest periods triggered today.
+def _append_event(date_str, usage_seconds, rest_periods):
     """
-    stats_path = get_stats_path()
-    initialize_stats_file() # Ensure file and header exist
+    Appends one event row to the log. Only the new row is written, so the cost
+    does not depend on how much history exists, and a crash can at worst lose
+    the row being written, never earlier ones: a row torn by a crash is cut
+    off before the next one is appended.
+    """
+    events_path = get_events_path()
+    _cut_torn_row(events_path)
+    with open(events_path, 'a', newline='', encoding='utf-8') as csvfile:
+        writer = csv.writer(csvfile)
+        if csvfile.tell() == 0:
+            writer.writerow(EVENT_HEADER)
+        writer.writerow([date_str, int(usage_seconds), int(rest_periods)])
+        csvfile.flush()
+        os.fsync(csvfile.fileno())
+        return csvfile.tell()
 
-    today_date_str = datetime.date.today().isoformat()
-    updated = False
-    rows = []
+def _read_summary_into(path, totals):
+    """Adds the rows of a compacted summary file into the totals dict, skipping malformed rows."""
+    if not os.path.exists(path):
+        return
+    with open(path, 'r', newline='', encoding='utf-8') as csvfile:
+        reader = csv.reader(csvfile)
+        next(reader, None) # Skip header
+        for row in reader:
+            if not row:
+                continue
+            try:
+                date_str, usage_seconds, rest_periods = row[0], int(row[1]), int(row[2])
+            except (ValueError, IndexError):
+                # One damaged row must not block every later compaction
+                logging.warning(f"Skipping malformed summary row in {path}: {row}")
+                continue
+            entry = totals.setdefault(date_str, [0, 0])
+            entry[0] += usage_seconds
+            entry[1] += rest_periods
 
+def _batch_id(path):
+    """Identifies a detached event file: renames keep its inode, size and mtime, a new batch differs."""
+    stat = os.stat(path)
+    return f"{stat.st_ino}-{stat.st_size}-{stat.st_mtime_ns}"
+
+def _summary_batch(path):
+    """The batch id recorded in a summary file's header, or None."""
     try:
-        # Read existing data
-        with open(stats_path, 'r', newline='', encoding='utf-8') as csvfile:
-            reader = csv.reader(csvfile)
-            header = next(reader) # Skip header
-            rows.append(header)
-            for row in reader:
-                if row and row[0] == today_date_str:
-                    # Update today's entry
-                    current_usage = int(row[1])
-                    current_rests = int(row[2])
-                    row[1] = str(current_usage + usage_seconds) # Accumulate usage
-                    row[2] = str(current_rests + rest_periods) # Accumulate rests
-                    updated = True
-                    logging.info(f"Updating stats for {today_date_str}: usage={row[1]}s, rests={row[2]}")
-                rows.append(row)
-
-        # If today's entry wasn't found, append a new one
-        if not updated:
-            new_row = [today_date_str, str(usage_seconds), str(rest_periods)]
-            rows.append(new_row)
-            logging.info(f"Appending new stats for {today_date_str}: usage={usage_seconds}s, rests={rest_periods}")
-
-        # Write data back to the file
-        with open(stats_path, 'w', newline='', encoding='utf-8') as csvfile:
+        with open(path, 'r', newline='', encoding='utf-8') as csvfile:
+            header = next(csv.reader(csvfile), [])
+    except (IOError, OSError, csv.Error):
+        return None
+    for field in header[len(CSV_HEADER):]:
+        if field.startswith(MERGED_BATCH_PREFIX):
+            return field[len(MERGED_BATCH_PREFIX):]
+    return None
+
+def _pending_already_merged(data_dir):
+    """True if the pending event file is already part of the summary (a compaction died before deleting it)."""
+    pending_path = os.path.join(data_dir, PENDING_EVENTS_FILE)
+    try:
+        batch = _batch_id(pending_path)
+    except OSError:
+        return False
+    return _summary_batch(os.path.join(data_dir, STATS_FILE)) == batch
+
+def _read_events_into(path, totals):
+    """Adds the rows of an event log into the totals dict, skipping a torn last row."""
+    if not os.path.exists(path):
+        return
+    with open(path, 'r', newline='', encoding='utf-8') as csvfile:
+        reader = csv.reader(csvfile)
+        next(reader, None) # Skip header
+        for row in reader:
+            try:
+                date_str, usage_seconds, rest_periods = row
+                usage_seconds, rest_periods = int(usage_seconds), int(rest_periods)
+            except ValueError:
+                # A row cut short by a crash during append; the rows before it are intact
+                logging.warning(f"Skipping malformed event row in {path}: {row}")
+                continue
+            entry = totals.setdefault(date_str, [0, 0])
+            entry[0] += usage_seconds
+            entry[1] += rest_periods
+
+def get_daily_totals():
+    """
+    Returns {date_str: (total_usage_seconds, rest_periods_taken)} sorted by date,
+    combining the compacted summary with events not yet compacted.
+    """
+    data_dir = get_data_dir()
+    totals = {}
+    try:
+        _read_summary_into(os.path.join(data_dir, STATS_FILE), totals)
+        if not _pending_already_merged(data_dir):
+            _read_events_into(os.path.join(data_dir, PENDING_EVENTS_FILE), totals)
+        _read_events_into(os.path.join(data_dir, EVENTS_FILE), totals)
+    except (IOError, csv.Error, ValueError, IndexError) as e:
+        logging.error(f"Failed to read statistics from {data_dir}: {e}")
+    return {date_str: tuple(totals[date_str]) for date_str in sorted(totals)}
+
+def get_daily_summary(date=None):
+    """Returns (total_usage_seconds, rest_periods_taken) for a date (default: today)."""
+    date_str = (date or datetime.date.today()).isoformat()
+    return get_daily_totals().get(date_str, (0, 0))
+
+def compact_stats():
+    """
+    Folds the event log into the daily summary file.
+
+    The log is first detached with an atomic rename, so new events keep going to
+    a fresh log. The merged summary is written to a temporary file, fsynced and
+    atomically swapped in with os.replace, so the summary on disk is always
+    either the complete old version or the complete new one. The new summary's
+    header names the detached batch (see _batch_id), which is deleted only after
+    the swap. If a crash leaves the batch behind, the next compaction (and every
+    reader) sees that the summary already holds it and does not count it
+    again: a crash at any point neither drops nor double-counts history.
+    """
+    data_dir = get_data_dir()
+    stats_path = os.path.join(data_dir, STATS_FILE)
+    events_path = os.path.join(data_dir, EVENTS_FILE)
+    pending_path = os.path.join(data_dir, PENDING_EVENTS_FILE)
+    tmp_path = stats_path + ".tmp"
+
+    try:
+        # A pending file left by an interrupted compaction is merged first
+        if not os.path.exists(pending_path):
+            if not os.path.exists(events_path):
+                return True # Nothing to compact
+            os.replace(events_path, pending_path)
+
+        batch = _batch_id(pending_path)
+        if _summary_batch(stats_path) == batch:
+            # Merged by a compaction that stopped before deleting it; only the delete is left
+            os.remove(pending_path)
+            logging.info(f"Removed usage events already compacted into {stats_path}")
+            return True
+
+        totals = {}
+        _read_summary_into(stats_path, totals)
+        _read_events_into(pending_path, totals)
+
+        with open(tmp_path, 'w', newline='', encoding='utf-8') as csvfile:
             writer = csv.writer(csvfile)
-            writer.writerows(rows)
+            writer.writerow(CSV_HEADER + [MERGED_BATCH_PREFIX + batch])
+            for date_str in sorted(totals):
+                usage_seconds, rest_periods = totals[date_str]
+                writer.writerow([date_str, usage_seconds, rest_periods])
+            csvfile.flush()
+            os.fsync(csvfile.fileno())
+        os.replace(tmp_path, stats_path)
+        os.remove(pending_path)
+        logging.info(f"Compacted usage events into {stats_path} ({len(totals)} days)")
         return True
+    except (IOError, OSError, csv.Error, ValueError, IndexError) as e:
+        logging.error(f"Failed to compact statistics in {data_dir}: {e}")
+        return False
 
-    except (IOError, csv.Error, ValueError, IndexError) as e:
-        logging.error(f"Failed to read or write statistics file {stats_path}: {e}")
+# --- Streaming access ---
+def to_date_str(value):
+    """Accepts a date or an ISO date string (or None) and returns the string form, as used in the files."""
+    if value is None or isinstance(value, str):
+        return value
+    return value.isoformat()
+
+def build_sparse_index(csv_path, stride=INDEX_STRIDE):
+    """
+    Scans a date-sorted summary file once and returns [[date_str, byte_offset]]
+    for every `stride`-th row, so a reader can seek close to any date.
+    """
+    entries = []
+    with open(csv_path, 'rb') as f:
+        offset = len(f.readline()) # Header
+        for row_number, line in enumerate(f):
+            if row_number % stride == 0 and line.strip():
+                entries.append([line.split(b',', 1)[0].decode('utf-8'), offset])
+            offset += len(line)
+    return entries
+
+def _load_sparse_index(csv_path):
+    """Returns the sparse index for csv_path, rebuilding it if the file changed since it was written."""
+    index_path = csv_path + INDEX_SUFFIX
+    stat = os.stat(csv_path)
+    signature = [stat.st_size, stat.st_mtime_ns]
+    try:
+        with open(index_path, 'r', encoding='utf-8') as f:
+            index = json.load(f)
+        if index.get("signature") == signature and index.get("stride") == INDEX_STRIDE:
+            return index["entries"]
+    except (IOError, ValueError, KeyError, AttributeError):
+        pass # Missing or stale index; rebuild below
+
+    entries = build_sparse_index(csv_path)
+    try:
+        tmp_path = index_path + ".tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({"signature": signature, "stride": INDEX_STRIDE, "entries": entries}, f)
+        os.replace(tmp_path, index_path)
+    except (IOError, OSError) as e:
+        logging.warning(f"Failed to write sparse index {index_path}: {e}")
+    return entries
+
+def iter_summary_rows(path=None, start_date=None, end_date=None, use_index=True):
+    """
+    Lazily yields (date_str, usage_seconds, rest_periods) from a date-sorted
+    summary CSV, one row at a time, for start..end inclusive (either bound may
+    be None). With a start date, the sparse index is used to seek near the
+    first matching row instead of reading from the top.
+
+    :param path: Summary file to read; defaults to this machine's usage_stats.csv.
+    """
+    path = path or get_stats_path()
+    if not os.path.exists(path):
+        return
+    start_str, end_str = to_date_str(start_date), to_date_str(end_date)
+
+    offset = None
+    if start_str and use_index:
+        entries = _load_sparse_index(path)
+        # Last indexed row strictly before start; rows from there on may match
+        position = bisect.bisect_left([entry[0] for entry in entries], start_str)
+        if position > 0:
+            offset = entries[position - 1][1]
+
+    with open(path, 'rb') as raw:
+        if offset is None:
+            raw.readline() # Skip header
+        else:
+            raw.seek(offset)
+        reader = csv.reader(io.TextIOWrapper(raw, encoding='utf-8', newline=''))
+        for row in reader:
+            if not row:
+                continue
+            date_str = row[0]
+            if start_str and date_str < start_str:
+                continue
+            if end_str and date_str > end_str:
+                break # Rows are sorted by date
+            try:
+                yield date_str, int(row[1]), int(row[2])
+            except (ValueError, IndexError):
+                logging.warning(f"Skipping malformed row in {path}: {row}")
+
+def iter_daily_totals(start_date=None, end_date=None, data_dir=None, use_index=True):
+    """
+    Lazily yields (date_str, usage_seconds, rest_periods) in date order for
+    start..end, merging the streamed summary with events not yet compacted.
+    Only the uncompacted events are held in memory, and compaction keeps those
+    bounded, so memory use does not grow with history.
+
+    :param data_dir: Statistics directory to read; defaults to this machine's.
+    :param use_index: Seek with (and maintain) the summary's sparse index.
+    """
+    data_dir = data_dir or get_data_dir()
+    start_str, end_str = to_date_str(start_date), to_date_str(end_date)
+    pending = {}
+    if not _pending_already_merged(data_dir):
+        _read_events_into(os.path.join(data_dir, PENDING_EVENTS_FILE), pending)
+    _read_events_into(os.path.join(data_dir, EVENTS_FILE), pending)
+    pending_dates = [
+        date_str for date_str in sorted(pending)
+        if (not start_str or date_str >= start_str) and (not end_str or date_str <= end_str)
+    ]
+
+    next_pending = 0
+    for date_str, usage_seconds, rest_periods in iter_summary_rows(os.path.join(data_dir, STATS_FILE), start_str, end_str, use_index):
+        while next_pending < len(pending_dates) and pending_dates[next_pending] < date_str:
+            pending_date = pending_dates[next_pending]
+            yield (pending_date,) + tuple(pending[pending_date])
+            next_pending += 1
+        if next_pending < len(pending_dates) and pending_dates[next_pending] == date_str:
+            usage_seconds += pending[date_str][0]
+            rest_periods += pending[date_str][1]
+            next_pending += 1
+        yield date_str, usage_seconds, rest_periods
+    for pending_date in pending_dates[next_pending:]:
+        yield (pending_date,) + tuple(pending[pending_date])
+
+def export_csv(out_file, start_date=None, end_date=None):
+    """Streams daily totals for start..end to a text file object as CSV. Returns the row count."""
+    writer = csv.writer(out_file)
+    writer.writerow(CSV_HEADER)
+    count = 0
+    for row in iter_daily_totals(start_date, end_date):
+        writer.writerow(row)
+        count += 1
+    return count
+
+def export_json(out_file, start_date=None, end_date=None):
+    """Streams daily totals for start..end to a text file object as a JSON array. Returns the row count."""
+    count = 0
+    out_file.write("[")
+    for row in iter_daily_totals(start_date, end_date):
+        out_file.write(",\n  " if count else "\n  ")
+        out_file.write(json.dumps(dict(zip(CSV_HEADER, row))))
+        count += 1
+    out_file.write("\n]\n" if count else "]\n")
+    return count
+
+def get_stats_db():
+    """
+    Returns the shared StatsDatabase, opening it on first use. The first open
+    imports the existing CSV history once; afterwards record_daily_summary()
+    keeps the database up to date. The CSV log is the source of truth: each
+    event is bracketed by a resync marker that is removed only once the
+    database has it too (see record_daily_summary), so after a failed upsert,
+    an unavailable database or a crash in between, the next open rebuilds
+    the database from the CSV history before removing the marker. Returns
+    None if the database is unavailable.
+    """
+    global _stats_db
+    if _stats_db is None:
+        try:
+            db = stats_db.StatsDatabase(get_stats_db_path())
+            if os.path.exists(get_stats_db_resync_path()):
+                db.rebuild_from_totals(get_daily_totals())
+                _clear_stats_db_resync_marker()
+            elif not db.is_csv_migrated():
+                db.migrate_from_totals(get_daily_totals())
+            _stats_db = db
+        except sqlite3.Error as e:
+            logging.error(f"Failed to open statistics database {get_stats_db_path()}: {e}")
+            return None
+    return _stats_db
+
+def _write_stats_db_resync_marker():
+    """Marks the database as possibly behind the CSV log until _clear_stats_db_resync_marker()."""
+    try:
+        with open(get_stats_db_resync_path(), 'w', encoding='utf-8') as marker:
+            os.fsync(marker.fileno())
+    except (IOError, OSError) as e:
+        logging.error(f"Failed to write statistics database resync marker: {e}")
+
+def _clear_stats_db_resync_marker():
+    try:
+        os.remove(get_stats_db_resync_path())
+    except FileNotFoundError:
+        pass
+    except OSError as e:
+        logging.error(f"Failed to remove statistics database resync marker: {e}") # Only costs a rebuild
+
+def _drop_stats_db():
+    """Closes the database so the next get_stats_db() reopens it and, with the marker present, rebuilds it."""
+    global _stats_db
+    if _stats_db is not None:
+        _stats_db.close()
+        _stats_db = None
+
+def query_daily_range(start_date, end_date):
+    """Returns [(date_str, usage_seconds, rest_periods)] for start..end inclusive."""
+    db = get_stats_db()
+    return db.query_range(start_date, end_date) if db else []
+
+def query_weekly_rollup(start_date, end_date):
+    """Returns [(week_start_date, usage_seconds, rest_periods, days_recorded)] for start..end."""
+    db = get_stats_db()
+    return db.weekly_rollup(start_date, end_date) if db else []
+
+def query_monthly_rollup(start_date, end_date):
+    """Returns [('YYYY-MM', usage_seconds, rest_periods, days_recorded)] for start..end."""
+    db = get_stats_db()
+    return db.monthly_rollup(start_date, end_date) if db else []
+
+def record_daily_summary(usage_seconds, rest_periods, date=None):
+    """
+    Records usage for a day by appending an event to the log.
+
+    The daily summary file is not rewritten here; events are folded into it by
+    compact_stats() once the log grows past COMPACT_THRESHOLD_BYTES.
+
+    :param usage_seconds: Seconds of usage to add to the day.
+    :param rest_periods: Number of rest periods to add to the day.
+    :param date: The day to credit (datetime.date); defaults to today.
+    """
+    date_str = (date or datetime.date.today()).isoformat()
+    db = get_stats_db() # Open (and migrate) before appending so the new event is not imported twice
+    # Until the upsert commits the CSV may be ahead of the database; a crash in between leaves the marker
+    _write_stats_db_resync_marker()
+    try:
+        log_size = _append_event(date_str, usage_seconds, rest_periods)
+        logging.info("Recorded stats event for %s: usage=%ss, rests=%s", date_str, usage_seconds, rest_periods)
+    except (IOError, OSError, csv.Error) as e:
+        logging.error(f"Failed to append to usage event log {get_events_path()}: {e}")
+        if db is not None:
+            _clear_stats_db_resync_marker() # Nothing new in either store
         return False
 
+    if db is not None:
+        try:
+            db.upsert_daily(date_str, usage_seconds, rest_periods)
+            _clear_stats_db_resync_marker()
+        except sqlite3.Error as e:
+            logging.error(f"Failed to update statistics database: {e}")
+            _drop_stats_db()
+
+    if log_size >= COMPACT_THRESHOLD_BYTES:
+        compact_stats()
+    return True
+
+def get_activity_timeline():
+    """Returns the shared ActivityTimeline, opening it on first use, or None if unavailable."""
+    global _activity_timeline
+    if _activity_timeline is None:
+        try:
+            _activity_timeline = activity_timeline.ActivityTimeline(get_timeline_path())
+        except (IOError, OSError, ValueError) as e:
+            logging.error(f"Failed to open activity timeline {get_timeline_path()}: {e}")
+            return None
+    return _activity_timeline
+
+def record_activity_minute(resting, when=None):
+    """
+    Records the state of the current minute in the activity timeline.
+
+    :param resting: True if a rest period is in progress.
+    :param when: The minute to record (datetime); defaults to now.
+    """
+    timeline = get_activity_timeline()
+    if timeline is None:
+        return False
+    # With input idle time available, tell breaks taken from breaks skipped
+    idle_seconds = activity_timeline.get_idle_seconds()
+    user_active = idle_seconds is None or idle_seconds < 60
+    if resting:
+        state = activity_timeline.STATE_REST_SKIPPED if (idle_seconds is not None and user_active) else activity_timeline.STATE_RESTING
+    else:
+        state = activity_timeline.STATE_ACTIVE if user_active else activity_timeline.STATE_IDLE
+    try:
+        return timeline.record_minute(when or datetime.datetime.now(), state)
+    except (IOError, OSError, ValueError) as e:
+        logging.error("Failed to record activity minute: %s", e)
+        return False
+
+class UsageCheckpointer:
+    """
+    Records a running session incrementally, so a killed process or a logoff
+    loses at most one checkpoint interval of usage.
+
+    Each checkpoint records only what happened since the previous successful
+    one, so periodic checkpoints plus the final one on close add up to the
+    session exactly once. Usage is split at midnight and credited to the day
+    it happened on; new rest periods are credited to the checkpoint's day.
+    """
+
+    def __init__(self, start_time=None):
+        self._last_time = start_time or datetime.datetime.now()
+        self._last_rest_total = 0
+
+    def checkpoint(self, rest_periods_total, now=None):
+        """
+        Records usage and rests since the last checkpoint.
+
+        :param rest_periods_total: Rest periods taken so far in this session (cumulative).
+        :param now: Checkpoint time (datetime); defaults to the current time.
+        :return: True if everything up to `now` has been recorded.
+        """
+        now = now or datetime.datetime.now()
+        if now <= self._last_time:
+            return True
+        new_rests = max(0, rest_periods_total - self._last_rest_total)
+
+        cursor = self._last_time
+        while cursor.date() < now.date():
+            next_midnight = datetime.datetime.combine(cursor.date() + datetime.timedelta(days=1), datetime.time())
+            seconds = int((next_midnight - cursor).total_seconds())
+            if seconds > 0 and not record_daily_summary(seconds, 0, date=cursor.date()):
+                return False
+            cursor = next_midnight
+            self._last_time = cursor # That day is recorded; never record it again
+
+        # Whole seconds only; the remainder carries over to the next checkpoint
+        seconds = int((now - cursor).total_seconds())
+        if seconds == 0 and new_rests == 0:
+            return True
+        if not record_daily_summary(seconds, new_rests, date=now.date()):
+            return False
+        self._last_time = cursor + datetime.timedelta(seconds=seconds)
+        self._last_rest_total = rest_periods_total
+        return True
+
 # Example Usage (for testing)
 if __name__ == "__main__":
     print("Testing stats manager...")
@@ -96,6 +599,21 @@ if __name__ == "__main__":
         print("Please install 'appdirs': pip install appdirs")
         exit()
 
+    # An event appended after a row torn by a crash must land on its own line
+    import tempfile
+    with tempfile.TemporaryDirectory() as check_dir:
+        real_data_dir, real_stats_db = get_data_dir, _stats_db
+        get_data_dir = lambda: check_dir
+        _stats_db = None
+        _append_event("2024-05-01", 60, 1)
+        with open(get_events_path(), 'a', newline='', encoding='utf-8') as f:
+            f.write("2024-05-01,36") # Crash partway through "2024-05-01,3600,2\r\n"
+        _append_event("2024-05-02", 120, 0)
+        totals = get_daily_totals()
+        assert totals == {"2024-05-01": (60, 1), "2024-05-02": (120, 0)}, totals
+        print("Torn event row check passed.")
+        get_data_dir, _stats_db = real_data_dir, real_stats_db
+
     print(f"Stats file path: {get_stats_path()}")
 
     # Simulate recording data
@@ -105,6 +623,14 @@ if __name__ == "__main__":
     print("\nRecording summary 2 (Usage: 1800s, Rests: 2)...")
     record_daily_summary(usage_seconds=1800, rest_periods=2)
 
+    print(f"\nToday's totals before compaction: {get_daily_summary()}")
+
+    week_ago = datetime.date.today() - datetime.timedelta(days=7)
+    print(f"\nLast 7 days from the database: {query_daily_range(week_ago, datetime.date.today())}")
+
+    print("\nCompacting event log...")
+    compact_stats()
+
     print("\nReading final stats file:")
     try:
         with open(get_stats_path(), 'r', newline='', encoding='utf-8') as f:
@@ -0,0 +1,162 @@
+# -*- coding: utf-8 -*-
+"""
+System load sampling for staged autostart.
+
+At login every startup item competes for the CPU and the disk. With
+--autostart, AppCore applies the color right away and finishes starting up
+(WMI, hotkey hook, statistics, tray/UI) once a StartupGate opens: when CPU
+and disk have stayed below their thresholds for a few consecutive samples,
+or when the maximum delay has passed, whichever comes first.
+
+LoadSampler reports CPU and disk busy fractions since the previous sample:
+GetSystemTimes and the PDH "% Idle Time" counter on Windows, /proc/stat and
+/proc/diskstats on Linux. Either value is None where it cannot be measured.
+"""
+
+import os
+import time
+import ctypes
+import logging
+import platform
+
+DEFAULT_CPU_THRESHOLD = 0.30
+DEFAULT_DISK_THRESHOLD = 0.30
+DEFAULT_QUIET_SAMPLES = 3 # Consecutive quiet samples (one per second) before the gate opens
+DEFAULT_MAX_DELAY = 60.0 # Seconds; the gate opens after this however busy the system is
+
+PDH_FMT_DOUBLE = 0x00000200
+DISK_IDLE_COUNTER = r"\PhysicalDisk(_Total)\% Idle Time"
+
+class FILETIME(ctypes.Structure):
+    _fields_ = [("dwLowDateTime", ctypes.c_ulong), ("dwHighDateTime", ctypes.c_ulong)]
+
+    def value(self):
+        return (self.dwHighDateTime << 32) | self.dwLowDateTime
+
+class PDH_FMT_COUNTERVALUE(ctypes.Structure):
+    _fields_ = [("CStatus", ctypes.c_ulong), ("doubleValue", ctypes.c_double)]
+
+class LoadSampler:
+    """CPU and disk busy fractions (0.0-1.0, or None) since the previous sample()."""
+
+    def __init__(self):
+        self._windows = platform.system() == "Windows"
+        self._pdh_query = None
+        self._pdh_counter = None
+        if self._windows:
+            self._open_disk_counter()
+        self._cpu = self._read_cpu()
+        self._disk = self._read_disk()
+
+    def sample(self):
+        cpu, disk = self._read_cpu(), self._read_disk()
+        cpu_busy = disk_busy = None
+        if cpu is not None and self._cpu is not None:
+            idle, total = cpu[0] - self._cpu[0], cpu[1] - self._cpu[1]
+            cpu_busy = 1.0 - idle / total if total > 0 else 0.0
+        if self._windows:
+            disk_busy = disk
+        elif disk is not None and self._disk is not None:
+            elapsed_ms = (disk[0] - self._disk[0]) * 1000
+            if elapsed_ms > 0:
+                # The busiest device decides: one saturated disk is enough to slow startup
+                busy_ms = max((ticks - self._disk[1].get(name, ticks) for name, ticks in disk[1].items()), default=0)
+                disk_busy = min(busy_ms / elapsed_ms, 1.0)
+        self._cpu, self._disk = cpu, disk
+        return cpu_busy, disk_busy
+
+    def close(self):
+        if self._pdh_query is not None:
+            ctypes.windll.pdh.PdhCloseQuery(self._pdh_query)
+            self._pdh_query = None
+
+    # --- CPU: (idle, total) time counters ---
+    def _read_cpu(self):
+        try:
+            if self._windows:
+                idle, kernel, user = FILETIME(), FILETIME(), FILETIME()
+                if not ctypes.windll.kernel32.GetSystemTimes(ctypes.byref(idle), ctypes.byref(kernel), ctypes.byref(user)):
+                    return None
+                return idle.value(), kernel.value() + user.value() # Kernel time includes idle time
+            with open("/proc/stat") as f:
+                fields = [int(value) for value in f.readline().split()[1:]]
+            return fields[3] + fields[4], sum(fields) # idle + iowait
+        except (OSError, ValueError, IndexError, AttributeError):
+            return None
+
+    # --- Disk: busy fraction (Windows) or (time, {device: io_ticks_ms}) (Linux) ---
+    def _open_disk_counter(self):
+        try:
+            pdh = ctypes.windll.pdh
+            query, counter = ctypes.c_void_p(), ctypes.c_void_p()
+            if pdh.PdhOpenQueryW(None, None, ctypes.byref(query)) != 0:
+                return
+            if pdh.PdhAddEnglishCounterW(query, DISK_IDLE_COUNTER, None, ctypes.byref(counter)) != 0:
+                pdh.PdhCloseQuery(query)
+                return
+            pdh.PdhCollectQueryData(query) # Rate counters need a first collection to diff against
+            self._pdh_query, self._pdh_counter = query, counter
+        except (OSError, AttributeError) as e:
+            logging.debug("Disk load counter unavailable: %s", e)
+
+    def _read_disk(self):
+        try:
+            if self._windows:
+                if self._pdh_query is None:
+                    return None
+                pdh = ctypes.windll.pdh
+                value = PDH_FMT_COUNTERVALUE()
+                if pdh.PdhCollectQueryData(self._pdh_query) != 0:
+                    return None
+                if pdh.PdhGetFormattedCounterValue(self._pdh_counter, PDH_FMT_DOUBLE, None, ctypes.byref(value)) != 0:
+                    return None
+                return max(0.0, min(1.0, 1.0 - value.doubleValue / 100.0))
+            ticks = {}
+            with open("/proc/diskstats") as f:
+                for line in f:
+                    fields = line.split()
+                    name = fields[2]
+                    # Whole physical disks only: partitions, loop and RAM devices would double count or add noise
+                    if name.startswith(("loop", "ram", "zram")) or not os.path.exists(f"/sys/block/{name}/device"):
+                        continue
+                    ticks[name] = int(fields[12])
+            return time.monotonic(), ticks
+        except (OSError, ValueError, IndexError, AttributeError):
+            return None
+
+class StartupGate:
+    """Decides when deferred startup work may run; call ready() about once a second."""
+
+    def __init__(self, sampler=None, cpu_threshold=DEFAULT_CPU_THRESHOLD, disk_threshold=DEFAULT_DISK_THRESHOLD,
+                 quiet_samples=DEFAULT_QUIET_SAMPLES, max_delay=DEFAULT_MAX_DELAY, start=None):
+        self.sampler = sampler or LoadSampler()
+        self.cpu_threshold = cpu_threshold
+        self.disk_threshold = disk_threshold
+        self.quiet_samples = quiet_samples
+        self.max_delay = max_delay
+        self.start = time.monotonic() if start is None else start
+        self.quiet_count = 0
+        self.reason = None # "idle" or "delay" once the gate has opened
+
+    def ready(self, now=None):
+        """Takes a load sample; returns True once the system has been quiet long enough or the delay has passed."""
+        if self.reason is not None:
+            return True
+        now = time.monotonic() if now is None else now
+        cpu, disk = self.sampler.sample()
+        measurable = cpu is not None or disk is not None # Without any load figures only the delay applies
+        quiet = measurable and (cpu is None or cpu < self.cpu_threshold) and (disk is None or disk < self.disk_threshold)
+        self.quiet_count = self.quiet_count + 1 if quiet else 0
+        if self.quiet_count >= self.quiet_samples:
+            self.reason = "idle"
+        elif now - self.start >= self.max_delay:
+            self.reason = "delay"
+        if self.reason is not None:
+            logging.info("Startup gate opened after %.1fs (%s; last sample cpu=%s disk=%s)",
+                         now - self.start, self.reason, _percent(cpu), _percent(disk))
+            self.sampler.close()
+            return True
+        return False
+
+def _percent(fraction):
+    return "n/a" if fraction is None else f"{fraction * 100:.0f}%"
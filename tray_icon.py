@@ -0,0 +1,63 @@
+# -*- coding: utf-8 -*-
+
+import os
+import logging
+from PySide6.QtWidgets import QApplication, QSystemTrayIcon, QMenu, QStyle
+from PySide6.QtGui import QIcon, QAction
+
+from app_core import resource_path
+
+class TrayIcon(QSystemTrayIcon):
+    """Tray icon and menu for the resident AppCore; works without a main window."""
+
+    def __init__(self, core):
+        super().__init__(core)
+        self.core = core
+        icon_path = resource_path("Mind.ico")
+        if os.path.exists(icon_path):
+            self.setIcon(QIcon(icon_path))
+        else:
+            logging.warning(f"Icon file not found at resolved path: {icon_path}")
+            self.setIcon(QApplication.style().standardIcon(QStyle.StandardPixmap.SP_ComputerIcon))
+        self.setToolTip("护目君")
+
+        # A tray menu has no parent widget, so keep a reference to it
+        self.menu = QMenu()
+        show_action = QAction("打开主窗口", self.menu)
+        show_action.triggered.connect(self.core.show_window)
+        self.menu.addAction(show_action)
+
+        self.profiles_menu = self.menu.addMenu("情景模式")
+        self.menu.addSeparator()
+        self.pause_action = QAction("暂停提醒", self.menu)
+        self.pause_action.triggered.connect(self.toggle_reminder_pause)
+        self.menu.addAction(self.pause_action)
+        self.menu.addSeparator()
+        quit_action = QAction("退出", self.menu)
+        quit_action.triggered.connect(QApplication.quit)
+        self.menu.addAction(quit_action)
+
+        # Built when the menu opens, so profile or reminder changes are always reflected
+        self.menu.aboutToShow.connect(self.refresh_menu)
+        self.setContextMenu(self.menu)
+        self.activated.connect(self.on_activated)
+
+    def refresh_menu(self):
+        self.profiles_menu.clear()
+        for name in self.core.settings.get("profiles", {}):
+            action = self.profiles_menu.addAction(name)
+            action.triggered.connect(lambda checked=False, n=name: self.core.apply_profile(n))
+
+        reminder_manager = self.core.reminder_manager
+        self.pause_action.setText("继续提醒" if reminder_manager.paused else "暂停提醒")
+        self.pause_action.setEnabled(reminder_manager.paused or reminder_manager.timer.isActive())
+
+    def toggle_reminder_pause(self):
+        if self.core.reminder_manager.paused:
+            self.core.reminder_manager.resume()
+        else:
+            self.core.reminder_manager.pause()
+
+    def on_activated(self, reason):
+        if reason in (QSystemTrayIcon.ActivationReason.Trigger, QSystemTrayIcon.ActivationReason.DoubleClick):
+            self.core.show_window()
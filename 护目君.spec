@@ -6,7 +6,8 @@ a = Analysis(
     pathex=[],
     binaries=[],
     datas=[('Mind.ico', '.'), ('./venv/Lib/site-packages/PySide6/plugins/platforms', 'PySide6/plugins/platforms')], # Use forward slashes
-    hiddenimports=['PySide6.QtCore', 'PySide6.QtGui', 'PySide6.QtWidgets'], # Explicitly add hidden imports
+    hiddenimports=['PySide6.QtCore', 'PySide6.QtGui', 'PySide6.QtWidgets', 'PySide6.QtNetwork', # Explicitly add hidden imports
+                   'wmi', 'pywintypes', 'pynput.keyboard', 'plyer', 'plyer.platforms.win.notification', 'appdirs', 'sqlite3', 'stats_db', 'activity_timeline', 'main_window', 'tray_icon', 'winrt.windows.devices.sensors'], # Imported lazily via lazy_import, invisible to the analysis
     hookspath=[],
     hooksconfig={},
     runtime_hooks=[],
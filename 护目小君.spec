@@ -6,7 +6,7 @@ a = Analysis(
     pathex=[],
     binaries=[],
     datas=[('Mind.ico', '.'), ('.\\venv\\Lib\\site-packages\\PySide6\\plugins\\platforms', 'PySide6\\plugins\\platforms')],
-    hiddenimports=[],
+    hiddenimports=['wmi', 'pywintypes', 'pynput.keyboard', 'plyer', 'plyer.platforms.win.notification', 'appdirs', 'sqlite3', 'stats_db', 'activity_timeline', 'main_window', 'tray_icon', 'winrt.windows.devices.sensors'], # Imported lazily via lazy_import, invisible to the analysis
     hookspath=[],
     hooksconfig={},
     runtime_hooks=[],